@@ -0,0 +1,318 @@
+"""Benchmarki gorących ścieżek parsera i analizy.
+
+Generuje syntetyczne wyjście du i find batch dla drzew o różnym kształcie
+(wide, deep, skewed) i mierzy przepustowość (linie/s), szczytowe RSS
+procesu i szczyt alokacji samej funkcji (tracemalloc, osobny przebieg
+poza pomiarem czasu) dla: parse_du_output, _compute_children_sums,
+find_top_n_file_heavy, find_top_n_by_stale i parse_stale_batch_output.
+Każdy przypadek działa
+w osobnym procesie, więc RSS jednego nie zawyża kolejnych. Wyniki można
+zapisać (--save) i porównać z poprzednią wersją (--compare); spadek
+przepustowości ponad --tolerance kończy się kodem wyjścia 1.
+
+Uruchomienie (bez sieci i bez zależności poza pakietem):
+
+    PYTHONPATH=src python benchmarks/bench_analyzer.py --sizes 10k 1M
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from multiprocessing import get_context
+from typing import Any
+
+from dsmonitor import __version__
+from dsmonitor.analyzer import _compute_children_sums, find_top_n_by_stale, find_top_n_file_heavy, parse_du_output
+from dsmonitor.executor import parse_stale_batch_output
+
+ROOT = "/data"
+SHAPES = ("wide", "deep", "skewed")
+BENCHMARKS = (
+    "parse_du_output",
+    "compute_children_sums",
+    "find_top_n_file_heavy",
+    "find_top_n_by_stale",
+    "parse_stale_batch_output",
+)
+DEEP_CHAIN = 64
+STALE_EVERY = 3
+SIZE_SUFFIXES = {"k": 1_000, "M": 1_000_000}
+
+type Workload = Callable[[], object]
+
+
+@dataclass
+class CaseResult:
+    """Wynik jednego przypadku (funkcja, kształt drzewa, liczba linii)."""
+
+    benchmark: str
+    shape: str
+    lines: int
+    seconds: float
+    lines_per_second: float
+    peak_rss_mb: float
+    alloc_peak_mb: float
+
+
+def parse_count(value: str) -> int:
+    """
+    Zamienia liczbę linii z przyrostkiem (10k, 1M) na int.
+
+    Args:
+        value: Liczba linii, np. "10k", "1M", "250000".
+
+    Returns:
+        Liczba linii.
+
+    Raises:
+        argparse.ArgumentTypeError: Gdy wartość jest nieprawidłowa.
+    """
+    multiplier = SIZE_SUFFIXES.get(value[-1:], 1)
+    digits = value[:-1] if value[-1:] in SIZE_SUFFIXES else value
+    try:
+        count = int(digits) * multiplier
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"nieprawidłowa liczba linii: {value}") from None
+    if count < 1:
+        raise argparse.ArgumentTypeError(f"liczba linii musi być >= 1: {value}")
+    return count
+
+
+def build_parents(shape: str, count: int, seed: int) -> list[int]:
+    """
+    Buduje drzewo katalogów jako listę rodziców (rodzic ma mniejszy indeks).
+
+    wide: dwa poziomy o rozgałęzieniu ok. pierwiastka z count,
+    deep: łańcuchy po DEEP_CHAIN katalogów pod rootem,
+    skewed: rozgałęzienie o rozkładzie potęgowym (kilka bardzo dużych
+    katalogów i długi ogon małych).
+
+    Args:
+        shape: Kształt drzewa.
+        count: Liczba katalogów (z rootem).
+        seed: Ziarno generatora.
+
+    Returns:
+        Lista: indeks katalogu -> indeks rodzica (-1 dla roota).
+    """
+    rng = random.Random(seed)
+    parents = [-1]
+
+    if shape == "wide":
+        fanout = max(2, int(count**0.5))
+        parents.extend((node - 1) // fanout for node in range(1, count))
+    elif shape == "deep":
+        parents.extend(0 if node % DEEP_CHAIN == 1 else node - 1 for node in range(1, count))
+    else:
+        parents.extend(int(node * rng.random() ** 3) for node in range(1, count))
+
+    return parents
+
+
+def generate_outputs(shape: str, count: int, seed: int = 0) -> tuple[str, str]:
+    """
+    Generuje wyjście du (kolejność post-order jak w du) i find batch.
+
+    Args:
+        shape: Kształt drzewa.
+        count: Liczba linii du (katalogów).
+        seed: Ziarno generatora.
+
+    Returns:
+        Krotka (wyjście du, wyjście find batch ze stale co STALE_EVERY katalog).
+    """
+    rng = random.Random(seed)
+    parents = build_parents(shape, count, seed)
+
+    paths = [ROOT]
+    children: list[list[int]] = [[] for _ in range(count)]
+    for node in range(1, count):
+        paths.append(f"{paths[parents[node]]}/d{node}")
+        children[parents[node]].append(node)
+
+    totals = [rng.randrange(1, 1 << 16) * 4096 for _ in range(count)]
+    for node in range(count - 1, 0, -1):
+        totals[parents[node]] += totals[node]
+
+    du_lines: list[str] = []
+    stack = [(0, iter(children[0]))]
+    while stack:
+        node, pending = stack[-1]
+        child = next(pending, None)
+        if child is None:
+            stack.pop()
+            du_lines.append(f"{totals[node]}\t{paths[node]}")
+        else:
+            stack.append((child, iter(children[child])))
+
+    stale_lines = [f"{paths[node]}\t{rng.randrange(1, 1 << 30)}" for node in range(0, count, STALE_EVERY)]
+    return "\n".join(du_lines) + "\n", "\n".join(stale_lines) + "\n"
+
+
+def prepare_workload(benchmark: str, du_output: str, stale_output: str) -> Workload:
+    """
+    Przygotowuje dane wejściowe i zwraca mierzoną funkcję.
+
+    Args:
+        benchmark: Nazwa benchmarku.
+        du_output: Wyjście du.
+        stale_output: Wyjście find batch.
+
+    Returns:
+        Funkcja bez argumentów wykonująca mierzoną operację.
+    """
+    if benchmark == "parse_du_output":
+        return lambda: parse_du_output(du_output)
+    if benchmark == "parse_stale_batch_output":
+        return lambda: parse_stale_batch_output(stale_output)
+
+    sizes = parse_du_output(du_output)
+    if benchmark == "compute_children_sums":
+        return lambda: _compute_children_sums(sizes)
+    if benchmark == "find_top_n_file_heavy":
+        return lambda: find_top_n_file_heavy(sizes, ROOT, 20, 0.8)
+
+    stale = parse_stale_batch_output(stale_output)
+    return lambda: find_top_n_by_stale(stale, sizes, ROOT, 20)
+
+
+def peak_rss_mb() -> float:
+    """Zwraca szczytowe RSS bieżącego procesu w MB (ru_maxrss: KB na Linuksie, bajty na macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(benchmark: str, shape: str, lines: int, repeat: int, seed: int) -> CaseResult:
+    """
+    Wykonuje przypadek (w procesie potomnym) i zwraca najlepszy czas z repeat prób.
+
+    Szczyt alokacji jest mierzony w dodatkowym przebiegu pod tracemalloc,
+    bo śledzenie alokacji spowalnia funkcję.
+
+    Args:
+        benchmark: Nazwa benchmarku.
+        shape: Kształt drzewa.
+        lines: Liczba linii du.
+        repeat: Liczba powtórzeń.
+        seed: Ziarno generatora.
+
+    Returns:
+        Wynik przypadku.
+    """
+    du_output, stale_output = generate_outputs(shape, lines, seed)
+    workload = prepare_workload(benchmark, du_output, stale_output)
+    measured_lines = lines if benchmark != "parse_stale_batch_output" else stale_output.count("\n")
+
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        workload()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    workload()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return CaseResult(
+        benchmark=benchmark,
+        shape=shape,
+        lines=measured_lines,
+        seconds=best,
+        lines_per_second=measured_lines / best if best > 0 else float("inf"),
+        peak_rss_mb=peak_rss_mb(),
+        alloc_peak_mb=alloc_peak / (1024 * 1024),
+    )
+
+
+def compare_results(results: list[CaseResult], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """
+    Porównuje przepustowość z zapisanym wynikiem poprzedniej wersji.
+
+    Args:
+        results: Bieżące wyniki.
+        baseline: Zawartość pliku z --save.
+        tolerance: Dopuszczalny spadek przepustowości (0.2 = 20%).
+
+    Returns:
+        Opisy regresji (pusta lista = brak regresji).
+    """
+    previous = {(r["benchmark"], r["shape"], r["lines"]): r for r in baseline.get("results", [])}
+    regressions: list[str] = []
+
+    for result in results:
+        old = previous.get((result.benchmark, result.shape, result.lines))
+        if old is None:
+            continue
+        ratio = result.lines_per_second / old["lines_per_second"]
+        if ratio < 1.0 - tolerance:
+            regressions.append(
+                f"{result.benchmark} [{result.shape}, {result.lines}]: "
+                f"{result.lines_per_second:,.0f} linii/s vs {old['lines_per_second']:,.0f} ({ratio:.0%})"
+            )
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Punkt wejścia: uruchomienie benchmarków, wypisanie tabeli, zapis i porównanie."""
+    parser = argparse.ArgumentParser(description="Benchmarki parsera i analizy dsmonitor.")
+    parser.add_argument("--sizes", nargs="+", type=parse_count, default=[10_000, 1_000_000], metavar="N")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES))
+    parser.add_argument("--benchmarks", nargs="+", choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument("--repeat", type=int, default=3, help="Powtórzenia (liczy się najlepszy czas)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="PLIK", help="Zapisz wyniki do pliku JSON")
+    parser.add_argument("--compare", metavar="PLIK", help="Porównaj z wynikami z --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Dopuszczalny spadek przepustowości")
+    args = parser.parse_args(argv)
+
+    print(
+        f"{'benchmark':<26} {'kształt':<7} {'linie':>10} {'czas [s]':>9} {'linie/s':>13} {'RSS [MB]':>9} {'alok. [MB]':>10}"
+    )
+    results: list[CaseResult] = []
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"), max_tasks_per_child=1) as pool:
+        for lines in args.sizes:
+            for shape in args.shapes:
+                for benchmark in args.benchmarks:
+                    result = pool.submit(run_case, benchmark, shape, lines, args.repeat, args.seed).result()
+                    results.append(result)
+                    print(
+                        f"{result.benchmark:<26} {result.shape:<7} {result.lines:>10} {result.seconds:>9.3f} "
+                        f"{result.lines_per_second:>13,.0f} {result.peak_rss_mb:>9.1f} {result.alloc_peak_mb:>10.1f}",
+                        flush=True,
+                    )
+
+    if args.save:
+        data = {
+            "version": __version__,
+            "python": platform.python_version(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "results": [asdict(result) for result in results],
+        }
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegresje przepustowości:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  - {regression}", file=sys.stderr)
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,473 @@
+"""Agent zdalny - skan roota i selekcja Top N po stronie hosta.
+
+Moduł jest samodzielnym skryptem (tylko biblioteka standardowa, Python 3.7+),
+przesyłanym przez SSH i uruchamianym zdalnie przez python3 -c. Zwraca jedną
+linię JSON w formacie root_summary_to_dict zamiast pełnego wyjścia du/find.
+Logika selekcji odpowiada find_top_n_file_heavy, find_top_n_by_stale
+i attribute_stale z modułu analyzer. Z --sample-error agent zamiast pełnego
+przejścia próbkuje podkatalogi i zwraca wynik przybliżony (approx).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from fnmatch import fnmatchcase
+from typing import Any
+
+STAT_TIME_ATTRIBUTES = {"mtime": "st_mtime", "atime": "st_atime", "ctime": "st_ctime"}
+SAMPLE_MIN = 10
+SAMPLE_Z = 1.96
+
+
+def normalize(path: str) -> str:
+    """Usuwa końcowe ukośniki (jak normalize_path dla ścieżek z du)."""
+    stripped = path.rstrip("/")
+    return stripped or "/"
+
+
+def parent_of(path: str) -> str:
+    """Zwraca rodzica znormalizowanej ścieżki."""
+    head, sep, _ = path.rpartition("/")
+    if not sep:
+        return "."
+    return head or "/"
+
+
+def is_excluded(path: str, excludes: list[str]) -> bool:
+    """
+    Sprawdza wykluczenia jak du --exclude (wzorzec dopasowany do końcówki ścieżki).
+
+    Args:
+        path: Ścieżka wpisu.
+        excludes: Wzorce wykluczeń.
+
+    Returns:
+        True, gdy wpis jest wykluczony.
+    """
+    if not excludes:
+        return False
+
+    suffixes = [path]
+    position = path.find("/", 1)
+    while position != -1:
+        suffixes.append(path[position + 1 :])
+        position = path.find("/", position + 1)
+
+    return any(fnmatchcase(suffix, pattern) for pattern in excludes for suffix in suffixes)
+
+
+def read_directory(directory: str) -> list[os.DirEntry[str]]:
+    """Odczytuje wpisy katalogu; błąd jest wypisywany na stderr (jak w du)."""
+    try:
+        with os.scandir(directory) as entries:
+            return list(entries)
+    except OSError as e:
+        print(f"dsmonitor-agent: cannot read directory '{directory}': {e.strerror}", file=sys.stderr)
+        return []
+
+
+def walk(root: str, excludes: list[str], cutoff: float, time_attribute: str) -> tuple[dict[str, int], dict[str, int]]:
+    """
+    Przechodzi drzewo roota w obrębie jednego systemu plików.
+
+    Kolejność przejścia (w głąb, wpisy w kolejności readdir) jest taka jak
+    w du, więc twarde linki są przypisywane do tych samych katalogów.
+    Błędy odczytu są wypisywane na stderr, a skan trwa dalej.
+
+    Args:
+        root: Znormalizowana ścieżka roota.
+        excludes: Wzorce wykluczeń.
+        cutoff: Graniczny czas (pliki starsze lub równe są stale).
+        time_attribute: Atrybut stat z czasem (st_mtime, st_atime, st_ctime).
+
+    Returns:
+        Krotka (katalog -> zajętość bezpośrednia, katalog -> stale bezpośrednie).
+    """
+    root_stat = os.lstat(root)
+    root_device = root_stat.st_dev
+    direct: dict[str, int] = {root: root_stat.st_blocks * 512}
+    stale: dict[str, int] = {}
+    seen_inodes: set[tuple[int, int]] = set()
+    stack = [(root, iter(read_directory(root)))]
+
+    while stack:
+        directory, entries = stack[-1]
+        for entry in entries:
+            if excludes and is_excluded(entry.path, excludes):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                is_directory = entry.is_dir(follow_symlinks=False)
+                is_file = entry.is_file(follow_symlinks=False)
+            except OSError as e:
+                print(f"dsmonitor-agent: {e}", file=sys.stderr)
+                continue
+
+            if is_directory:
+                if stat.st_dev != root_device:
+                    continue
+                direct[entry.path] = stat.st_blocks * 512
+                stack.append((entry.path, iter(read_directory(entry.path))))
+                break
+
+            if is_file and getattr(stat, time_attribute) <= cutoff:
+                stale[directory] = stale.get(directory, 0) + stat.st_size
+
+            if stat.st_nlink > 1:
+                inode = (stat.st_dev, stat.st_ino)
+                if inode in seen_inodes:
+                    continue
+                seen_inodes.add(inode)
+
+            direct[directory] += stat.st_blocks * 512
+        else:
+            stack.pop()
+
+    return direct, stale
+
+
+class SampleFrame:
+    """Katalog w trakcie przejścia próbkującego (podkatalogi w losowej kolejności)."""
+
+    __slots__ = ("count", "mean", "path", "pending", "squares", "variance", "visited")
+
+    def __init__(self, path: str, subdirectories: list[str]) -> None:
+        self.path = path
+        self.pending = subdirectories
+        self.count = len(subdirectories)
+        self.visited: list[str] = []
+        self.mean = 0.0
+        self.squares = 0.0
+        self.variance = 0.0
+
+    def add(self, child: str, total: float, variance: float) -> None:
+        """Dodaje oszacowanie odwiedzonego podkatalogu (średnia i wariancja metodą Welforda)."""
+        self.visited.append(child)
+        delta = total - self.mean
+        self.mean += delta / len(self.visited)
+        self.squares += delta * (total - self.mean)
+        self.variance += variance
+
+    def estimate(self, direct: int) -> tuple[float, float]:
+        """
+        Szacuje rozmiar rekurencyjny katalogu i wariancję oszacowania.
+
+        Estymator dwustopniowy: suma podkatalogów to liczba podkatalogów razy
+        średnia z próby, a wariancja łączy rozrzut w próbie (z poprawką na
+        skończoną populację) i wariancje oszacowań odwiedzonych podkatalogów.
+
+        Args:
+            direct: Zajętość bezpośrednia katalogu (zmierzona w całości).
+
+        Returns:
+            Krotka (oszacowanie rozmiaru, wariancja).
+        """
+        sampled = len(self.visited)
+        if not sampled:
+            return float(direct), 0.0
+
+        spread = self.squares / (sampled - 1) if sampled > 1 else 0.0
+        variance = self.count**2 * (1 - sampled / self.count) * spread / sampled
+        variance += self.count / sampled * self.variance
+        return direct + self.count * self.mean, variance
+
+    def is_sufficient(self, direct: int, max_error: float) -> bool:
+        """Czy próba osiągnęła docelowy błąd względny (przy co najmniej SAMPLE_MIN podkatalogach)."""
+        if len(self.visited) < SAMPLE_MIN:
+            return False
+        total, variance = self.estimate(direct)
+        return SAMPLE_Z * math.sqrt(variance) <= max_error * total
+
+
+def sample_walk(
+    root: str, excludes: list[str], cutoff: float, time_attribute: str, max_error: float, seed: int = 0
+) -> tuple[dict[str, int], dict[str, int], dict[str, float], float]:
+    """
+    Przechodzi losową próbę podkatalogów roota (skan przybliżony).
+
+    Pliki każdego odwiedzonego katalogu są liczone w całości, a jego
+    podkatalogi są odwiedzane w losowej kolejności, dopóki oszacowanie
+    rozmiaru katalogu nie osiągnie błędu max_error (przedział ufności 95%)
+    lub nie zostaną odwiedzone wszystkie. Katalog z najwyżej SAMPLE_MIN
+    podkatalogami jest więc zawsze liczony dokładnie. Podkatalogi
+    odwiedzone w próbie dostają mnożnik liczba podkatalogów / wielkość próby.
+
+    Args:
+        root: Znormalizowana ścieżka roota.
+        excludes: Wzorce wykluczeń.
+        cutoff: Graniczny czas (pliki starsze lub równe są stale).
+        time_attribute: Atrybut stat z czasem (st_mtime, st_atime, st_ctime).
+        max_error: Docelowy błąd względny oszacowania (np. 0.05).
+        seed: Ziarno losowania (ten sam seed daje tę samą próbę).
+
+    Returns:
+        Krotka (zajętość bezpośrednia, stale bezpośrednie, mnożniki
+        podkatalogów z próby, osiągnięty błąd względny roota).
+    """
+    rng = random.Random(seed)
+    root_stat = os.lstat(root)
+    root_device = root_stat.st_dev
+    direct: dict[str, int] = {root: root_stat.st_blocks * 512}
+    stale: dict[str, int] = {}
+    scale: dict[str, float] = {}
+    seen_inodes: set[tuple[int, int]] = set()
+
+    def open_frame(directory: str) -> SampleFrame:
+        subdirectories: list[str] = []
+        for entry in read_directory(directory):
+            if excludes and is_excluded(entry.path, excludes):
+                continue
+            try:
+                stat = entry.stat(follow_symlinks=False)
+                is_directory = entry.is_dir(follow_symlinks=False)
+                is_file = entry.is_file(follow_symlinks=False)
+            except OSError as e:
+                print(f"dsmonitor-agent: {e}", file=sys.stderr)
+                continue
+
+            if is_directory:
+                if stat.st_dev == root_device:
+                    direct[entry.path] = stat.st_blocks * 512
+                    subdirectories.append(entry.path)
+                continue
+
+            if is_file and getattr(stat, time_attribute) <= cutoff:
+                stale[directory] = stale.get(directory, 0) + stat.st_size
+
+            if stat.st_nlink > 1:
+                inode = (stat.st_dev, stat.st_ino)
+                if inode in seen_inodes:
+                    continue
+                seen_inodes.add(inode)
+
+            direct[directory] += stat.st_blocks * 512
+
+        rng.shuffle(subdirectories)
+        return SampleFrame(directory, subdirectories)
+
+    stack = [open_frame(root)]
+    total, variance = 0.0, 0.0
+    while stack:
+        frame = stack[-1]
+        if frame.pending and not frame.is_sufficient(direct[frame.path], max_error):
+            stack.append(open_frame(frame.pending.pop()))
+            continue
+
+        stack.pop()
+        for child in frame.pending:
+            del direct[child]
+        if frame.pending:
+            for child in frame.visited:
+                scale[child] = frame.count / len(frame.visited)
+        total, variance = frame.estimate(direct[frame.path])
+        if stack:
+            stack[-1].add(frame.path, total, variance)
+
+    relative_error = SAMPLE_Z * math.sqrt(variance) / total if total > 0 else 0.0
+    return direct, stale, scale, relative_error
+
+
+def sample_weight(path: str, root: str, scale: dict[str, float]) -> float:
+    """Zwraca wagę katalogu z próby (iloczyn mnożników od roota)."""
+    weight = 1.0
+    while path != root:
+        weight *= scale.get(path, 1.0)
+        path = parent_of(path)
+    return weight
+
+
+def rollup(direct: dict[str, int], root: str, max_depth: int, scale: dict[str, float] | None = None) -> dict[str, int]:
+    """
+    Zamienia zajętości bezpośrednie na rozmiary rekurencyjne do max_depth (jak du).
+
+    Args:
+        direct: Słownik katalog -> zajętość bezpośrednia (modyfikowany w miejscu).
+        root: Znormalizowana ścieżka roota.
+        max_depth: Maksymalna głębokość raportowanych katalogów.
+        scale: Mnożniki podkatalogów z próby (sample_walk), None = skan pełny.
+
+    Returns:
+        Słownik katalog -> rozmiar rekurencyjny.
+    """
+    for path in sorted(direct, key=lambda p: p.count("/"), reverse=True):
+        if path != root:
+            size = direct[path] if scale is None else round(direct[path] * scale.get(path, 1.0))
+            direct[parent_of(path)] += size
+
+    return {path: size for path, size in direct.items() if depth_of(path, root) <= max_depth}
+
+
+def depth_of(path: str, root: str) -> int:
+    """Zwraca głębokość ścieżki względem roota."""
+    if path == root:
+        return 0
+    return path.count("/") - (0 if root == "/" else root.count("/"))
+
+
+def directory_info(
+    sizes: dict[str, int],
+    children_sums: dict[str, int],
+    path: str,
+    root: str,
+    stale_size: int | None = None,
+) -> dict[str, Any]:
+    """Buduje słownik DirectoryInfo (pola jak w dsmonitor.analyzer)."""
+    total_size = sizes.get(path, 0)
+    direct_files_size = max(0, total_size - children_sums.get(path, 0)) if total_size > 0 else 0
+    parent = parent_of(path)
+
+    return {
+        "path": path,
+        "total_size": total_size,
+        "direct_files_size": direct_files_size,
+        "file_heavy_ratio": direct_files_size / total_size if total_size > 0 else 0.0,
+        "stale_size": stale_size,
+        "parent_path": parent,
+        "parent_total_size": sizes.get(parent),
+        "depth": depth_of(path, root),
+    }
+
+
+def summarize(
+    path: str,
+    direct: dict[str, int],
+    stale: dict[str, int],
+    max_depth: int,
+    top_n: int,
+    threshold: float,
+    mode: str,
+    with_stale: bool,
+    scale: dict[str, float] | None = None,
+) -> dict[str, Any]:
+    """
+    Wylicza Top N i buduje słownik RootSummary.
+
+    Dla skanu przybliżonego (scale) rozmiary i stale katalogów spoza próby
+    są szacowane mnożnikami, a stale bezpośrednie katalogów Top N w trybie
+    stale pozostają zmierzone.
+
+    Args:
+        path: Ścieżka roota (jak w konfiguracji).
+        direct: Zajętości bezpośrednie katalogów.
+        stale: Stale bezpośrednie katalogów.
+        max_depth: Głębokość raportowanych katalogów.
+        top_n: Liczba wyników.
+        threshold: Próg file_heavy_ratio.
+        mode: Tryb raportu (size lub stale).
+        with_stale: Czy w trybie size przypisać stale do katalogów Top N.
+        scale: Mnożniki podkatalogów z próby (sample_walk), None = skan pełny.
+
+    Returns:
+        Słownik w formacie root_summary_to_dict.
+    """
+    root = normalize(path)
+    sizes = rollup(direct, root, max_depth, scale)
+    children_sums: dict[str, int] = {}
+    for directory, size in sizes.items():
+        if directory != root:
+            parent = parent_of(directory)
+            scaled = size if scale is None else round(size * scale.get(directory, 1.0))
+            children_sums[parent] = children_sums.get(parent, 0) + scaled
+
+    def stale_total(sizes_by_directory: dict[str, int], under: str) -> int:
+        if scale is None:
+            return sum(sizes_by_directory.values())
+        base = sample_weight(under, root, scale)
+        return round(
+            sum(size * sample_weight(directory, root, scale) for directory, size in sizes_by_directory.items()) / base
+        )
+
+    summary: dict[str, Any] = {
+        "path": path,
+        "total_size": sizes.get(root, 0),
+        "stale_size": None,
+        "top_directories": [],
+        "warnings": [],
+    }
+
+    if mode == "stale":
+        top_stale = sorted(stale.items(), key=lambda item: (-item[1], item[0]))[:top_n]
+        summary["stale_size"] = stale_total(stale, root)
+        summary["top_directories"] = [
+            directory_info(sizes, children_sums, directory, root, size) for directory, size in top_stale
+        ]
+        return summary
+
+    candidates = [
+        (size, directory)
+        for directory, size in sizes.items()
+        if size > 0 and max(0, size - children_sums.get(directory, 0)) / size >= threshold
+    ]
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    top = [directory_info(sizes, children_sums, directory, root) for _, directory in candidates[:top_n]]
+    summary["top_directories"] = top
+
+    if with_stale and top:
+        attributed: dict[str, dict[str, int]] = {info["path"]: {} for info in top}
+        for directory, size in stale.items():
+            current = directory
+            while current not in attributed:
+                parent = parent_of(current)
+                if parent == current:
+                    break
+                current = parent
+            else:
+                attributed[current][directory] = size
+        for info in top:
+            info["stale_size"] = stale_total(attributed[info["path"]], info["path"])
+        summary["stale_size"] = stale_total(stale, root)
+
+    return summary
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Punkt wejścia agenta: skan roota i wypisanie podsumowania JSON."""
+    parser = argparse.ArgumentParser(prog="dsmonitor-agent")
+    parser.add_argument("root")
+    parser.add_argument("--depth", type=int, default=20)
+    parser.add_argument("--top-n", type=int, default=20)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--mode", choices=["size", "stale"], default="size")
+    parser.add_argument("--stale-days", type=int, default=365)
+    parser.add_argument("--stale-kind", choices=sorted(STAT_TIME_ATTRIBUTES), default="mtime")
+    parser.add_argument("--exclude", action="append", default=[])
+    parser.add_argument("--sample-error", type=float, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cutoff = time.time() - (args.stale_days + 1) * 86400
+    root = normalize(args.root)
+    time_attribute = STAT_TIME_ATTRIBUTES[args.stale_kind]
+    scale: dict[str, float] | None = None
+    relative_error = 0.0
+
+    try:
+        if args.sample_error is None:
+            direct, stale = walk(root, args.exclude, cutoff, time_attribute)
+        else:
+            direct, stale, scale, relative_error = sample_walk(
+                root, args.exclude, cutoff, time_attribute, args.sample_error, args.seed
+            )
+    except OSError as e:
+        print(f"dsmonitor-agent: {e}", file=sys.stderr)
+        return 1
+
+    with_stale = args.stale_days > 0
+    summary = summarize(
+        args.root, direct, stale, args.depth, args.top_n, args.threshold, args.mode, with_stale, scale or None
+    )
+    if scale:
+        summary["approx"] = True
+        summary["warnings"].append(f"Wynik przybliżony (próbkowanie podkatalogów): ±{relative_error:.1%} (95%)")
+    print(json.dumps(summary, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,20 @@
 """Moduł analizy - parsowanie du, wyliczanie Top N, ratio, stale."""
 
-from dataclasses import dataclass, field
-from pathlib import Path
+import heapq
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from typing import Any
 
-from dsmonitor.utils import get_parent_path, is_child_of, normalize_path
+from dsmonitor.metrics import ScanMetrics
+from dsmonitor.tree import DirectoryTree, parent_of
+from dsmonitor.utils import normalize_path
 
+SOURCE_SCAN = "scan"
+SOURCE_FILESYSTEM = "filesystem"
+SOURCE_PREVIOUS = "previous"
 
-@dataclass
+
+@dataclass(slots=True)
 class DirectoryInfo:
     """Informacje o katalogu."""
 
@@ -20,9 +28,27 @@ class DirectoryInfo:
     depth: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
+class DirectoryGrowth:
+    """Tempo przyrostu katalogu wyliczone z historii skanów."""
+
+    path: str
+    total_size: int
+    bytes_per_day: float
+    samples: int
+    days_until_full: float | None = None
+
+
+@dataclass(slots=True)
 class RootSummary:
-    """Podsumowanie dla katalogu głównego (root/mountpoint)."""
+    """
+    Podsumowanie dla katalogu głównego (root/mountpoint).
+
+    source mówi, skąd pochodzi rozmiar: SOURCE_SCAN - skan drzewa (du,
+    find, agent, native), SOURCE_FILESYSTEM - zajętość całego systemu
+    plików bez skanu (--fill-threshold), SOURCE_PREVIOUS - wynik
+    poprzedniego pełnego skanu (--usage-delta).
+    """
 
     path: str
     total_size: int
@@ -30,16 +56,103 @@ class RootSummary:
     top_directories: list[DirectoryInfo] = field(default_factory=list)
     warnings: list[str] = field(default_factory=list)
     approx: bool = False
+    fs_size: int | None = None
+    fs_available: int | None = None
+    growth_per_day: float | None = None
+    days_until_full: float | None = None
+    growth: list[DirectoryGrowth] = field(default_factory=list)
+    source: str = SOURCE_SCAN
 
 
-@dataclass
+@dataclass(slots=True)
 class HostResult:
     """Wynik skanowania dla hosta."""
 
     host_name: str
     roots: list[RootSummary] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
+    failed_roots: list[str] = field(default_factory=list)
+    resumed_roots: list[str] = field(default_factory=list)
     success: bool = True
+    metrics: ScanMetrics = field(default_factory=ScanMetrics, compare=False)
+    root_metrics: dict[str, ScanMetrics] = field(default_factory=dict, compare=False)
+
+
+def root_summary_to_dict(summary: RootSummary) -> dict[str, Any]:
+    """
+    Zamienia podsumowanie roota na słownik (serializowalny do JSON).
+
+    Args:
+        summary: Podsumowanie roota.
+
+    Returns:
+        Słownik z polami RootSummary.
+    """
+    return asdict(summary)
+
+
+def root_summary_from_dict(data: dict[str, Any]) -> RootSummary:
+    """
+    Odtwarza podsumowanie roota ze słownika (np. z wyniku agenta zdalnego).
+
+    Brakujące pola opcjonalne przyjmują wartości domyślne.
+
+    Args:
+        data: Słownik w formacie root_summary_to_dict.
+
+    Returns:
+        Podsumowanie roota.
+
+    Raises:
+        TypeError: Gdy brakuje pola wymaganego lub słownik zawiera nieznane pola.
+    """
+    fields = dict(data)
+    fields["top_directories"] = [DirectoryInfo(**item) for item in fields.get("top_directories", [])]
+    fields["growth"] = [DirectoryGrowth(**item) for item in fields.get("growth", [])]
+    return RootSummary(**fields)
+
+
+def add_du_line(sizes: dict[str, int], line: str) -> None:
+    """
+    Dodaje linię wyjścia du (rozmiar<tab>ścieżka) do słownika rozmiarów.
+
+    Nieprawidłowe linie są pomijane.
+
+    Args:
+        sizes: Słownik ścieżka -> rozmiar (uzupełniany w miejscu).
+        line: Linia wyjścia du.
+    """
+    parts = line.split("\t", 1)
+    if len(parts) != 2:
+        return
+
+    try:
+        size = int(parts[0])
+    except ValueError:
+        return
+
+    sizes[normalize_path(parts[1].rstrip("\n"))] = size
+
+
+def parse_du_lines(lines: Iterable[str]) -> dict[str, int]:
+    """
+    Parsuje strumień linii du do słownika path -> size.
+
+    Linie są przetwarzane na bieżąco, więc przy strumieniu z działającego
+    procesu w pamięci jest tylko słownik rozmiarów, bez surowego tekstu.
+
+    Args:
+        lines: Linie wyjścia du (np. CommandStream).
+
+    Returns:
+        Słownik: ścieżka -> rozmiar w bajtach.
+    """
+    sizes: dict[str, int] = {}
+
+    for line in lines:
+        add_du_line(sizes, line)
+
+    return sizes
 
 
 def parse_du_output(output: str) -> dict[str, int]:
@@ -52,24 +165,83 @@ def parse_du_output(output: str) -> dict[str, int]:
     Returns:
         Słownik: ścieżka -> rozmiar w bajtach.
     """
-    sizes: dict[str, int] = {}
+    return parse_du_lines(output.split("\n"))
 
-    for line in output.strip().split("\n"):
-        if not line:
-            continue
 
-        parts = line.split("\t", 1)
-        if len(parts) != 2:
-            continue
+def add_tree_scan_line(totals: dict[str, int], stale: dict[str, int], line: str) -> None:
+    """
+    Dodaje linię jednoprzebiegowego skanu (katalog<tab>zajętość<tab>stale).
 
-        try:
-            size = int(parts[0])
-            path = normalize_path(parts[1])
-            sizes[path] = size
-        except ValueError:
-            continue
+    Nieprawidłowe linie są pomijane.
+
+    Args:
+        totals: Słownik ścieżka -> zajętość bezpośrednia (uzupełniany w miejscu).
+        stale: Słownik ścieżka -> stale bezpośrednie (uzupełniany w miejscu).
+        line: Linia wyjścia build_tree_scan_command.
+    """
+    parts = line.rsplit("\t", 2)
+    if len(parts) != 3:
+        return
+
+    try:
+        used = int(parts[1])
+        stale_size = int(parts[2])
+    except ValueError:
+        return
+
+    path = normalize_path(parts[0])
+    totals[path] = totals.get(path, 0) + used
+    if stale_size > 0:
+        stale[path] = stale.get(path, 0) + stale_size
 
-    return sizes
+
+def rollup_tree_scan(totals: dict[str, int], root: str, max_depth: int) -> dict[str, int]:
+    """
+    Zamienia zajętości bezpośrednie na rozmiary rekurencyjne jak du --max-depth.
+
+    Słownik totals jest modyfikowany w miejscu (sumy przodków).
+
+    Args:
+        totals: Słownik ścieżka -> zajętość bezpośrednia.
+        root: Znormalizowana ścieżka roota.
+        max_depth: Maksymalna głębokość raportowanych katalogów.
+
+    Returns:
+        Słownik ścieżka -> rozmiar rekurencyjny (do max_depth pod rootem).
+    """
+    for path in sorted(totals, key=lambda p: p.count("/"), reverse=True):
+        parent = parent_of(path)
+        if path != root and parent in totals:
+            totals[parent] += totals[path]
+
+    tree = DirectoryTree(totals, root)
+    return {path: tree.sizes[node] for node, path in enumerate(tree.paths) if tree.depths[node] <= max_depth}
+
+
+def parse_tree_scan_lines(lines: Iterable[str], root: str, max_depth: int) -> tuple[dict[str, int], dict[str, int]]:
+    """
+    Parsuje wynik jednoprzebiegowego skanu drzewa (build_tree_scan_command).
+
+    Z bezpośrednich zajętości katalogów wylicza rozmiary rekurencyjne jak
+    du, ograniczone do max_depth poziomów pod rootem. Z tego samego
+    strumienia powstaje słownik stale per katalog, jak z
+    parse_stale_batch_output.
+
+    Args:
+        lines: Linie katalog<tab>zajętość<tab>stale.
+        root: Znormalizowana ścieżka roota.
+        max_depth: Maksymalna głębokość raportowanych katalogów.
+
+    Returns:
+        Krotka (ścieżka -> rozmiar rekurencyjny, ścieżka -> rozmiar stale).
+    """
+    totals: dict[str, int] = {}
+    stale: dict[str, int] = {}
+
+    for line in lines:
+        add_tree_scan_line(totals, stale, line)
+
+    return rollup_tree_scan(totals, root, max_depth), stale
 
 
 def _compute_children_sums(sizes: dict[str, int]) -> dict[str, int]:
@@ -84,7 +256,7 @@ def _compute_children_sums(sizes: dict[str, int]) -> dict[str, int]:
     """
     children_sums: dict[str, int] = {}
     for path, size in sizes.items():
-        parent = str(Path(path).parent)
+        parent = parent_of(path)
         if parent != path:
             children_sums[parent] = children_sums.get(parent, 0) + size
     return children_sums
@@ -138,59 +310,88 @@ def get_path_depth(path: str, root: str) -> int:
     return len(relative.split("/"))
 
 
+def _directory_info(tree: DirectoryTree, path: str, node: int | None, stale_size: int | None = None) -> DirectoryInfo:
+    """
+    Buduje DirectoryInfo dla ścieżki na podstawie indeksu drzewa.
+
+    Args:
+        tree: Indeks drzewa roota.
+        path: Znormalizowana ścieżka katalogu.
+        node: Identyfikator węzła (None gdy du nie zwrócił katalogu).
+        stale_size: Rozmiar stale (opcjonalnie).
+
+    Returns:
+        Informacje o katalogu.
+    """
+    total_size = tree.sizes[node] if node is not None else 0
+    direct_files_size = tree.direct_files_size(node) if node is not None and total_size > 0 else 0
+
+    return DirectoryInfo(
+        path=path,
+        total_size=total_size,
+        direct_files_size=direct_files_size,
+        file_heavy_ratio=direct_files_size / total_size if total_size > 0 else 0.0,
+        stale_size=stale_size,
+        parent_path=parent_of(path),
+        parent_total_size=tree.parent_size(path),
+        depth=tree.depth_of(path),
+    )
+
+
+def _beats_heap_min(heap: list[tuple[int, int]], key: tuple[int, int], n: int) -> bool:
+    """Czy klucz może trafić do pełnego kopca Top N (lub kopiec nie jest pełny)."""
+    return len(heap) < n or (bool(heap) and key > heap[0])
+
+
+def _push_bounded(heap: list[tuple[int, int]], key: tuple[int, int], n: int) -> None:
+    """Dodaje klucz do kopca, utrzymując co najwyżej n najlepszych elementów."""
+    if len(heap) < n:
+        heapq.heappush(heap, key)
+    else:
+        heapq.heapreplace(heap, key)
+
+
 def find_top_n_file_heavy(
     sizes: dict[str, int],
     root: str,
     n: int,
     threshold: float,
+    tree: DirectoryTree | None = None,
 ) -> list[DirectoryInfo]:
     """
     Znajduje Top N katalogów file-heavy.
 
+    Selekcja używa ograniczonego kopca krotek (rozmiar, -id węzła), więc
+    DirectoryInfo powstaje tylko dla końcowych N wyników. Przy remisie
+    wygrywa katalog wcześniejszy w wyjściu du.
+
     Args:
         sizes: Słownik wszystkich rozmiarów.
         root: Ścieżka do katalogu głównego.
         n: Liczba wyników.
         threshold: Próg file_heavy_ratio.
+        tree: Gotowy indeks drzewa roota (None = zbuduj z sizes).
 
     Returns:
         Lista Top N katalogów spełniających warunek.
     """
-    root = normalize_path(root)
-
-    children_sums = _compute_children_sums(sizes)
+    if tree is None:
+        tree = DirectoryTree(sizes, normalize_path(root))
 
-    candidates: list[DirectoryInfo] = []
+    heap: list[tuple[int, int]] = []
 
-    for path, total_size in sizes.items():
+    for node, total_size in enumerate(tree.sizes):
         if total_size == 0:
             continue
 
-        if not is_child_of(path, root):
+        key = (total_size, -node)
+        if not _beats_heap_min(heap, key, n):
             continue
 
-        direct_files_size = max(0, total_size - children_sums.get(path, 0))
-        ratio = direct_files_size / total_size
-
-        if ratio >= threshold:
-            parent_path = get_parent_path(path)
-            parent_total_size = sizes.get(parent_path)
-
-            candidates.append(
-                DirectoryInfo(
-                    path=path,
-                    total_size=total_size,
-                    direct_files_size=direct_files_size,
-                    file_heavy_ratio=ratio,
-                    parent_path=parent_path,
-                    parent_total_size=parent_total_size,
-                    depth=get_path_depth(path, root),
-                )
-            )
-
-    candidates.sort(key=lambda d: d.total_size, reverse=True)
+        if tree.direct_files_size(node) / total_size >= threshold:
+            _push_bounded(heap, key, n)
 
-    return candidates[:n]
+    return [_directory_info(tree, tree.paths[-neg_node], -neg_node) for _, neg_node in sorted(heap, reverse=True)]
 
 
 def find_top_n_by_stale(
@@ -198,53 +399,81 @@ def find_top_n_by_stale(
     sizes: dict[str, int],
     root: str,
     n: int,
+    tree: DirectoryTree | None = None,
 ) -> list[DirectoryInfo]:
     """
     Znajduje Top N katalogów z największą ilością stale plików.
 
+    Selekcja działa jak w find_top_n_file_heavy: kopiec krotek
+    (stale_size, -pozycja), DirectoryInfo tylko dla wyników.
+
     Args:
         stale_data: Słownik ścieżka -> rozmiar stale (z find output).
         sizes: Słownik wszystkich rozmiarów (z du output).
         root: Ścieżka do katalogu głównego.
         n: Liczba wyników.
+        tree: Gotowy indeks drzewa roota (None = zbuduj z sizes).
 
     Returns:
         Lista Top N katalogów posortowanych po stale_size.
     """
-    root = normalize_path(root)
-    children_sums = _compute_children_sums(sizes)
-    candidates: list[DirectoryInfo] = []
+    if tree is None:
+        tree = DirectoryTree(sizes, normalize_path(root))
 
-    for path, stale_size in stale_data.items():
+    stale_paths = list(stale_data)
+    heap: list[tuple[int, int]] = []
+
+    for position, path in enumerate(stale_paths):
+        stale_size = stale_data[path]
         if stale_size == 0:
             continue
 
-        if not is_child_of(path, root):
-            continue
+        key = (stale_size, -position)
+        if _beats_heap_min(heap, key, n) and tree.contains(path):
+            _push_bounded(heap, key, n)
+
+    results: list[DirectoryInfo] = []
+    for stale_size, neg_position in sorted(heap, reverse=True):
+        path = stale_paths[-neg_position]
+        results.append(_directory_info(tree, path, tree.find(path), stale_size))
+
+    return results
+
 
-        total_size = sizes.get(path, 0)
-        direct_files_size = max(0, total_size - children_sums.get(path, 0)) if total_size > 0 else 0
-        ratio = direct_files_size / total_size if total_size > 0 else 0.0
-
-        parent_path = get_parent_path(path)
-        parent_total_size = sizes.get(parent_path)
-
-        candidates.append(
-            DirectoryInfo(
-                path=path,
-                total_size=total_size,
-                direct_files_size=direct_files_size,
-                file_heavy_ratio=ratio,
-                stale_size=stale_size,
-                parent_path=parent_path,
-                parent_total_size=parent_total_size,
-                depth=get_path_depth(path, root),
-            )
-        )
-
-    candidates.sort(key=lambda d: d.stale_size or 0, reverse=True)
-
-    return candidates[:n]
+def attribute_stale(all_stale: dict[str, int], top_paths: Iterable[str]) -> tuple[dict[str, int], int, int]:
+    """
+    Przypisuje stale katalogów do katalogów Top N w jednym przejściu.
+
+    Dla każdej ścieżki z wyniku find sprawdzany jest łańcuch przodków
+    w zbiorze haszującym ścieżek Top N. Stale trafia do najbliższego
+    przodka (lub samego katalogu). Koszt jest liniowy względem liczby
+    wpisów stale razy głębokość, niezależnie od N.
+
+    Args:
+        all_stale: Słownik ścieżka -> rozmiar stale (znormalizowane ścieżki).
+        top_paths: Znormalizowane ścieżki katalogów Top N.
+
+    Returns:
+        Krotka (stale per katalog Top N, stale poza Top N, stale całego roota).
+    """
+    stale_results: dict[str, int] = dict.fromkeys(top_paths, 0)
+    unmatched_size = 0
+    root_stale = 0
+
+    for stale_path, stale_size in all_stale.items():
+        root_stale += stale_size
+        current = stale_path
+
+        while current not in stale_results:
+            parent = parent_of(current)
+            if parent == current:
+                unmatched_size += stale_size
+                break
+            current = parent
+        else:
+            stale_results[current] += stale_size
+
+    return stale_results, unmatched_size, root_stale
 
 
 def enrich_with_stale(
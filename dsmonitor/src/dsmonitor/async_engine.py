@@ -0,0 +1,219 @@
+"""Silnik asynchroniczny - wiele sesji SSH z jednego wątku (asyncio)."""
+
+import asyncio
+import time
+from collections.abc import Callable
+from contextlib import suppress
+
+from dsmonitor.analyzer import HostResult, RootSummary
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.executor import CommandResult, HostHealth, prepare_command
+from dsmonitor.metrics import LineMeter, ScanMetrics
+from dsmonitor.pipeline import CallStep, RootScan, ScanPlan, resolve_host_health
+from dsmonitor.scheduler import ScanJob, ScanRun
+
+STREAM_LINE_LIMIT = 1024 * 1024
+
+
+async def run_command_lines_async(
+    cmd: str | list[str],
+    host: HostProfile | None,
+    config: Config,
+    on_line: Callable[[str], None],
+    timeout: int | None = None,
+) -> CommandResult:
+    """
+    Uruchamia komendę asynchronicznie, przekazując stdout linia po linii.
+
+    Zasady wyboru shell/SSH są takie same jak w run_command. Timeout jest
+    egzekwowany przez anulowanie; proces jest wtedy zabijany.
+
+    Args:
+        cmd: Komenda do wykonania (string lub lista argumentów).
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+        on_line: Funkcja wywoływana dla każdej linii stdout (bez znaku nowej linii).
+        timeout: Timeout w sekundach (None = użyj config.timeout).
+
+    Returns:
+        Wynik wykonania komendy (stdout zawsze pusty).
+    """
+    if timeout is None:
+        timeout = config.timeout
+
+    display_cmd, args, _ = prepare_command(cmd, host, config)
+
+    if config.dry_run:
+        return CommandResult(command=display_cmd, stdout="", stderr="", return_code=0, dry_run=True)
+
+    if isinstance(args, str):
+        process = await asyncio.create_subprocess_shell(
+            args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, limit=STREAM_LINE_LIMIT
+        )
+    else:
+        process = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE, limit=STREAM_LINE_LIMIT
+        )
+
+    async def read_stdout() -> None:
+        assert process.stdout is not None
+        async for raw_line in process.stdout:
+            on_line(raw_line.decode(errors="replace").rstrip("\n"))
+
+    async def read_stderr() -> bytes:
+        assert process.stderr is not None
+        return await process.stderr.read()
+
+    try:
+        async with asyncio.timeout(timeout):
+            _, stderr, return_code = await asyncio.gather(read_stdout(), read_stderr(), process.wait())
+    except TimeoutError:
+        return CommandResult(
+            command=display_cmd,
+            stdout="",
+            stderr=f"Timeout po {timeout} sekundach",
+            return_code=-1,
+            timed_out=True,
+        )
+    finally:
+        if process.returncode is None:
+            with suppress(ProcessLookupError):
+                process.kill()
+            await process.wait()
+
+    return CommandResult(
+        command=display_cmd,
+        stdout="",
+        stderr=stderr.decode(errors="replace"),
+        return_code=return_code,
+    )
+
+
+async def run_plan_async[T](
+    plan: ScanPlan[T],
+    host: HostProfile | None,
+    config: Config,
+    health: HostHealth | None = None,
+    metrics: ScanMetrics | None = None,
+) -> T:
+    """
+    Wykonuje plan skanu asynchronicznie.
+
+    Args:
+        plan: Plan skanu (np. plan_root_scan).
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja.
+        health: Stan hosta dla bezpiecznika (None = bez bezpiecznika).
+        metrics: Metryki roota (czasy faz, liczniki) uzupełniane w miejscu.
+
+    Returns:
+        Wynik planu.
+    """
+    if metrics is None:
+        metrics = ScanMetrics()
+
+    try:
+        with metrics.phase("analysis"):
+            step = next(plan)
+        while True:
+            if isinstance(step, CallStep):
+                with metrics.phase(step.phase):
+                    result = await asyncio.to_thread(step.call)
+            elif health is not None and health.is_down:
+                metrics.count("skipped_commands")
+                result = health.fast_fail_result(step.cmd)
+            else:
+                meter = LineMeter(step.on_line) if config.collect_line_metrics else None
+                started = time.perf_counter()
+                result = await run_command_lines_async(step.cmd, host, config, meter or step.on_line)
+                metrics.record_command(step.phase, time.perf_counter() - started, meter)
+                if health is not None:
+                    health.record(result)
+            with metrics.phase("analysis"):
+                step = plan.send(result)
+    except StopIteration as stop:
+        value: T = stop.value
+        return value
+
+
+async def probe_host_async(host: HostProfile, config: Config, session_slots: asyncio.Semaphore) -> HostHealth:
+    """
+    Sprawdza osiągalność hosta (odpowiednik executor.probe_host).
+
+    Args:
+        host: Profil hosta.
+        config: Konfiguracja.
+        session_slots: Globalny limit jednoczesnych sesji.
+
+    Returns:
+        Stan hosta (niedostępny, gdy próba się nie powiodła).
+    """
+    health = HostHealth()
+    async with session_slots:
+        started = time.perf_counter()
+        result = await run_command_lines_async("true", host, config, lambda _: None, timeout=config.preflight_timeout)
+        health.probe_seconds = time.perf_counter() - started
+    health.record_probe(result)
+    return health
+
+
+async def scan_job_async(
+    job: ScanJob, config: Config, health: HostHealth | None
+) -> tuple[tuple[RootSummary, str | None], float, ScanMetrics]:
+    """
+    Skanuje jeden root hosta asynchronicznie (odpowiednik cli.scan_job).
+
+    Args:
+        job: Zadanie (host, root).
+        config: Konfiguracja.
+        health: Stan hosta (None dla trybu lokalnego).
+
+    Returns:
+        Krotka (wynik roota, czas skanu w sekundach, metryki roota).
+    """
+    with RootScan(job, config) as scan:
+        scan.outcome = await run_plan_async(scan.plan, job.host, config, health, scan.metrics)
+    return scan.result()
+
+
+async def scan_all_hosts_async(
+    config: Config, on_host: Callable[[HostResult], None] | None = None, journal: bool = True
+) -> list[HostResult]:
+    """
+    Skanuje wszystkie hosty w jednej pętli zdarzeń.
+
+    Zadania (host, root) są pobierane ze wspólnej kolejki najdłuższe
+    najpierw, jak w cli.scan_all_hosts. Liczba jednoczesnych sesji jest
+    ograniczona przez config.parallel, więc parallel może sięgać tysięcy
+    bez tworzenia wątków.
+
+    Args:
+        config: Konfiguracja.
+        on_host: Wywoływana z wynikiem hosta zaraz po zakończeniu jego rootów.
+        journal: Czy prowadzić dziennik przebiegu.
+
+    Returns:
+        Lista wyników dla wszystkich hostów (w kolejności z konfiguracji).
+    """
+    health: dict[str, HostHealth] = {}
+    if not config.local:
+        probed: dict[str, HostHealth] = {}
+        if config.preflight and not config.dry_run:
+            session_slots = asyncio.Semaphore(config.parallel)
+            probes = await asyncio.gather(*(probe_host_async(host, config, session_slots) for host in config.hosts))
+            probed = {host.name: host_health for host, host_health in zip(config.hosts, probes, strict=True)}
+        health = resolve_host_health(config, probed)
+
+    run = ScanRun(config, on_host, health, journal)
+    running: dict[asyncio.Task[tuple[tuple[RootSummary, str | None], float, ScanMetrics]], ScanJob] = {}
+
+    while run.queue or running:
+        while len(running) < config.parallel and (job := run.queue.take()) is not None:
+            running[asyncio.create_task(scan_job_async(job, config, health.get(job.host_name)))] = job
+
+        done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            job = running.pop(task)
+            run.complete(job, *task.result())
+
+    return run.finish()
@@ -0,0 +1,276 @@
+"""Cache skanów - zajętość i mtime katalogów (skan przyrostowy) oraz migawki zajętości rootów."""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from urllib.parse import quote
+
+from dsmonitor.analyzer import RootSummary, root_summary_from_dict, root_summary_to_dict
+from dsmonitor.utils import normalize_path
+
+CACHE_VERSION = 2
+HARD_LINK_PREFIX = "L\t"
+
+type DirectoryEntries = dict[str, tuple[str, int, bool]]
+
+
+def default_cache_dir() -> str:
+    """
+    Zwraca domyślny katalog cache ($XDG_CACHE_HOME/dsmonitor lub ~/.cache/dsmonitor).
+
+    Returns:
+        Ścieżka katalogu cache.
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return str(Path(base) / "dsmonitor")
+
+
+def scan_cache_path(cache_dir: str, host_name: str, root: str) -> Path:
+    """
+    Zwraca ścieżkę pliku cache dla pary (host, root).
+
+    Args:
+        cache_dir: Katalog cache.
+        host_name: Nazwa hosta.
+        root: Ścieżka roota.
+
+    Returns:
+        Ścieżka pliku JSON.
+    """
+    return Path(cache_dir) / "scan" / quote(host_name, safe="") / f"{quote(normalize_path(root), safe='')}.json"
+
+
+def load_scan_cache(path: Path, excludes: list[str]) -> DirectoryEntries:
+    """
+    Wczytuje wpisy cache: katalog -> (mtime, zajętość bezpośrednia, twarde linki).
+
+    Brakujący lub uszkodzony plik, inna wersja formatu albo inne wykluczenia
+    niż przy zapisie dają pusty cache (pełny pomiar).
+
+    Args:
+        path: Ścieżka pliku cache.
+        excludes: Bieżące wykluczenia.
+
+    Returns:
+        Słownik katalog -> (mtime, zajętość bezpośrednia, czy zawiera pliki z wieloma linkami).
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+
+    if data.get("excludes") != sorted(excludes):
+        return {}
+
+    try:
+        return {
+            directory: (str(mtime), int(size), bool(linked))
+            for directory, (mtime, size, linked) in data["directories"].items()
+        }
+    except (KeyError, TypeError, ValueError):
+        return {}
+
+
+def save_scan_cache(path: Path, root: str, excludes: list[str], entries: DirectoryEntries) -> None:
+    """
+    Zapisuje wpisy cache atomowo (plik tymczasowy + rename).
+
+    Args:
+        path: Ścieżka pliku cache.
+        root: Ścieżka roota.
+        excludes: Wykluczenia użyte przy pomiarze.
+        entries: Słownik katalog -> (mtime, zajętość bezpośrednia, twarde linki).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": CACHE_VERSION,
+        "root": normalize_path(root),
+        "excludes": sorted(excludes),
+        "directories": {directory: [mtime, size, int(linked)] for directory, (mtime, size, linked) in entries.items()},
+    }
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def add_dir_mtime_line(mtimes: dict[str, str], line: str) -> None:
+    """
+    Dodaje linię listingu katalogów (mtime<tab>katalog) do słownika.
+
+    Nieprawidłowe linie są pomijane.
+
+    Args:
+        mtimes: Słownik katalog -> mtime (uzupełniany w miejscu).
+        line: Linia wyjścia build_dir_listing_command.
+    """
+    mtime, sep, path = line.partition("\t")
+    if sep and mtime and path:
+        mtimes[normalize_path(path)] = mtime
+
+
+def split_dirty_directories(mtimes: dict[str, str], cached: DirectoryEntries) -> tuple[dict[str, int], list[str]]:
+    """
+    Dzieli katalogi na niezmienione (zajętość z cache) i do ponownego pomiaru.
+
+    Katalog jest niezmieniony, gdy jego mtime jest identyczny jak w cache.
+    mtime katalogu zmienia się przy dodaniu, usunięciu lub zmianie nazwy
+    wpisu, ale nie przy dopisaniu danych do istniejącego pliku. Katalogi
+    z plikami o wielu twardych linkach są mierzone zawsze: link w innym,
+    zmienionym katalogu nie zmienia ich mtime, a du liczy plik tylko raz.
+
+    Args:
+        mtimes: Bieżące mtime katalogów (z listingu).
+        cached: Wpisy cache z poprzedniego skanu.
+
+    Returns:
+        Krotka (katalog -> zajętość bezpośrednia z cache, katalogi do pomiaru).
+    """
+    reused: dict[str, int] = {}
+    dirty: list[str] = []
+
+    for path, mtime in mtimes.items():
+        entry = cached.get(path)
+        if entry is not None and entry[0] == mtime and not entry[2]:
+            reused[path] = entry[1]
+        else:
+            dirty.append(path)
+
+    return reused, dirty
+
+
+@dataclass(slots=True)
+class DirectSizes:
+    """
+    Zajętość bezpośrednia mierzonych katalogów (wyjście build_direct_size_command).
+
+    Plik z wieloma twardymi linkami jest liczony raz we wszystkich paczkach
+    komend - w katalogu, w którym pojawił się pierwszy.
+    """
+
+    sizes: dict[str, int] = field(default_factory=dict)
+    linked: set[str] = field(default_factory=set)
+    inodes: set[str] = field(default_factory=set)
+
+    def add_line(self, line: str) -> None:
+        """
+        Dodaje linię wyjścia komendy (zajętość<tab>katalog lub linię twardego linku).
+
+        Nieprawidłowe linie są pomijane.
+
+        Args:
+            line: Linia wyjścia build_direct_size_command.
+        """
+        if line.startswith(HARD_LINK_PREFIX):
+            parts = line.split("\t", 3)
+            if len(parts) != 4:
+                return
+            inode, size_text, path = parts[1:]
+        else:
+            inode = None
+            size_text, sep, path = line.partition("\t")
+            if not sep:
+                return
+
+        try:
+            size = int(size_text)
+        except ValueError:
+            return
+
+        directory = normalize_path(path.rstrip("\n"))
+        if inode is not None:
+            self.linked.add(directory)
+            if inode in self.inodes:
+                return
+            self.inodes.add(inode)
+        self.sizes[directory] = self.sizes.get(directory, 0) + size
+
+
+@dataclass(slots=True)
+class UsageSnapshot:
+    """Zajętość systemu plików roota przy ostatnim pełnym skanie i jego wynik."""
+
+    used: int
+    fill: float
+    timestamp: float
+    summary: RootSummary
+
+
+def usage_cache_path(cache_dir: str, host_name: str, root: str) -> Path:
+    """
+    Zwraca ścieżkę migawki zajętości dla pary (host, root).
+
+    Args:
+        cache_dir: Katalog cache.
+        host_name: Nazwa hosta.
+        root: Ścieżka roota.
+
+    Returns:
+        Ścieżka pliku JSON.
+    """
+    return Path(cache_dir) / "usage" / quote(host_name, safe="") / f"{quote(normalize_path(root), safe='')}.json"
+
+
+def load_usage_snapshot(path: Path, fingerprint: dict[str, object]) -> UsageSnapshot | None:
+    """
+    Wczytuje migawkę zajętości roota.
+
+    Brakujący lub uszkodzony plik, inna wersja formatu albo inne ustawienia
+    skanu niż przy zapisie dają None (pełny skan).
+
+    Args:
+        path: Ścieżka pliku migawki.
+        fingerprint: Bieżące ustawienia skanu (scan_fingerprint).
+
+    Returns:
+        Migawka lub None.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION or data.get("fingerprint") != fingerprint:
+        return None
+
+    try:
+        return UsageSnapshot(
+            used=int(data["used"]),
+            fill=float(data["fill"]),
+            timestamp=float(data["timestamp"]),
+            summary=root_summary_from_dict(data["summary"]),
+        )
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def save_usage_snapshot(path: Path, fingerprint: dict[str, object], snapshot: UsageSnapshot) -> None:
+    """
+    Zapisuje migawkę zajętości roota atomowo (plik tymczasowy + rename).
+
+    Args:
+        path: Ścieżka pliku migawki.
+        fingerprint: Ustawienia skanu (scan_fingerprint).
+        snapshot: Migawka.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": CACHE_VERSION,
+        "fingerprint": fingerprint,
+        "used": snapshot.used,
+        "fill": snapshot.fill,
+        "timestamp": snapshot.timestamp,
+        "summary": root_summary_to_dict(snapshot.summary),
+    }
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
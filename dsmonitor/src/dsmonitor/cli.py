@@ -1,29 +1,40 @@
 """Interfejs CLI - główny punkt wejścia."""
 
 import argparse
+import asyncio
+import signal
 import sys
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from functools import partial
 from typing import Any
 
 from dsmonitor import __version__
-from dsmonitor.analyzer import (
-    HostResult,
-    RootSummary,
-    enrich_with_stale,
-    find_top_n_by_stale,
-    find_top_n_file_heavy,
-    parse_du_output,
-)
-from dsmonitor.config import Config, HostProfile, build_config, load_yaml_config
-from dsmonitor.executor import parse_stale_batch_output, run_du, run_find_stale_batch
-from dsmonitor.reporter import generate_report, write_report
-from dsmonitor.utils import count_access_denied_errors, human_size, is_child_of, normalize_path
-
-
-def create_parser() -> argparse.ArgumentParser:
-    """Tworzy parser argumentów CLI."""
+from dsmonitor.analyzer import HostResult, RootSummary
+from dsmonitor.async_engine import scan_all_hosts_async
+from dsmonitor.config import Config, build_config, load_yaml_config
+from dsmonitor.executor import HostHealth, probe_host, ssh_multiplexing
+from dsmonitor.exporter import MetricsExporter, MetricsServer, scan_periodically
+from dsmonitor.history import HistoryStore, annotate_growth
+from dsmonitor.metrics import ScanMetrics, profiling, write_metrics
+from dsmonitor.pipeline import RootScan, resolve_host_health, run_plan
+from dsmonitor.reporter import create_report_writer, generate_report, write_report
+from dsmonitor.scheduler import ScanJob, ScanRun
+from dsmonitor.utils import parse_size
+
+
+def create_parser(serve: bool = False) -> argparse.ArgumentParser:
+    """
+    Tworzy parser argumentów CLI.
+
+    Args:
+        serve: Parser trybu serwera (dsmonitor serve) z opcjami serwera HTTP.
+    """
     parser = argparse.ArgumentParser(
-        prog="dsmonitor",
+        prog="dsmonitor serve" if serve else "dsmonitor",
         description="Narzędzie do monitorowania zajętości dysku na serwerach RHEL i AIX.",
         formatter_class=argparse.RawDescriptionHelpFormatter,
         epilog="""
@@ -39,6 +50,9 @@ Przykłady użycia:
 
   # Skan jednego hosta
   dsmonitor --host server1 --paths /data --ssh-user admin
+
+  # Eksporter Prometheus: skan co godzinę, wyniki na :9184/metrics
+  dsmonitor serve --config config.yaml --interval 3600
         """,
     )
 
@@ -55,10 +69,56 @@ Przykłady użycia:
     scan_group.add_argument(
         "--report-mode",
         "-m",
-        choices=["size", "stale"],
+        choices=["size", "stale", "growth"],
         default="size",
-        help="Tryb raportu: size (największe), stale (stare pliki)",
+        help="Tryb raportu: size (największe), stale (stare pliki), growth (tempo przyrostu)",
+    )
+    scan_group.add_argument(
+        "--scan-method",
+        choices=["du", "combined", "agent", "native"],
+        help=(
+            "Metoda skanu: du (du + osobny find stale), combined (jedno przejście find), "
+            "agent (skan na hoście), native (os.scandir w procesie, tylko --local)"
+        ),
+    )
+    scan_group.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skan przyrostowy: ponowny pomiar tylko katalogów o zmienionym mtime",
+    )
+    scan_group.add_argument(
+        "--adaptive-depth",
+        action="store_true",
+        help="Adaptacyjna głębokość: płytkie du, potem schodzenie tylko w duże poddrzewa",
+    )
+    scan_group.add_argument(
+        "--adaptive-step", type=int, metavar="K", help="Poziomy du na rundę adaptacyjną (domyślnie: 3)"
     )
+    scan_group.add_argument(
+        "--adaptive-share",
+        type=float,
+        metavar="UDZIAŁ",
+        help="Minimalny udział w rodzicu do rozwinięcia katalogu (domyślnie: 0.0)",
+    )
+    scan_group.add_argument(
+        "--approx-error",
+        type=float,
+        metavar="BŁĄD",
+        help="Skan przybliżony: próbkowanie podkatalogów do błędu względnego BŁĄD, np. 0.05 (tylko agent)",
+    )
+    scan_group.add_argument(
+        "--fill-threshold",
+        type=float,
+        metavar="UDZIAŁ",
+        help="Skanuj tylko rooty na systemach plików zapełnionych co najmniej w UDZIALE, np. 0.8 (df/statvfs)",
+    )
+    scan_group.add_argument(
+        "--usage-delta",
+        type=parse_size,
+        metavar="ROZMIAR",
+        help="Pełny skan tylko rootów, których zajętość (df) zmieniła się od ostatniego skanu o więcej niż ROZMIAR, np. 10G",
+    )
+    scan_group.add_argument("--cache-dir", metavar="KATALOG", help="Katalog cache (domyślnie: ~/.cache/dsmonitor)")
     scan_group.add_argument(
         "--file-heavy-threshold", "-t", type=float, metavar="PRÓG", help="Próg file-heavy ratio (domyślnie: 0.8)"
     )
@@ -71,27 +131,88 @@ Przykłady użycia:
         "--stale-kind", choices=["mtime", "atime", "ctime"], metavar="TYP", help="Typ czasu (domyślnie: mtime)"
     )
 
+    history_group = parser.add_argument_group("Historia")
+    history_group.add_argument(
+        "--history-db", metavar="PLIK", help="Baza historii SQLite (growth: domyślnie w katalogu cache)"
+    )
+    history_group.add_argument(
+        "--growth-days", type=int, metavar="DNI", help="Okno historii dla trybu growth (domyślnie: 30)"
+    )
+
     output_group = parser.add_argument_group("Wyjście")
-    output_group.add_argument("--format", "-f", choices=["text", "json", "csv"], help="Format wyjścia")
+    output_group.add_argument(
+        "--format", "-f", choices=["text", "json", "jsonl", "csv"], help="Format wyjścia (jsonl: linia na host)"
+    )
     output_group.add_argument("--output", "-o", metavar="PLIK", help="Plik wyjściowy (domyślnie: stdout)")
+    output_group.add_argument(
+        "--stream",
+        action="store_true",
+        help="Raport strumieniowy: sekcja hosta zapisywana zaraz po zakończeniu jego skanu",
+    )
+    output_group.add_argument("--metrics-json", metavar="PLIK", help="Metryki faz i liczniki per host/root (JSON)")
+    output_group.add_argument(
+        "--metrics-prom", metavar="PLIK", help="Metryki w formacie Prometheus (node_exporter textfile)"
+    )
+    output_group.add_argument("--profile", metavar="PLIK", help="Profil cProfile całego przebiegu (format pstats)")
+    output_group.add_argument(
+        "--trace-memory", action="store_true", help="Śledzenie alokacji (tracemalloc), podsumowanie na stderr"
+    )
 
     ssh_group = parser.add_argument_group("Opcje SSH")
     ssh_group.add_argument("--ssh-user", metavar="USER", help="Użytkownik SSH")
     ssh_group.add_argument("--ssh-port", type=int, metavar="PORT", help="Port SSH (domyślnie: 22)")
     ssh_group.add_argument("--ssh-options", metavar="OPCJE", help="Dodatkowe opcje SSH")
+    ssh_group.add_argument(
+        "--no-ssh-multiplex",
+        action="store_true",
+        help="Wyłącz współdzielone połączenia SSH (ControlMaster)",
+    )
 
     exec_group = parser.add_argument_group("Wykonanie")
+    exec_group.add_argument(
+        "--engine",
+        choices=["threads", "asyncio"],
+        help="Silnik wykonania: threads (pula wątków), asyncio (tysiące sesji z jednego wątku)",
+    )
     exec_group.add_argument("--parallel", type=int, metavar="K", help="Równoległość hostów (domyślnie: 10)")
+    exec_group.add_argument(
+        "--root-parallel", type=int, metavar="K", help="Równoległość rootów w obrębie hosta (domyślnie: 1)"
+    )
+    exec_group.add_argument("--native-workers", type=int, metavar="K", help="Wątki skanera native (domyślnie: 16)")
     exec_group.add_argument("--timeout", type=int, metavar="SEK", help="Timeout per host (domyślnie: 1800)")
+    exec_group.add_argument("--no-preflight", action="store_true", help="Bez próby połączenia z hostami przed skanem")
+    exec_group.add_argument(
+        "--preflight-timeout", type=int, metavar="SEK", help="Timeout próby połączenia (domyślnie: 30)"
+    )
+    exec_group.add_argument("--run-id", metavar="ID", help="Identyfikator przebiegu (nazwa dziennika do wznowienia)")
+    exec_group.add_argument(
+        "--resume",
+        action="store_true",
+        help="Wznów przebieg: pomiń rooty zakończone wg dziennika (--run-id lub ostatni)",
+    )
     exec_group.add_argument("--dry-run", action="store_true", help="Tylko wyświetl komendy (bez wykonania)")
     exec_group.add_argument("--verbose", "-v", action="store_true", help="Szczegółowe logi")
 
+    if serve:
+        serve_group = parser.add_argument_group("Serwer (dsmonitor serve)")
+        serve_group.add_argument(
+            "--listen", dest="serve_address", metavar="ADRES", help="Adres nasłuchu /metrics (domyślnie: 0.0.0.0)"
+        )
+        serve_group.add_argument("--port", dest="serve_port", type=int, metavar="PORT", help="Port (domyślnie: 9184)")
+        serve_group.add_argument(
+            "--interval",
+            dest="serve_interval",
+            type=int,
+            metavar="SEK",
+            help="Odstęp między startami skanów (domyślnie: 3600)",
+        )
+
     return parser
 
 
-def parse_args(args: list[str] | None = None) -> dict[str, Any]:
+def parse_args(args: list[str] | None = None, serve: bool = False) -> dict[str, Any]:
     """Parsuje argumenty CLI do słownika."""
-    parser = create_parser()
+    parser = create_parser(serve)
     parsed = parser.parse_args(args)
     return vars(parsed)
 
@@ -134,263 +255,296 @@ def load_config(cli_args: dict[str, Any]) -> Config:
     return config
 
 
-def _scan_path(
-    path: str,
-    host: HostProfile | None,
-    config: Config,
-    host_name: str,
-) -> tuple[RootSummary, str | None]:
+def scan_job(
+    job: ScanJob, config: Config, health: HostHealth | None
+) -> tuple[tuple[RootSummary, str | None], float, ScanMetrics]:
     """
-    Skanuje pojedynczą ścieżkę: du → analyze → stale.
+    Skanuje jeden root hosta (zadanie z kolejki).
 
-    W zależności od report_mode:
-    - "size": Top N największych katalogów (file-heavy)
-    - "stale": Top N katalogów z największą ilością starych plików
+    Dla hostów zdalnych działa bezpiecznik: po błędzie połączenia lub
+    timeoucie pozostałe komendy hosta kończą się od razu błędem.
 
     Args:
-        path: Ścieżka do skanowania.
-        host: Profil hosta (None dla trybu lokalnego).
+        job: Zadanie (host, root).
         config: Konfiguracja.
-        host_name: Nazwa hosta (do logowania).
+        health: Stan hosta (None dla trybu lokalnego).
 
     Returns:
-        (RootSummary, None) - sukces
-        (RootSummary z ostrzeżeniem, error_message) - błąd
+        Krotka (wynik roota, czas skanu w sekundach, metryki roota).
     """
-    du_result = run_du(path, host, config)
+    with RootScan(job, config) as scan:
+        scan.outcome = run_plan(scan.plan, job.host, config, health, scan.metrics)
+    return scan.result()
 
-    if config.dry_run:
-        print(f"[DRY-RUN] {du_result.command}")
-        return (
-            RootSummary(path=path, total_size=0, warnings=["Tryb dry-run"]),
-            None,
-        )
 
-    has_output = bool(du_result.stdout.strip())
+def probe_hosts(config: Config) -> dict[str, HostHealth]:
+    """
+    Sprawdza równolegle osiągalność wszystkich hostów przed skanem.
 
-    if not du_result.success and not has_output:
-        return (
-            RootSummary(
-                path=path,
-                total_size=0,
-                warnings=[f"Błąd du: {du_result.stderr}"],
-            ),
-            f"Błąd du dla {path}: {du_result.stderr}",
-        )
+    Hosty, które nie odpowiedziały, są skanowane z wyzwolonym
+    bezpiecznikiem, więc ich rooty od razu kończą się błędem.
 
-    sizes = parse_du_output(du_result.stdout)
-    root = normalize_path(path)
-    root_total = sizes.get(root, 0)
-    warnings: list[str] = []
+    Args:
+        config: Konfiguracja.
 
-    if du_result.stderr:
-        access_denied_count = count_access_denied_errors(du_result.stderr)
-        if access_denied_count > 0:
-            warnings.append(f"Pominięto {access_denied_count} katalogów z powodu braku dostępu")
+    Returns:
+        Słownik nazwa hosta -> stan hosta (pusty przy wyłączonej próbie lub dry-run).
+    """
+    if not config.preflight or config.dry_run:
+        return {}
 
-    if config.report_mode == "stale":
-        return _scan_path_stale_mode(path, host, config, host_name, sizes, root_total, warnings)
-    else:
-        return _scan_path_size_mode(path, host, config, host_name, sizes, root_total, warnings)
-
-
-def _scan_path_size_mode(
-    path: str,
-    host: HostProfile | None,
-    config: Config,
-    host_name: str,
-    sizes: dict[str, int],
-    root_total: int,
-    warnings: list[str],
-) -> tuple[RootSummary, str | None]:
-    """Tryb size: Top N największych katalogów file-heavy, wzbogacone o stale."""
-
-    top_dirs = find_top_n_file_heavy(sizes, path, config.top_n, config.file_heavy_threshold)
-
-    root_summary = RootSummary(
-        path=path,
-        total_size=root_total,
-        top_directories=top_dirs,
-        warnings=warnings[:10],
-    )
+    with ThreadPoolExecutor(max_workers=config.parallel) as executor:
+        probes = executor.map(partial(probe_host, config=config), config.hosts)
+        return {host.name: host_health for host, host_health in zip(config.hosts, probes, strict=True)}
 
-    if config.stale_days > 0 and root_summary.top_directories:
-        if config.verbose:
-            print(f"[{host_name}] Obliczam stale dla {path}...")
-
-        stale_batch_result = run_find_stale_batch(path, host, config)
-
-        if stale_batch_result.success:
-            all_stale = parse_stale_batch_output(stale_batch_result.stdout)
-
-            if config.verbose:
-                print(f"[{host_name}] Stale batch: {len(all_stale)} katalogów z plikami stale")
-
-            top_paths = {d.path for d in root_summary.top_directories}
-            stale_results: dict[str, int] = dict.fromkeys(top_paths, 0)
-            unmatched_size = 0
-
-            for stale_path, stale_size in all_stale.items():
-                matched = False
-                for dir_path in top_paths:
-                    if is_child_of(stale_path, dir_path):
-                        stale_results[dir_path] += stale_size
-                        matched = True
-                        break
-                if not matched:
-                    unmatched_size += stale_size
-
-            if config.verbose and unmatched_size > 0:
-                print(f"[{host_name}] Niedopasowane stale: {human_size(unmatched_size)} (poza Top N)")
-
-            root_stale = sum(all_stale.values())
-            enrich_with_stale(root_summary, stale_results, root_stale)
-        elif stale_batch_result.stderr:
-            root_summary.warnings.append(f"Błąd stale: {stale_batch_result.stderr[:100]}")
-
-    return root_summary, None
-
-
-def _scan_path_stale_mode(
-    path: str,
-    host: HostProfile | None,
-    config: Config,
-    host_name: str,
-    sizes: dict[str, int],
-    root_total: int,
-    warnings: list[str],
-) -> tuple[RootSummary, str | None]:
-    """Tryb stale: Top N katalogów z największą ilością starych plików."""
-    if config.verbose:
-        print(f"[{host_name}] Obliczam stale dla {path}...")
-
-    stale_batch_result = run_find_stale_batch(path, host, config)
-
-    if not stale_batch_result.success:
-        return (
-            RootSummary(
-                path=path,
-                total_size=root_total,
-                warnings=[*warnings, f"Błąd stale: {stale_batch_result.stderr[:100]}"],
-            ),
-            None,
+
+def scan_all_hosts(
+    config: Config, on_host: Callable[[HostResult], None] | None = None, journal: bool = True
+) -> list[HostResult]:
+    """
+    Skanuje wszystkie hosty.
+
+    Pary (host, root) wszystkich hostów trafiają do wspólnej kolejki,
+    najdłuższe (wg czasów z poprzednich przebiegów) najpierw. Pula
+    config.parallel wątków pobiera z niej zadania, z limitem root_parallel
+    jednoczesnych rootów per host.
+
+    Args:
+        config: Konfiguracja.
+        on_host: Wywoływana z wynikiem hosta zaraz po zakończeniu jego rootów.
+        journal: Czy prowadzić dziennik przebiegu.
+
+    Returns:
+        Lista wyników dla wszystkich hostów (w kolejności z konfiguracji).
+    """
+    health: dict[str, HostHealth] = {}
+    if not config.local:
+        health = resolve_host_health(config, probe_hosts(config))
+    run = ScanRun(config, on_host, health, journal)
+
+    with ThreadPoolExecutor(max_workers=config.parallel) as executor:
+        running: dict[Future[tuple[tuple[RootSummary, str | None], float, ScanMetrics]], ScanJob] = {}
+        while run.queue or running:
+            while len(running) < config.parallel and (job := run.queue.take()) is not None:
+                running[executor.submit(scan_job, job, config, health.get(job.host_name))] = job
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                job = running.pop(future)
+                run.complete(job, *future.result())
+
+    return run.finish()
+
+
+def run_scan(
+    config: Config, on_host: Callable[[HostResult], None] | None = None, journal: bool = True
+) -> list[HostResult]:
+    """
+    Skanuje hosty wybranym silnikiem (z multipleksowaniem SSH).
+
+    Args:
+        config: Konfiguracja.
+        on_host: Wywoływana z wynikiem hosta zaraz po zakończeniu jego rootów.
+        journal: Czy prowadzić dziennik przebiegu (do --resume).
+
+    Returns:
+        Lista wyników dla wszystkich hostów (w kolejności z konfiguracji).
+    """
+    with ssh_multiplexing(config):
+        if config.engine == "asyncio":
+            return asyncio.run(scan_all_hosts_async(config, on_host, journal))
+        return scan_all_hosts(config, on_host, journal)
+
+
+def stream_scan(config: Config, store: HistoryStore | None, run_metrics: ScanMetrics) -> list[HostResult]:
+    """
+    Skanuje hosty i zapisuje raport strumieniowo.
+
+    Sekcja hosta trafia do raportu (po zapisie w historii i wyliczeniu
+    przyrostu w trybie growth) zaraz po zakończeniu jego ostatniego roota,
+    więc kolejność hostów w raporcie to kolejność zakończenia skanów.
+
+    Args:
+        config: Konfiguracja.
+        store: Magazyn historii (None = bez historii).
+        run_metrics: Metryki przebiegu (fazy history i report).
+
+    Returns:
+        Lista wyników dla wszystkich hostów (w kolejności z konfiguracji).
+    """
+    with ExitStack() as stack:
+        stream = (
+            stack.enter_context(open(config.output_file, "w", encoding="utf-8")) if config.output_file else sys.stdout
         )
+        writer = create_report_writer(stream, config)
+        history_run = store.start_run() if store is not None else None
 
-    all_stale = parse_stale_batch_output(stale_batch_result.stdout)
+        def publish(host_result: HostResult) -> None:
+            if store is not None:
+                with run_metrics.phase("history"):
+                    store.record([host_result], run_id=history_run)
+                    if config.report_mode == "growth":
+                        annotate_growth([host_result], store, config.growth_days, config.top_n)
+            with run_metrics.phase("report"):
+                writer.write_host(host_result)
 
-    if config.verbose:
-        print(f"[{host_name}] Stale batch: {len(all_stale)} katalogów z plikami stale")
-
-    top_dirs = find_top_n_by_stale(all_stale, sizes, path, config.top_n)
-    root_stale = sum(all_stale.values())
-
-    return (
-        RootSummary(
-            path=path,
-            total_size=root_total,
-            stale_size=root_stale,
-            top_directories=top_dirs,
-            warnings=warnings[:10],
-        ),
-        None,
-    )
+        writer.begin()
+        results = run_scan(config, publish)
+        writer.end()
+
+    if config.output_file and config.verbose:
+        print(f"Raport zapisano do: {config.output_file}")
+
+    return results
 
 
-def scan_host(host: HostProfile | None, config: Config) -> HostResult:
+def run(config: Config) -> int:
     """
-    Skanuje pojedynczy host.
+    Wykonuje przebieg: skan, historia, raport i metryki.
 
     Args:
-        host: Profil hosta (None dla trybu lokalnego).
         config: Konfiguracja.
 
     Returns:
-        Wynik skanowania.
+        Kod wyjścia (0 = sukces).
     """
-    host_name = "localhost" if host is None else host.name
-    paths = config.paths if host is None else host.paths
+    run_metrics = ScanMetrics()
+    history_db = config.get_history_db()
+
+    with ExitStack() as stack:
+        store = stack.enter_context(HistoryStore(history_db)) if history_db and not config.dry_run else None
+
+        if config.stream:
+            with run_metrics.phase("scan"):
+                results = stream_scan(config, store, run_metrics)
+        else:
+            with run_metrics.phase("scan"):
+                results = run_scan(config)
+            if store is not None:
+                with run_metrics.phase("history"):
+                    store.record(results)
+                    if config.report_mode == "growth":
+                        annotate_growth(results, store, config.growth_days, config.top_n)
+
+            with run_metrics.phase("report"):
+                report = generate_report(results, config)
+                write_report(report, config)
+
+    if not config.dry_run:
+        write_metrics(results, run_metrics, config.metrics_json, config.metrics_prom)
 
-    result = HostResult(host_name=host_name)
+    has_errors = any(not r.success for r in results)
+    return 1 if has_errors else 0
 
-    if config.verbose:
-        print(f"[{host_name}] Rozpoczynam skanowanie...")
 
-    for path in paths:
-        if config.verbose:
-            print(f"[{host_name}] Skanuję: {path}")
+def serve_cycle(config: Config, exporter: MetricsExporter) -> None:
+    """
+    Wykonuje jeden cykl skanu trybu serwera.
 
-        root_summary, error = _scan_path(path, host, config, host_name)
+    Wynik każdego hosta trafia do eksportera (i do historii, jeśli jest
+    skonfigurowana) zaraz po zakończeniu jego rootów. Cykl nie prowadzi
+    dziennika przebiegu - nieudane rooty ponawia kolejny cykl.
 
-        if error:
-            result.success = False
-            result.errors.append(error)
+    Args:
+        config: Konfiguracja.
+        exporter: Stan eksportera.
+    """
+    started = time.monotonic()
+    history_db = config.get_history_db()
 
-        result.roots.append(root_summary)
+    with ExitStack() as stack:
+        store = stack.enter_context(HistoryStore(history_db)) if history_db else None
+        history_run = store.start_run() if store is not None else None
 
-    if config.verbose:
-        print(f"[{host_name}] Zakończono skanowanie.")
+        def publish(host_result: HostResult) -> None:
+            exporter.update(host_result)
+            if store is not None:
+                store.record([host_result], run_id=history_run)
 
-    return result
+        results = run_scan(config, publish, journal=False)
 
+    seconds = time.monotonic() - started
+    exporter.finish_cycle(seconds)
+    if config.verbose:
+        failed = sum(not result.success for result in results)
+        print(f"Cykl skanu zakończony w {seconds:.1f} s (hosty z błędami: {failed})")
 
-def scan_all_hosts(config: Config) -> list[HostResult]:
+
+def serve(config: Config) -> int:
     """
-    Skanuje wszystkie hosty.
+    Tryb serwera: cykliczne skany w tle i endpoint /metrics.
+
+    Zapytania /metrics są obsługiwane z pamięci (ostatnie wyniki rootów)
+    i nigdy nie uruchamiają skanu. Działa do SIGINT lub SIGTERM.
 
     Args:
         config: Konfiguracja.
 
     Returns:
-        Lista wyników dla wszystkich hostów.
+        Kod wyjścia (0 = sukces).
     """
-    results: list[HostResult] = []
+    if config.dry_run:
+        print("Błąd: dsmonitor serve nie obsługuje --dry-run.", file=sys.stderr)
+        return 1
+    if config.resume or config.run_id is not None:
+        print("Błąd: dsmonitor serve nie obsługuje --resume ani --run-id.", file=sys.stderr)
+        return 1
+
+    host_names = ["localhost"] if config.local else [host.name for host in config.hosts]
+    exporter = MetricsExporter(host_names)
+    try:
+        server = MetricsServer((config.serve_address, config.serve_port), exporter, config.verbose)
+    except OSError as e:
+        print(f"Błąd: nie można nasłuchiwać na {config.serve_address}:{config.serve_port}: {e}", file=sys.stderr)
+        return 1
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    scanner = threading.Thread(
+        target=scan_periodically,
+        args=(partial(serve_cycle, config, exporter), config.serve_interval, stop),
+        name="dsmonitor-scan",
+        daemon=True,
+    )
+    http_thread = threading.Thread(target=server.serve_forever, name="dsmonitor-http", daemon=True)
 
-    if config.local:
-        result = scan_host(None, config)
-        results.append(result)
-    else:
-        with ThreadPoolExecutor(max_workers=config.parallel) as executor:
-            futures = {executor.submit(scan_host, host, config): host for host in config.hosts}
-
-            for future in as_completed(futures):
-                host = futures[future]
-                try:
-                    result = future.result()
-                    results.append(result)
-                except Exception as e:
-                    error_result = HostResult(
-                        host_name=host.name,
-                        success=False,
-                        errors=[str(e)],
-                    )
-                    results.append(error_result)
+    address, port = server.server_address[:2]
+    print(f"Serwer metryk: http://{address!s}:{port}/metrics (skan co {config.serve_interval} s)", file=sys.stderr)
+    scanner.start()
+    http_thread.start()
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        stop.set()
+    finally:
+        server.shutdown()
+        server.server_close()
 
-    return results
+    return 0
 
 
 def main(args: list[str] | None = None) -> int:
     """
     Główna funkcja programu.
 
+    Pierwszy argument serve uruchamia tryb serwera (eksporter Prometheus).
+
     Args:
         args: Argumenty CLI (None = sys.argv).
 
     Returns:
         Kod wyjścia (0 = sukces).
     """
-    cli_args = parse_args(args)
+    argv = sys.argv[1:] if args is None else args
+    serve_mode = argv[:1] == ["serve"]
+    cli_args = parse_args(argv[1:] if serve_mode else argv, serve_mode)
     config = load_config(cli_args)
 
     if config.verbose:
         print(f"Konfiguracja załadowana. Hostów: {len(config.hosts)}, Tryb lokalny: {config.local}")
 
-    results = scan_all_hosts(config)
-
-    report = generate_report(results, config)
-    write_report(report, config)
-
-    has_errors = any(not r.success for r in results)
-    return 1 if has_errors else 0
+    with profiling(config.profile, config.trace_memory):
+        return serve(config) if serve_mode else run(config)
 
 
 if __name__ == "__main__":
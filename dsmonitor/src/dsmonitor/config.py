@@ -1,11 +1,15 @@
 """Moduł konfiguracji - ładowanie YAML i merge z CLI."""
 
+import os
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any
 
 import yaml
 
+from dsmonitor.cache import default_cache_dir
+from dsmonitor.utils import parse_size
+
 
 @dataclass
 class HostProfile:
@@ -20,6 +24,8 @@ class HostProfile:
     ssh_host: str | None = None
     du_command: str | None = None
     find_command: str | None = None
+    python_command: str | None = None
+    root_parallel: int | None = None
 
     def get_scan_depth(self, default: int) -> int:
         """Zwraca głębokość skanowania dla hosta lub wartość domyślną."""
@@ -45,6 +51,14 @@ class HostProfile:
         """Zwraca ścieżkę do komendy find dla hosta lub wartość domyślną."""
         return self.find_command if self.find_command is not None else default
 
+    def get_python_command(self, default: str) -> str:
+        """Zwraca ścieżkę do interpretera Pythona (agent) dla hosta lub wartość domyślną."""
+        return self.python_command if self.python_command is not None else default
+
+    def get_root_parallel(self, default: int) -> int:
+        """Zwraca równoległość rootów dla hosta lub wartość domyślną."""
+        return self.root_parallel if self.root_parallel is not None else default
+
 
 @dataclass
 class Config:
@@ -54,15 +68,38 @@ class Config:
     paths: list[str] = field(default_factory=list)
     top_n: int = 20
     report_mode: str = "size"
+    history_db: str | None = None
+    growth_days: int = 30
+    scan_method: str = "du"
+    incremental: bool = False
+    adaptive_depth: bool = False
+    adaptive_step: int = 3
+    adaptive_share: float = 0.0
+    approx_error: float | None = None
+    fill_threshold: float | None = None
+    usage_delta: int | None = None
+    cache_dir: str = field(default_factory=default_cache_dir)
     file_heavy_threshold: float = 0.8
     scan_depth: int = 20
     stale_days: int = 365
     stale_kind: str = "mtime"
     excludes: list[str] = field(default_factory=list)
+    engine: str = "threads"
     parallel: int = 10
+    root_parallel: int = 1
+    native_workers: int = 16
     timeout: int = 1800
+    run_id: str | None = None
+    resume: bool = False
+    preflight: bool = True
+    preflight_timeout: int = 30
     output_format: str = "text"
     output_file: str | None = None
+    stream: bool = False
+    metrics_json: str | None = None
+    metrics_prom: str | None = None
+    profile: str | None = None
+    trace_memory: bool = False
     dry_run: bool = False
     verbose: bool = False
     local: bool = False
@@ -70,7 +107,25 @@ class Config:
     ssh_port: int = 22
     du_command: str = "du"
     find_command: str = "find"
+    python_command: str = "python3"
     ssh_options: str = "-o BatchMode=yes -o ConnectTimeout=10 -o StrictHostKeyChecking=accept-new"
+    ssh_multiplex: bool = True
+    ssh_control_persist: int = 300
+    ssh_control_dir: str | None = None
+    serve_address: str = "0.0.0.0"
+    serve_port: int = 9184
+    serve_interval: int = 3600
+
+    @property
+    def collect_line_metrics(self) -> bool:
+        """Czy mierzyć obsługę linii stdout (liczba linii, bajtów, czas parse) - przy eksporcie metryk lub verbose."""
+        return bool(self.metrics_json or self.metrics_prom or self.verbose)
+
+    def get_history_db(self) -> str | None:
+        """Zwraca ścieżkę bazy historii (w trybie growth domyślnie w katalogu cache)."""
+        if self.history_db is None and self.report_mode == "growth":
+            return str(Path(self.cache_dir) / "history.sqlite")
+        return self.history_db
 
     def validate(self) -> list[str]:
         """
@@ -107,18 +162,76 @@ class Config:
         if self.stale_kind not in ("mtime", "atime", "ctime"):
             errors.append("--stale-kind musi być: mtime, atime lub ctime.")
 
-        if self.report_mode not in ("size", "stale"):
-            errors.append("--report-mode musi być: size lub stale.")
+        if self.report_mode not in ("size", "stale", "growth"):
+            errors.append("--report-mode musi być: size, stale lub growth.")
+
+        if self.growth_days < 1:
+            errors.append("--growth-days musi być >= 1.")
+
+        if self.scan_method not in ("du", "combined", "agent", "native"):
+            errors.append("--scan-method musi być: du, combined, agent lub native.")
+
+        if self.scan_method == "native" and not self.local:
+            errors.append("--scan-method native działa tylko w trybie lokalnym (--local).")
+
+        if self.native_workers < 1:
+            errors.append("--native-workers musi być >= 1.")
+
+        if self.adaptive_step < 1:
+            errors.append("--adaptive-step musi być >= 1.")
+
+        if not 0.0 <= self.adaptive_share <= 1.0:
+            errors.append("--adaptive-share musi być w zakresie 0.0-1.0.")
+
+        if self.adaptive_depth and (self.scan_method != "du" or self.incremental):
+            errors.append("--adaptive-depth działa tylko z --scan-method du (bez --incremental).")
+
+        if self.approx_error is not None and not 0.0 < self.approx_error < 1.0:
+            errors.append("--approx-error musi być w zakresie (0.0, 1.0).")
+
+        if self.approx_error is not None and self.scan_method != "agent":
+            errors.append("--approx-error działa tylko z --scan-method agent.")
+
+        if self.fill_threshold is not None and not 0.0 <= self.fill_threshold <= 1.0:
+            errors.append("--fill-threshold musi być w zakresie 0.0-1.0.")
 
-        if self.output_format not in ("text", "json", "csv"):
-            errors.append("--format musi być: text, json lub csv.")
+        if self.usage_delta is not None and self.usage_delta < 0:
+            errors.append("--usage-delta musi być >= 0.")
+
+        if self.incremental and self.scan_method != "du":
+            errors.append("--incremental działa tylko z --scan-method du.")
+
+        if self.output_format not in ("text", "json", "jsonl", "csv"):
+            errors.append("--format musi być: text, json, jsonl lub csv.")
+
+        if self.engine not in ("threads", "asyncio"):
+            errors.append("--engine musi być: threads lub asyncio.")
 
         if self.parallel < 1:
             errors.append("--parallel musi być >= 1.")
 
+        if self.root_parallel < 1:
+            errors.append("--root-parallel musi być >= 1.")
+
+        for host in self.hosts:
+            if host.root_parallel is not None and host.root_parallel < 1:
+                errors.append(f"Host {host.name}: root_parallel musi być >= 1.")
+
         if self.timeout < 1:
             errors.append("--timeout musi być >= 1.")
 
+        if self.preflight_timeout < 1:
+            errors.append("--preflight-timeout musi być >= 1.")
+
+        if not 0 <= self.serve_port <= 65535:
+            errors.append("--port musi być w zakresie 0-65535.")
+
+        if self.serve_interval < 1:
+            errors.append("--interval musi być >= 1.")
+
+        if self.ssh_control_persist < 0:
+            errors.append("ssh control_persist musi być >= 0.")
+
         dangerous_patterns = ["`", "$", "&&", "||", ";", "|", ">", "<"]
         for pattern in dangerous_patterns:
             if pattern in self.ssh_options:
@@ -169,6 +282,7 @@ def build_config(yaml_config: dict[str, Any] | None, cli_args: dict[str, Any]) -
     yaml_config = yaml_config or {}
     defaults = yaml_config.get("defaults", {})
     ssh_config = yaml_config.get("ssh", {})
+    serve_config = yaml_config.get("serve", {})
     yaml_hosts = yaml_config.get("hosts", [])
 
     hosts: list[HostProfile] = []
@@ -183,6 +297,8 @@ def build_config(yaml_config: dict[str, Any] | None, cli_args: dict[str, Any]) -
             ssh_host=host_data.get("ssh_host"),
             du_command=host_data.get("du_command"),
             find_command=host_data.get("find_command"),
+            python_command=host_data.get("python_command"),
+            root_parallel=host_data.get("root_parallel"),
         )
         hosts.append(host)
 
@@ -214,26 +330,63 @@ def build_config(yaml_config: dict[str, Any] | None, cli_args: dict[str, Any]) -
             return cli_args[key]
         return defaults.get(key, default)
 
+    def get_serve_value(key: str, yaml_key: str, default: Any) -> Any:
+        """Pobiera ustawienie serwera: CLI > YAML serve > default."""
+        if cli_args.get(key) is not None:
+            return cli_args[key]
+        return serve_config.get(yaml_key, default)
+
+    usage_delta = get_value("usage_delta", None)
+
     return Config(
         hosts=hosts,
         paths=paths,
         top_n=get_value("top_n", 20),
         report_mode=get_value("report_mode", "size"),
+        history_db=get_value("history_db", None),
+        growth_days=get_value("growth_days", 30),
+        scan_method=get_value("scan_method", "du"),
+        incremental=cli_args.get("incremental") or defaults.get("incremental", False),
+        adaptive_depth=cli_args.get("adaptive_depth") or defaults.get("adaptive_depth", False),
+        adaptive_step=get_value("adaptive_step", 3),
+        adaptive_share=get_value("adaptive_share", 0.0),
+        approx_error=get_value("approx_error", None),
+        fill_threshold=get_value("fill_threshold", None),
+        usage_delta=parse_size(usage_delta) if usage_delta is not None else None,
+        cache_dir=os.path.expanduser(get_value("cache_dir", None) or default_cache_dir()),
         file_heavy_threshold=get_value("file_heavy_threshold", 0.8),
         scan_depth=get_value("scan_depth", 20),
         stale_days=get_value("stale_days", 365),
         stale_kind=get_value("stale_kind", "mtime"),
         excludes=global_excludes,
+        engine=get_value("engine", "threads"),
         parallel=get_value("parallel", 10),
+        root_parallel=get_value("root_parallel", 1),
+        native_workers=get_value("native_workers", 16),
         timeout=get_value("timeout", 1800),
+        run_id=cli_args.get("run_id"),
+        resume=cli_args.get("resume") or False,
+        preflight=not cli_args.get("no_preflight") and defaults.get("preflight", True),
+        preflight_timeout=get_value("preflight_timeout", 30),
         output_format=cli_args.get("format") or defaults.get("format") or "text",
         output_file=cli_args.get("output"),
+        stream=cli_args.get("stream") or defaults.get("stream", False),
+        metrics_json=get_value("metrics_json", None),
+        metrics_prom=get_value("metrics_prom", None),
+        profile=cli_args.get("profile"),
+        trace_memory=cli_args.get("trace_memory") or False,
         dry_run=get_value("dry_run", False),
         verbose=get_value("verbose", False),
         local=get_value("local", False),
         ssh_user=cli_args.get("ssh_user") or ssh_config.get("user"),
         ssh_port=cli_args.get("ssh_port") or ssh_config.get("port", 22),
         ssh_options=cli_args.get("ssh_options") or ssh_config.get("options", Config.ssh_options),
+        ssh_multiplex=not cli_args.get("no_ssh_multiplex") and ssh_config.get("multiplex", True),
+        ssh_control_persist=ssh_config.get("control_persist", Config.ssh_control_persist),
         du_command=get_value("du_command", "du"),
         find_command=get_value("find_command", "find"),
+        python_command=get_value("python_command", "python3"),
+        serve_address=get_serve_value("serve_address", "listen", Config.serve_address),
+        serve_port=get_serve_value("serve_port", "port", Config.serve_port),
+        serve_interval=get_serve_value("serve_interval", "interval", Config.serve_interval),
     )
@@ -1,15 +1,32 @@
 """Moduł wykonywania komend - lokalne i przez SSH."""
 
+import base64
+import os
 import shlex
+import shutil
 import subprocess
+import tempfile
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from functools import cache
+from pathlib import Path
+from types import TracebackType
+from typing import IO, TYPE_CHECKING
 
+from dsmonitor import agent
 from dsmonitor.utils import normalize_path
 
 if TYPE_CHECKING:
     from dsmonitor.config import Config, HostProfile
 
+PATH_BATCH_CHARS = 64 * 1024
+SSH_CONNECTION_ERROR = 255
+SSH_EXIT_TIMEOUT = 10
+
 
 @dataclass
 class CommandResult:
@@ -28,14 +45,69 @@ class CommandResult:
         return self.return_code == 0 and not self.timed_out
 
 
+class HostHealth:
+    """
+    Stan hosta dla bezpiecznika (circuit breaker).
+
+    Po pierwszym błędzie połączenia SSH (kod 255) lub timeoucie komendy
+    host jest oznaczany jako niedostępny, a kolejne komendy hosta kończą
+    się od razu błędem zamiast czekać na ConnectTimeout lub timeout.
+    Bezpieczny dla wątków.
+    """
+
+    def __init__(self) -> None:
+        """Tworzy stan hosta dostępnego."""
+        self._lock = threading.Lock()
+        self.failure: str | None = None
+        self.probe_seconds: float | None = None
+
+    @property
+    def is_down(self) -> bool:
+        """Czy host został oznaczony jako niedostępny."""
+        return self.failure is not None
+
+    def trip(self, reason: str) -> None:
+        """Oznacza host jako niedostępny (zapamiętywana jest pierwsza przyczyna)."""
+        with self._lock:
+            if self.failure is None:
+                self.failure = reason
+
+    def record(self, result: CommandResult) -> None:
+        """Aktualizuje stan po wykonaniu komendy hosta."""
+        if result.timed_out or result.return_code == SSH_CONNECTION_ERROR:
+            self.trip(_failure_reason(result))
+
+    def record_probe(self, result: CommandResult) -> None:
+        """Aktualizuje stan po próbie połączenia (każdy błąd oznacza niedostępność)."""
+        if not result.success and not result.dry_run:
+            self.trip(_failure_reason(result))
+
+    def fast_fail_result(self, cmd: str | list[str]) -> CommandResult:
+        """Zwraca wynik komendy pominiętej z powodu niedostępności hosta."""
+        return CommandResult(
+            command=shlex.join(cmd) if isinstance(cmd, list) else cmd,
+            stdout="",
+            stderr=f"Host niedostępny, komenda pominięta ({self.failure})",
+            return_code=SSH_CONNECTION_ERROR,
+        )
+
+
+def _failure_reason(result: CommandResult) -> str:
+    """Zwraca pierwszą niepustą linię stderr lub kod wyjścia."""
+    for line in result.stderr.splitlines():
+        if line.strip():
+            return line.strip()
+    return f"kod wyjścia {result.return_code}"
+
+
 def build_du_command_args(
-    path: str, depth: int, excludes: list[str], one_filesystem: bool = True, du_command: str = "du"
+    path: str | list[str], depth: int, excludes: list[str], one_filesystem: bool = True, du_command: str = "du"
 ) -> list[str]:
     """
     Buduje komendę du jako listę argumentów (dla shell=False).
 
     Args:
-        path: Ścieżka do skanowania.
+        path: Ścieżka do skanowania (lub lista ścieżek dla jednego wywołania du).
         depth: Maksymalna głębokość.
         excludes: Lista wzorców do wykluczenia.
         one_filesystem: Czy ograniczyć do jednego systemu plików.
@@ -54,22 +126,34 @@ def build_du_command_args(
     for pattern in excludes:
         cmd_args.append(f"--exclude={pattern}")
 
-    cmd_args.append(path)
+    if isinstance(path, str):
+        cmd_args.append(path)
+    else:
+        cmd_args.extend(path)
 
     return cmd_args
 
 
-def build_ssh_command_args(host: "HostProfile", remote_cmd: str, config: "Config") -> list[str]:
+def _has_control_option(ssh_options: str) -> bool:
+    """Czy opcje SSH użytkownika same ustawiają multipleksowanie."""
+    lowered = ssh_options.lower()
+    return "controlmaster" in lowered or "controlpath" in lowered
+
+
+def _build_ssh_base_args(host: "HostProfile", config: "Config") -> list[str]:
     """
-    Buduje komendę SSH jako listę argumentów.
+    Buduje argumenty SSH bez komendy zdalnej (cel jest ostatnim elementem).
+
+    Gdy aktywne jest multipleksowanie (config.ssh_control_dir), dodaje
+    opcje ControlMaster/ControlPath/ControlPersist, chyba że użytkownik
+    ustawił je sam w ssh_options.
 
     Args:
         host: Profil hosta.
-        remote_cmd: Komenda do wykonania na zdalnym hoście.
         config: Konfiguracja globalna.
 
     Returns:
-        Lista argumentów komendy SSH.
+        Lista argumentów komendy SSH zakończona celem (user@host).
     """
     ssh_args = ["ssh"]
 
@@ -80,6 +164,18 @@ def build_ssh_command_args(host: "HostProfile", remote_cmd: str, config: "Config
     if config.ssh_options:
         ssh_args.extend(shlex.split(config.ssh_options))
 
+    if config.ssh_control_dir and not _has_control_option(config.ssh_options):
+        ssh_args.extend(
+            [
+                "-o",
+                "ControlMaster=auto",
+                "-o",
+                f"ControlPath={config.ssh_control_dir}/%C",
+                "-o",
+                f"ControlPersist={config.ssh_control_persist}",
+            ]
+        )
+
     ssh_args.extend(["-p", str(ssh_port)])
 
     if ssh_user:
@@ -87,11 +183,92 @@ def build_ssh_command_args(host: "HostProfile", remote_cmd: str, config: "Config
     else:
         ssh_args.append(ssh_host)
 
-    ssh_args.append(remote_cmd)
-
     return ssh_args
 
 
+def build_ssh_command_args(host: "HostProfile", remote_cmd: str, config: "Config") -> list[str]:
+    """
+    Buduje komendę SSH jako listę argumentów.
+
+    Args:
+        host: Profil hosta.
+        remote_cmd: Komenda do wykonania na zdalnym hoście.
+        config: Konfiguracja globalna.
+
+    Returns:
+        Lista argumentów komendy SSH.
+    """
+    return [*_build_ssh_base_args(host, config), remote_cmd]
+
+
+def _close_control_masters(config: "Config") -> None:
+    """
+    Zamyka połączenia główne SSH wszystkich hostów (ssh -O exit).
+
+    Komendy są uruchamiane jednocześnie i mają wspólny limit
+    SSH_EXIT_TIMEOUT, więc zawieszone hosty nie wydłużają zamykania
+    proporcjonalnie do swojej liczby. Komenda, która nie zakończy się
+    w limicie, jest zabijana.
+
+    Args:
+        config: Konfiguracja globalna (z ustawionym ssh_control_dir).
+    """
+    processes: list[subprocess.Popen[bytes]] = []
+    for host in config.hosts:
+        base_args = _build_ssh_base_args(host, config)
+        with suppress(OSError):
+            processes.append(
+                subprocess.Popen(
+                    [*base_args[:-1], "-O", "exit", base_args[-1]],
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+            )
+
+    deadline = time.monotonic() + SSH_EXIT_TIMEOUT
+    for process in processes:
+        try:
+            process.wait(timeout=max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+@contextmanager
+def ssh_multiplexing(config: "Config") -> Iterator[None]:
+    """
+    Utrzymuje współdzielone połączenia SSH (ControlMaster) na czas bloku.
+
+    Pierwsza komenda dla hosta zestawia połączenie główne, kolejne korzystają
+    z niego bez ponownego handshake'u. Na wyjściu połączenia są zamykane
+    (ssh -O exit, równolegle dla wszystkich hostów), a katalog gniazd usuwany. Nic nie robi w trybie lokalnym,
+    dry-run, przy wyłączonym ssh_multiplex lub gdy ssh_options same
+    ustawiają ControlMaster/ControlPath.
+
+    Args:
+        config: Konfiguracja globalna (ustawiane jest config.ssh_control_dir).
+
+    Yields:
+        None.
+    """
+    if config.local or config.dry_run or not config.ssh_multiplex or _has_control_option(config.ssh_options):
+        yield
+        return
+
+    control_dir = tempfile.mkdtemp(prefix="dsmonitor-ssh-")
+    config.ssh_control_dir = control_dir
+
+    try:
+        yield
+    finally:
+        if os.listdir(control_dir):
+            _close_control_masters(config)
+
+        config.ssh_control_dir = None
+        shutil.rmtree(control_dir, ignore_errors=True)
+
+
 def build_ssh_command(host: "HostProfile", remote_cmd: str, config: "Config") -> str:
     """
     Buduje komendę SSH jako string (do wyświetlania).
@@ -109,6 +286,31 @@ def build_ssh_command(host: "HostProfile", remote_cmd: str, config: "Config") ->
     return " ".join(args_quoted)
 
 
+def prepare_command(
+    cmd: str | list[str],
+    host: "HostProfile | None",
+    config: "Config",
+) -> tuple[str, str | list[str], bool]:
+    """
+    Przygotowuje komendę do uruchomienia lokalnie lub przez SSH.
+
+    Args:
+        cmd: Komenda do wykonania (string lub lista argumentów).
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+
+    Returns:
+        Krotka (komenda do wyświetlenia, argumenty procesu, czy użyć shell).
+    """
+    is_ssh = host is not None and not config.local
+    cmd_str = shlex.join(cmd) if isinstance(cmd, list) else cmd
+
+    if is_ssh and host is not None:
+        return build_ssh_command(host, cmd_str, config), build_ssh_command_args(host, cmd_str, config), False
+
+    return cmd_str, cmd, isinstance(cmd, str)
+
+
 def run_command(
     cmd: str | list[str],
     host: "HostProfile | None",
@@ -134,9 +336,7 @@ def run_command(
     if timeout is None:
         timeout = config.timeout
 
-    is_ssh = host is not None and not config.local
-    cmd_str = shlex.join(cmd) if isinstance(cmd, list) else cmd
-    display_cmd = build_ssh_command(host, cmd_str, config) if is_ssh and host else cmd_str
+    display_cmd, args, use_shell = prepare_command(cmd, host, config)
 
     if config.dry_run:
         return CommandResult(
@@ -148,25 +348,13 @@ def run_command(
         )
 
     try:
-        if is_ssh:
-            assert host is not None
-            ssh_args = build_ssh_command_args(host, cmd_str, config)
-            result = subprocess.run(
-                ssh_args,
-                shell=False,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-        else:
-            use_shell = isinstance(cmd, str)
-            result = subprocess.run(
-                cmd,
-                shell=use_shell,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
+        result = subprocess.run(
+            args,
+            shell=use_shell,
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
 
         return CommandResult(
             command=display_cmd,
@@ -185,15 +373,189 @@ def run_command(
         )
 
 
-def run_du(
+def probe_host(host: "HostProfile", config: "Config") -> HostHealth:
+    """
+    Sprawdza osiągalność hosta krótką komendą przez SSH.
+
+    Przy włączonym multipleksowaniu próba zestawia też połączenie główne,
+    z którego korzystają późniejsze skany.
+
+    Args:
+        host: Profil hosta.
+        config: Konfiguracja globalna.
+
+    Returns:
+        Stan hosta (niedostępny, gdy próba się nie powiodła).
+    """
+    health = HostHealth()
+    started = time.perf_counter()
+    health.record_probe(run_command("true", host, config, timeout=config.preflight_timeout))
+    health.probe_seconds = time.perf_counter() - started
+    return health
+
+
+class CommandStream:
+    """
+    Strumień wyjścia komendy uruchomionej w tle.
+
+    stdout jest udostępniany linia po linii w trakcie działania procesu,
+    a stderr trafia do pliku tymczasowego, żeby nie blokować potoku.
+    Po wyczerpaniu iteratora metoda result() zwraca CommandResult
+    z pustym stdout.
+    """
+
+    def __init__(self, command: str, args: str | list[str] | None, use_shell: bool, timeout: int) -> None:
+        """
+        Uruchamia proces (lub tworzy pusty strumień dla dry-run).
+
+        Args:
+            command: Komenda do wyświetlenia.
+            args: Argumenty procesu (None = dry-run, bez uruchamiania).
+            use_shell: Czy uruchomić przez shell.
+            timeout: Timeout w sekundach dla całego procesu.
+        """
+        self.command = command
+        self.timeout = timeout
+        self._timed_out = False
+        self._result: CommandResult | None = None
+        self._process: subprocess.Popen[str] | None = None
+        self._stderr_file: IO[str] | None = None
+        self._timer: threading.Timer | None = None
+
+        if args is None:
+            return
+
+        self._stderr_file = tempfile.TemporaryFile(mode="w+", encoding="utf-8", errors="replace")  # noqa: SIM115
+        self._process = subprocess.Popen(
+            args,
+            shell=use_shell,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr_file,
+            text=True,
+        )
+        self._timer = threading.Timer(timeout, self._kill_on_timeout)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _kill_on_timeout(self) -> None:
+        """Zabija proces po przekroczeniu timeoutu."""
+        if self._process is not None and self._process.poll() is None:
+            self._timed_out = True
+            self._process.kill()
+
+    def __iter__(self) -> Iterator[str]:
+        """Zwraca kolejne linie stdout (bez znaku nowej linii)."""
+        if self._process is None or self._process.stdout is None:
+            return
+        for line in self._process.stdout:
+            yield line.rstrip("\n")
+
+    def result(self) -> CommandResult:
+        """
+        Czeka na zakończenie procesu i zwraca jego wynik.
+
+        Niewczytana część stdout jest odrzucana.
+
+        Returns:
+            Wynik wykonania komendy (stdout zawsze pusty).
+        """
+        if self._result is not None:
+            return self._result
+
+        if self._process is None:
+            self._result = CommandResult(command=self.command, stdout="", stderr="", return_code=0, dry_run=True)
+            return self._result
+
+        if self._process.stdout is not None:
+            for _ in self._process.stdout:
+                pass
+            self._process.stdout.close()
+
+        return_code = self._process.wait()
+        if self._timer is not None:
+            self._timer.cancel()
+
+        stderr = ""
+        if self._stderr_file is not None:
+            self._stderr_file.seek(0)
+            stderr = self._stderr_file.read()
+            self._stderr_file.close()
+
+        if self._timed_out:
+            self._result = CommandResult(
+                command=self.command,
+                stdout="",
+                stderr=f"Timeout po {self.timeout} sekundach",
+                return_code=-1,
+                timed_out=True,
+            )
+        else:
+            self._result = CommandResult(command=self.command, stdout="", stderr=stderr, return_code=return_code)
+
+        return self._result
+
+    def close(self) -> None:
+        """Przerywa proces, jeśli nadal działa, i zwalnia zasoby."""
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+        self.result()
+
+    def __enter__(self) -> "CommandStream":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def stream_command(
+    cmd: str | list[str],
+    host: "HostProfile | None",
+    config: "Config",
+    timeout: int | None = None,
+) -> CommandStream:
+    """
+    Uruchamia komendę w tle i zwraca strumień jej wyjścia.
+
+    Zasady wyboru shell/SSH są takie same jak w run_command.
+
+    Args:
+        cmd: Komenda do wykonania (string lub lista argumentów).
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+        timeout: Timeout w sekundach (None = użyj config.timeout).
+
+    Returns:
+        Strumień wyjścia komendy.
+    """
+    if timeout is None:
+        timeout = config.timeout
+
+    display_cmd, args, use_shell = prepare_command(cmd, host, config)
+    return CommandStream(display_cmd, None if config.dry_run else args, use_shell, timeout)
+
+
+def get_excludes(host: "HostProfile | None", config: "Config") -> list[str]:
+    """Zwraca wykluczenia globalne uzupełnione o wykluczenia hosta."""
+    all_excludes = list(config.excludes)
+    if host:
+        all_excludes.extend(host.excludes)
+    return all_excludes
+
+
+def build_host_du_args(
     path: str,
     host: "HostProfile | None",
     config: "Config",
     depth: int | None = None,
     excludes: list[str] | None = None,
-) -> CommandResult:
+) -> list[str]:
     """
-    Uruchamia komendę du dla podanej ścieżki.
+    Buduje argumenty du z uwzględnieniem ustawień hosta i konfiguracji.
 
     Args:
         path: Ścieżka do skanowania.
@@ -203,20 +565,43 @@ def run_du(
         excludes: Wykluczenia (None = użyj config).
 
     Returns:
-        Wynik wykonania komendy du.
+        Lista argumentów komendy du.
     """
     if depth is None:
         depth = host.get_scan_depth(config.scan_depth) if host else config.scan_depth
 
     if excludes is None:
-        all_excludes = list(config.excludes)
-        if host:
-            all_excludes.extend(host.excludes)
-        excludes = all_excludes
+        excludes = get_excludes(host, config)
 
     du_command = host.get_du_command(config.du_command) if host else config.du_command
-    du_cmd = build_du_command_args(path, depth, excludes, du_command=du_command)
-    return run_command(du_cmd, host, config)
+    return build_du_command_args(path, depth, excludes, du_command=du_command)
+
+
+def build_host_du_batch_args(
+    paths: list[str],
+    host: "HostProfile | None",
+    config: "Config",
+    depth: int,
+    max_chars: int = PATH_BATCH_CHARS,
+) -> list[list[str]]:
+    """
+    Buduje komendy du dla wielu katalogów naraz (paczkami wg długości ścieżek).
+
+    Args:
+        paths: Katalogi do skanowania.
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+        depth: Głębokość du liczona od każdego katalogu.
+        max_chars: Maksymalna łączna długość ścieżek w jednej komendzie.
+
+    Returns:
+        Lista komend du (pusta, gdy brak katalogów).
+    """
+    du_command = host.get_du_command(config.du_command) if host else config.du_command
+    excludes = get_excludes(host, config)
+    return [
+        build_du_command_args(batch, depth, excludes, du_command=du_command) for batch in _batch_paths(paths, max_chars)
+    ]
 
 
 def build_find_stale_batch_command(root_path: str, days: int, kind: str = "mtime", find_command: str = "find") -> str:
@@ -245,18 +630,15 @@ def build_find_stale_batch_command(root_path: str, days: int, kind: str = "mtime
     return cmd
 
 
-def run_find_stale_batch(
+def build_host_find_stale_batch_command(
     root_path: str,
     host: "HostProfile | None",
     config: "Config",
     days: int | None = None,
     kind: str | None = None,
-) -> CommandResult:
+) -> str:
     """
-    Uruchamia komendę find do obliczenia stale_size dla całego roota.
-
-    Skanuje cały root_path i grupuje wyniki per katalog.
-    Filtrowanie do konkretnych ścieżek odbywa się po stronie wywołującego.
+    Buduje komendę find stale z uwzględnieniem ustawień hosta i konfiguracji.
 
     Args:
         root_path: Główna ścieżka (root) do skanowania.
@@ -266,7 +648,7 @@ def run_find_stale_batch(
         kind: Typ czasu (None = użyj config).
 
     Returns:
-        Wynik wykonania komendy find.
+        Komenda find jako string.
     """
     if days is None:
         days = config.stale_days
@@ -275,8 +657,376 @@ def run_find_stale_batch(
         kind = config.stale_kind
 
     find_command = host.get_find_command(config.find_command) if host else config.find_command
-    find_cmd = build_find_stale_batch_command(root_path, days, kind, find_command)
-    return run_command(find_cmd, host, config)
+    return build_find_stale_batch_command(root_path, days, kind, find_command)
+
+
+def _build_find_prune(excludes: list[str] | None) -> str:
+    """
+    Buduje fragment find pomijający wykluczone ścieżki (jak --exclude w du).
+
+    Args:
+        excludes: Wzorce do wykluczenia.
+
+    Returns:
+        Fragment "\\( ... \\) -prune -o " lub pusty string.
+    """
+    if not excludes:
+        return ""
+
+    tests: list[str] = []
+    for pattern in excludes:
+        quoted = shlex.quote(pattern)
+        tests.append(f"-path {quoted}" if "/" in pattern else f"-path {quoted} -o -name {quoted}")
+    return f"\\( {' -o '.join(tests)} \\) -prune -o "
+
+
+def build_tree_scan_command(
+    root_path: str,
+    days: int,
+    kind: str = "mtime",
+    excludes: list[str] | None = None,
+    find_command: str = "find",
+) -> str:
+    """
+    Buduje komendę jednoprzebiegowego skanu drzewa (find + awk).
+
+    Jedno przejście find -xdev zbiera dla każdego wpisu typ, zajęte bloki,
+    rozmiar, liczbę linków, i-węzeł i wybrany czas. awk sumuje wyniki per
+    katalog. Twarde linki są liczone raz, jak w du. Stale liczy się
+    z rozmiaru plików, jak w build_find_stale_batch_command. Katalogi są
+    wypisywane w kolejności post-order z przejścia find (stos ścieżek
+    w kolejności odkrycia), czyli jak w du, więc remisy w Top N
+    rozstrzygają się tak samo, niezależnie od implementacji awk.
+
+    Format wyjścia: katalog<tab>zajętość_bezpośrednia<tab>stale_bezpośrednie.
+
+    Args:
+        root_path: Główna ścieżka (root).
+        days: Liczba dni (pliki starsze niż).
+        kind: Typ czasu (mtime, atime, ctime).
+        excludes: Wzorce do wykluczenia (jak --exclude w du).
+        find_command: Ścieżka do komendy find.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    time_format = {"mtime": "%T@", "atime": "%A@", "ctime": "%C@"}[kind]
+    cutoff_seconds = (days + 1) * 86400
+
+    prune = _build_find_prune(excludes)
+    fields = f"%b\\t%s\\t%n\\t%i\\t{time_format}"
+    find_part = (
+        f"{shlex.quote(find_command)} {shlex.quote(root_path)} -xdev {prune}"
+        f"-type d -printf 'd\\t{fields}\\t%p\\n' -o -printf '%y\\t{fields}\\t%h\\n'"
+    )
+    awk_part = (
+        f"awk -F'\\t' -v cutoff=\"$(($(date +%s) - {cutoff_seconds}))\" "
+        "'function inside(t, d) {return substr(d, 1, length(t)) == t && "
+        '(substr(t, length(t)) == "/" || substr(d, length(t) + 1, 1) == "/")} '
+        'function emit(d) {printf "%s\\t%.0f\\t%.0f\\n", d, used[d], stale[d]; done[d]=1} '
+        '{dir=$7; for(i=8;i<=NF;i++) dir=dir"\\t"$i} '
+        '$1=="d" {order[++n]=dir} '
+        '$1=="f" && $6<=cutoff {stale[dir]+=$3} '
+        '$1!="d" && $4>1 && seen[$5]++ {next} '
+        "{used[dir]+=$2*512} "
+        "END{for(i=1;i<=n;i++) {while(k && !inside(top[k], order[i])) emit(top[k--]); top[++k]=order[i]} "
+        "while(k) emit(top[k--]); for(d in used) if(!(d in done)) emit(d)}'"
+    )
+
+    return f"{find_part} | {awk_part}"
+
+
+def build_host_tree_scan_command(root_path: str, host: "HostProfile | None", config: "Config") -> str:
+    """
+    Buduje komendę jednoprzebiegowego skanu z uwzględnieniem ustawień hosta.
+
+    Args:
+        root_path: Główna ścieżka (root) do skanowania.
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    find_command = host.get_find_command(config.find_command) if host else config.find_command
+    return build_tree_scan_command(
+        root_path, config.stale_days, config.stale_kind, get_excludes(host, config), find_command
+    )
+
+
+def build_dir_listing_command(root_path: str, excludes: list[str] | None = None, find_command: str = "find") -> str:
+    """
+    Buduje komendę listującą katalogi roota z ich mtime (dla skanu przyrostowego).
+
+    find -type d nie odczytuje metadanych plików, więc listing jest znacznie
+    tańszy niż du. Format wyjścia: mtime<tab>katalog.
+
+    Args:
+        root_path: Główna ścieżka (root).
+        excludes: Wzorce do wykluczenia (jak --exclude w du).
+        find_command: Ścieżka do komendy find.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    prune = _build_find_prune(excludes)
+    return f"{shlex.quote(find_command)} {shlex.quote(root_path)} -xdev {prune}-type d -printf '%T@\\t%p\\n'"
+
+
+def build_host_dir_listing_command(root_path: str, host: "HostProfile | None", config: "Config") -> str:
+    """
+    Buduje komendę listingu katalogów z uwzględnieniem ustawień hosta.
+
+    Args:
+        root_path: Główna ścieżka (root).
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    find_command = host.get_find_command(config.find_command) if host else config.find_command
+    return build_dir_listing_command(root_path, get_excludes(host, config), find_command)
+
+
+def build_direct_size_command(
+    dir_paths: list[str], excludes: list[str] | None = None, find_command: str = "find"
+) -> str:
+    """
+    Buduje komendę mierzącą zajętość bezpośrednią wskazanych katalogów.
+
+    Odpowiednik du -B1 -S ograniczony do jednego poziomu: liczy sam katalog
+    i jego wpisy poza podkatalogami. Format wyjścia jak du:
+    zajętość<tab>katalog, bez plików z wieloma twardymi linkami. Każdy
+    taki plik to osobna linia L<tab>urządzenie:i-węzeł<tab>zajętość<tab>katalog,
+    żeby linki można było policzyć raz w obrębie wszystkich paczek komend
+    (cache.DirectSizes).
+
+    Args:
+        dir_paths: Katalogi do zmierzenia.
+        excludes: Wzorce do wykluczenia (jak --exclude w du).
+        find_command: Ścieżka do komendy find.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    prune = _build_find_prune(excludes)
+    quoted_paths = " ".join(shlex.quote(path) for path in dir_paths)
+    find_part = (
+        f"{shlex.quote(find_command)} {quoted_paths} -maxdepth 1 {prune}-printf '%y\\t%d\\t%b\\t%n\\t%D\\t%i\\t%p\\n'"
+    )
+    awk_part = (
+        "awk -F'\\t' "
+        '\'{p=$7; for(i=8;i<=NF;i++) p=p"\\t"$i} '
+        '$2==1 && $1=="d" {next} '
+        '$2==1 {sub(/\\/[^\\/]*$/, "", p); if (p=="") p="/"} '
+        '$1!="d" && $4>1 {printf "L\\t%s:%s\\t%.0f\\t%s\\n", $5, $6, $3*512, p; next} '
+        "{used[p]+=$3*512} "
+        'END{for(d in used) printf "%.0f\\t%s\\n", used[d], d}\''
+    )
+
+    return f"{find_part} | {awk_part}"
+
+
+def build_host_direct_size_commands(
+    dir_paths: list[str],
+    host: "HostProfile | None",
+    config: "Config",
+    max_chars: int = PATH_BATCH_CHARS,
+) -> list[str]:
+    """
+    Dzieli katalogi na paczki i buduje dla nich komendy zajętości bezpośredniej.
+
+    Paczki są ograniczone długością ścieżek, żeby komenda (także przez SSH)
+    nie przekroczyła limitu długości argumentu.
+
+    Args:
+        dir_paths: Katalogi do zmierzenia.
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+        max_chars: Maksymalna łączna długość ścieżek w jednej komendzie.
+
+    Returns:
+        Lista komend (pusta, gdy brak katalogów).
+    """
+    find_command = host.get_find_command(config.find_command) if host else config.find_command
+    excludes = get_excludes(host, config)
+    return [build_direct_size_command(batch, excludes, find_command) for batch in _batch_paths(dir_paths, max_chars)]
+
+
+def _batch_paths(paths: list[str], max_chars: int) -> list[list[str]]:
+    """
+    Dzieli ścieżki na paczki o ograniczonej łącznej długości (z narzutem na cytowanie).
+
+    Args:
+        paths: Ścieżki do podziału.
+        max_chars: Maksymalna łączna długość ścieżek w paczce.
+
+    Returns:
+        Lista niepustych paczek (pusta, gdy brak ścieżek).
+    """
+    batches: list[list[str]] = []
+    batch: list[str] = []
+    batch_chars = 0
+    for path in paths:
+        if batch and batch_chars + len(path) > max_chars:
+            batches.append(batch)
+            batch, batch_chars = [], 0
+        batch.append(path)
+        batch_chars += len(path) + 3
+
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+@cache
+def _agent_payload() -> str:
+    """Zwraca źródło agenta skompresowane zlib i zakodowane base64."""
+    source = Path(agent.__file__).read_bytes()
+    return base64.b64encode(zlib.compress(source, 9)).decode("ascii")
+
+
+def build_agent_command(
+    root_path: str,
+    depth: int,
+    top_n: int,
+    threshold: float,
+    report_mode: str,
+    stale_days: int,
+    stale_kind: str = "mtime",
+    excludes: list[str] | None = None,
+    python_command: str = "python3",
+    sample_error: float | None = None,
+) -> str:
+    """
+    Buduje komendę uruchamiającą agenta zdalnego przez python -c.
+
+    Źródło agenta jest przekazywane w argumencie (zlib + base64), więc na
+    hoście nie trzeba niczego instalować poza Pythonem 3.7+.
+
+    Args:
+        root_path: Główna ścieżka (root).
+        depth: Głębokość raportowanych katalogów.
+        top_n: Liczba wyników Top N.
+        threshold: Próg file_heavy_ratio.
+        report_mode: Tryb raportu agenta (size lub stale).
+        stale_days: Wiek plików stale (0 = bez stale w trybie size).
+        stale_kind: Typ czasu (mtime, atime, ctime).
+        excludes: Wzorce do wykluczenia (jak --exclude w du).
+        python_command: Ścieżka do interpretera Pythona.
+        sample_error: Docelowy błąd względny skanu przybliżonego (None = skan pełny).
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    bootstrap = f"import base64,zlib;exec(zlib.decompress(base64.b64decode('{_agent_payload()}')))"
+    args = [
+        python_command,
+        "-c",
+        bootstrap,
+        root_path,
+        f"--depth={depth}",
+        f"--top-n={top_n}",
+        f"--threshold={threshold}",
+        f"--mode={report_mode}",
+        f"--stale-days={stale_days}",
+        f"--stale-kind={stale_kind}",
+    ]
+    args.extend(f"--exclude={pattern}" for pattern in excludes or [])
+    if sample_error is not None:
+        args.append(f"--sample-error={sample_error}")
+    return shlex.join(args)
+
+
+def build_host_agent_command(root_path: str, host: "HostProfile | None", config: "Config") -> str:
+    """
+    Buduje komendę agenta zdalnego z uwzględnieniem ustawień hosta.
+
+    Tryb growth jest po stronie agenta tym samym co size.
+
+    Args:
+        root_path: Główna ścieżka (root).
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja globalna.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    depth = host.get_scan_depth(config.scan_depth) if host else config.scan_depth
+    python_command = host.get_python_command(config.python_command) if host else config.python_command
+    return build_agent_command(
+        root_path,
+        depth,
+        config.top_n,
+        config.file_heavy_threshold,
+        "stale" if config.report_mode == "stale" else "size",
+        config.stale_days,
+        config.stale_kind,
+        get_excludes(host, config),
+        python_command,
+        config.approx_error,
+    )
+
+
+def build_df_command(path: str) -> str:
+    """
+    Buduje komendę df w formacie POSIX (bloki 1 KiB, jedna linia na system plików).
+
+    Args:
+        path: Ścieżka na badanym systemie plików.
+
+    Returns:
+        Komenda jako string (dla shell).
+    """
+    return f"LC_ALL=C df -Pk {shlex.quote(path)}"
+
+
+def parse_df_line(line: str) -> tuple[int, int, int] | None:
+    """
+    Parsuje linię danych df -Pk.
+
+    Nagłówek i nieprawidłowe linie dają None.
+
+    Args:
+        line: Linia wyjścia df -Pk.
+
+    Returns:
+        Krotka (rozmiar, zajęte, wolne) w bajtach lub None.
+    """
+    parts = line.split()
+    if len(parts) < 6:
+        return None
+
+    try:
+        size_kb, used_kb, available_kb = int(parts[1]), int(parts[2]), int(parts[3])
+    except ValueError:
+        return None
+
+    return size_kb * 1024, used_kb * 1024, available_kb * 1024
+
+
+def add_stale_batch_line(results: dict[str, int], line: str) -> None:
+    """
+    Dodaje linię wyjścia find batch (ścieżka<tab>rozmiar) do słownika.
+
+    Nieprawidłowe linie są pomijane.
+
+    Args:
+        results: Słownik ścieżka -> rozmiar stale (uzupełniany w miejscu).
+        line: Linia wyjścia.
+    """
+    parts = line.split("\t", 1)
+    if len(parts) != 2:
+        return
+
+    try:
+        path = normalize_path(parts[0])
+        size = int(parts[1])
+        results[path] = size
+    except ValueError:
+        return
 
 
 def parse_stale_batch_output(output: str) -> dict[str, int]:
@@ -291,19 +1041,8 @@ def parse_stale_batch_output(output: str) -> dict[str, int]:
     """
     results: dict[str, int] = {}
 
-    for line in output.strip().split("\n"):
-        if not line:
-            continue
-
-        parts = line.split("\t", 1)
-        if len(parts) != 2:
-            continue
-
-        try:
-            path = normalize_path(parts[0])
-            size = int(parts[1])
-            results[path] = size
-        except ValueError:
-            continue
+    for line in output.split("\n"):
+        if line:
+            add_stale_batch_line(results, line)
 
     return results
@@ -0,0 +1,313 @@
+"""Eksporter Prometheus/OpenMetrics - ostatnie wyniki skanów serwowane z pamięci."""
+
+import sys
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import cast
+
+from dsmonitor.analyzer import HostResult, RootSummary
+from dsmonitor.metrics import escape_label_value
+
+TEXT_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRICS_PATH = "/metrics"
+
+type Sample = tuple[dict[str, str], float]
+
+
+@dataclass(slots=True)
+class ExportedRoot:
+    """Ostatni udany wynik roota i czas jego zakończenia."""
+
+    summary: RootSummary
+    timestamp: float
+
+
+@dataclass(slots=True)
+class ExportedHost:
+    """Stan hosta w eksporterze: ostatnie udane wyniki rootów i wynik ostatniego skanu."""
+
+    roots: dict[str, ExportedRoot] = field(default_factory=dict)
+    success: bool | None = None
+    last_scan: float | None = None
+
+
+def _format_value(value: float) -> str:
+    """Formatuje wartość próbki (liczby całkowite bez części ułamkowej)."""
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _render_family(
+    lines: list[str], name: str, kind: str, help_text: str, samples: list[Sample], openmetrics: bool
+) -> None:
+    """
+    Dopisuje rodzinę metryk (HELP, TYPE i próbki).
+
+    Args:
+        lines: Linie odpowiedzi.
+        name: Nazwa próbek (dla licznika z przyrostkiem _total).
+        kind: Typ metryki (gauge lub counter).
+        help_text: Opis metryki.
+        samples: Pary (etykiety, wartość).
+        openmetrics: Czy format OpenMetrics (rodzina licznika bez _total).
+    """
+    if not samples:
+        return
+
+    family = name.removesuffix("_total") if openmetrics and kind == "counter" else name
+    lines.append(f"# HELP {family} {help_text}")
+    lines.append(f"# TYPE {family} {kind}")
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{escape_label_value(label)}"' for key, label in labels.items())
+        selector = f"{name}{{{label_text}}}" if labels else name
+        lines.append(f"{selector} {_format_value(value)}")
+
+
+def render_metrics(
+    hosts: dict[str, ExportedHost], cycles: int, last_cycle_seconds: float | None, openmetrics: bool
+) -> bytes:
+    """
+    Formatuje stan eksportera jako odpowiedź /metrics.
+
+    Args:
+        hosts: Stan hostów (w kolejności z konfiguracji).
+        cycles: Liczba zakończonych cykli skanu.
+        last_cycle_seconds: Czas ostatniego cyklu (None = brak cyklu).
+        openmetrics: Format OpenMetrics zamiast tekstowego formatu Prometheus.
+
+    Returns:
+        Treść odpowiedzi (UTF-8).
+    """
+    root_size: list[Sample] = []
+    root_stale: list[Sample] = []
+    root_timestamp: list[Sample] = []
+    directory_size: list[Sample] = []
+    directory_stale: list[Sample] = []
+    host_success: list[Sample] = []
+    host_timestamp: list[Sample] = []
+
+    for host_name, host in hosts.items():
+        if host.success is not None:
+            host_success.append(({"host": host_name}, int(host.success)))
+        if host.last_scan is not None:
+            host_timestamp.append(({"host": host_name}, round(host.last_scan, 3)))
+
+        for root, exported in host.roots.items():
+            labels = {"host": host_name, "root": root}
+            summary = exported.summary
+            root_size.append((labels, summary.total_size))
+            if summary.stale_size is not None:
+                root_stale.append((labels, summary.stale_size))
+            root_timestamp.append((labels, round(exported.timestamp, 3)))
+
+            for directory in summary.top_directories:
+                directory_labels = {**labels, "directory": directory.path}
+                directory_size.append((directory_labels, directory.total_size))
+                if directory.stale_size is not None:
+                    directory_stale.append((directory_labels, directory.stale_size))
+
+    cycle_seconds: list[Sample] = [({}, round(last_cycle_seconds, 6))] if last_cycle_seconds is not None else []
+
+    lines: list[str] = []
+    _render_family(lines, "dsmonitor_root_size_bytes", "gauge", "Rozmiar roota.", root_size, openmetrics)
+    _render_family(
+        lines, "dsmonitor_root_stale_bytes", "gauge", "Rozmiar starych plików roota.", root_stale, openmetrics
+    )
+    _render_family(
+        lines,
+        "dsmonitor_root_last_success_timestamp_seconds",
+        "gauge",
+        "Czas ostatniego udanego skanu roota (unix).",
+        root_timestamp,
+        openmetrics,
+    )
+    _render_family(
+        lines, "dsmonitor_directory_size_bytes", "gauge", "Rozmiar katalogu z Top N roota.", directory_size, openmetrics
+    )
+    _render_family(
+        lines,
+        "dsmonitor_directory_stale_bytes",
+        "gauge",
+        "Rozmiar starych plików katalogu z Top N roota.",
+        directory_stale,
+        openmetrics,
+    )
+    _render_family(
+        lines, "dsmonitor_host_scan_success", "gauge", "Czy ostatni skan hosta był udany.", host_success, openmetrics
+    )
+    _render_family(
+        lines,
+        "dsmonitor_host_last_scan_timestamp_seconds",
+        "gauge",
+        "Czas zakończenia ostatniego skanu hosta (unix).",
+        host_timestamp,
+        openmetrics,
+    )
+    _render_family(
+        lines, "dsmonitor_scan_cycles_total", "counter", "Liczba zakończonych cykli skanu.", [({}, cycles)], openmetrics
+    )
+    _render_family(
+        lines,
+        "dsmonitor_scan_cycle_seconds",
+        "gauge",
+        "Czas ostatniego cyklu skanu.",
+        cycle_seconds,
+        openmetrics,
+    )
+
+    if openmetrics:
+        lines.append("# EOF")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class MetricsExporter:
+    """
+    Stan eksportera: ostatnie wyniki rootów i gotowe odpowiedzi /metrics.
+
+    Odpowiedzi są formatowane przy każdej aktualizacji (po zakończeniu
+    skanu hosta), więc obsługa zapytania to tylko odczyt gotowych bajtów -
+    zapytanie nigdy nie uruchamia skanu. Root zakończony błędem zachowuje
+    ostatni udany wynik (wiek pokazuje
+    dsmonitor_root_last_success_timestamp_seconds).
+    """
+
+    def __init__(self, host_names: list[str]) -> None:
+        """
+        Tworzy pusty stan eksportera.
+
+        Args:
+            host_names: Nazwy hostów (kolejność w odpowiedzi).
+        """
+        self._lock = threading.Lock()
+        self._hosts = {host_name: ExportedHost() for host_name in host_names}
+        self._cycles = 0
+        self._last_cycle_seconds: float | None = None
+        self._pages: dict[bool, bytes] = {}
+        self._render()
+
+    def _render(self) -> None:
+        """Formatuje odpowiedzi w obu formatach (wywoływane pod blokadą)."""
+        self._pages = {
+            openmetrics: render_metrics(self._hosts, self._cycles, self._last_cycle_seconds, openmetrics)
+            for openmetrics in (False, True)
+        }
+
+    def update(self, host_result: HostResult, timestamp: float | None = None) -> None:
+        """
+        Zapamiętuje wynik skanu hosta.
+
+        Args:
+            host_result: Wynik hosta.
+            timestamp: Czas zakończenia skanu (None = teraz).
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            host = self._hosts.setdefault(host_result.host_name, ExportedHost())
+            host.success = host_result.success
+            host.last_scan = timestamp
+            for summary in host_result.roots:
+                if summary.path not in host_result.failed_roots:
+                    host.roots[summary.path] = ExportedRoot(summary, timestamp)
+            self._render()
+
+    def finish_cycle(self, seconds: float) -> None:
+        """
+        Rejestruje zakończony cykl skanu.
+
+        Args:
+            seconds: Czas cyklu.
+        """
+        with self._lock:
+            self._cycles += 1
+            self._last_cycle_seconds = seconds
+            self._render()
+
+    def page(self, openmetrics: bool) -> bytes:
+        """
+        Zwraca gotową odpowiedź /metrics.
+
+        Args:
+            openmetrics: Format OpenMetrics zamiast tekstowego formatu Prometheus.
+
+        Returns:
+            Treść odpowiedzi.
+        """
+        return self._pages[openmetrics]
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """Serwer HTTP z endpointem /metrics."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], exporter: MetricsExporter, verbose: bool = False) -> None:
+        """
+        Otwiera gniazdo serwera.
+
+        Args:
+            address: Para (adres, port); port 0 = dowolny wolny.
+            exporter: Stan eksportera.
+            verbose: Czy logować zapytania na stderr.
+        """
+        self.exporter = exporter
+        self.verbose = verbose
+        super().__init__(address, MetricsHandler)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Obsługa zapytań: /metrics z pamięci, / z odnośnikiem, reszta 404."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        """Odpowiada na zapytanie GET."""
+        server = cast(MetricsServer, self.server)
+        path = self.path.split("?", 1)[0]
+
+        if path == METRICS_PATH:
+            openmetrics = "application/openmetrics-text" in self.headers.get("Accept", "")
+            body = server.exporter.page(openmetrics)
+            self._respond(200, OPENMETRICS_CONTENT_TYPE if openmetrics else TEXT_CONTENT_TYPE, body)
+        elif path == "/":
+            body = f'<html><body><a href="{METRICS_PATH}">{METRICS_PATH}</a></body></html>\n'.encode()
+            self._respond(200, "text/html; charset=utf-8", body)
+        else:
+            self._respond(404, "text/plain; charset=utf-8", b"Not found\n")
+
+    def _respond(self, status: int, content_type: str, body: bytes) -> None:
+        """Wysyła odpowiedź z nagłówkami."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Loguje zapytanie na stderr (tylko w trybie verbose)."""
+        if cast(MetricsServer, self.server).verbose:
+            super().log_message(format, *args)
+
+
+def scan_periodically(scan: Callable[[], None], interval: float, stop: threading.Event) -> None:
+    """
+    Uruchamia skan co interval sekund (od startu do startu), aż do ustawienia stop.
+
+    Pierwszy skan startuje od razu. Skan dłuższy niż interval opóźnia
+    kolejny zamiast nakładać się na niego, a wyjątek skanu jest logowany
+    i nie przerywa pętli.
+
+    Args:
+        scan: Jeden cykl skanu.
+        interval: Odstęp między startami cykli (sekundy).
+        stop: Zdarzenie kończące pętlę.
+    """
+    while not stop.is_set():
+        started = time.monotonic()
+        try:
+            scan()
+        except Exception as e:
+            print(f"Błąd cyklu skanu: {e}", file=sys.stderr)
+        stop.wait(max(0.0, interval - (time.monotonic() - started)))
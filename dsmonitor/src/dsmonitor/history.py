@@ -0,0 +1,257 @@
+"""Historia skanów - lokalna baza SQLite z migawkami wyników per przebieg."""
+
+import sqlite3
+import time
+from pathlib import Path
+from types import TracebackType
+
+from dsmonitor.analyzer import SOURCE_SCAN, DirectoryGrowth, HostResult, RootSummary
+
+SECONDS_PER_DAY = 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS root_snapshots (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    root TEXT NOT NULL,
+    total_size INTEGER NOT NULL,
+    stale_size INTEGER,
+    fs_size INTEGER,
+    fs_available INTEGER
+);
+CREATE TABLE IF NOT EXISTS directory_snapshots (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    host TEXT NOT NULL,
+    root TEXT NOT NULL,
+    path TEXT NOT NULL,
+    total_size INTEGER NOT NULL,
+    direct_files_size INTEGER NOT NULL,
+    stale_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_root_snapshots ON root_snapshots(host, root, run_id);
+CREATE INDEX IF NOT EXISTS idx_directory_snapshots ON directory_snapshots(host, root, run_id);
+"""
+
+TREND_QUERY = """
+SELECT name, COUNT(*), SUM((x - mean_x) * (y - mean_y)), SUM((x - mean_x) * (x - mean_x))
+FROM (
+    SELECT name, x, y, AVG(x) OVER by_name AS mean_x, AVG(y) OVER by_name AS mean_y
+    FROM (
+        SELECT {key} AS name, (runs.timestamp - :since) / 86400.0 AS x, CAST(s.total_size AS REAL) AS y
+        FROM {table} AS s JOIN runs ON runs.id = s.run_id
+        WHERE s.host = :host AND s.root = :root AND runs.timestamp >= :since
+    )
+    WINDOW by_name AS (PARTITION BY name)
+)
+GROUP BY name
+HAVING COUNT(*) >= 2
+"""
+
+
+class HistoryStore:
+    """
+    Magazyn migawek skanów w SQLite (tylko dopisywanie).
+
+    Każdy przebieg to wiersz w runs; dla każdego roota i katalogu z Top N
+    dopisywany jest wiersz migawki. Trendy są liczone agregacją SQL po
+    wszystkich katalogach roota naraz.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        """
+        Otwiera (lub tworzy) bazę historii.
+
+        Args:
+            db_path: Ścieżka pliku SQLite.
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(db_path)
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Zamyka połączenie z bazą."""
+        self._connection.close()
+
+    def start_run(self, timestamp: float | None = None) -> int:
+        """
+        Tworzy pusty przebieg (do zapisu wyników host po hoście).
+
+        Args:
+            timestamp: Czas przebiegu (None = teraz).
+
+        Returns:
+            Identyfikator przebiegu.
+        """
+        with self._connection:
+            cursor = self._connection.execute(
+                "INSERT INTO runs (timestamp) VALUES (?)", (time.time() if timestamp is None else timestamp,)
+            )
+        run_id = cursor.lastrowid
+        assert run_id is not None
+        return run_id
+
+    def record(self, results: list[HostResult], timestamp: float | None = None, run_id: int | None = None) -> int:
+        """
+        Dopisuje migawkę przebiegu.
+
+        Rooty bez danych (np. po błędzie du), rooty bez skanu drzewa
+        (source inne niż SOURCE_SCAN, np. zajętość systemu plików z
+        --fill-threshold - inna miara niż du, która zaburzyłaby trend)
+        i rooty wznowione z dziennika przebiegu (zapisane już przez
+        przerwany przebieg) są pomijane.
+
+        Args:
+            results: Wyniki skanowania hostów.
+            timestamp: Czas przebiegu (None = teraz).
+            run_id: Istniejący przebieg do uzupełnienia (None = nowy przebieg).
+
+        Returns:
+            Identyfikator przebiegu.
+        """
+        if run_id is None:
+            run_id = self.start_run(timestamp)
+
+        with self._connection:
+            for host_result in results:
+                for root in host_result.roots:
+                    if root.total_size == 0 and not root.top_directories:
+                        continue
+                    if root.source != SOURCE_SCAN or root.path in host_result.resumed_roots:
+                        continue
+                    self._record_root(run_id, host_result.host_name, root)
+
+        return run_id
+
+    def _record_root(self, run_id: int, host_name: str, root: RootSummary) -> None:
+        """Dopisuje migawkę jednego roota i jego katalogów."""
+        self._connection.execute(
+            "INSERT INTO root_snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (run_id, host_name, root.path, root.total_size, root.stale_size, root.fs_size, root.fs_available),
+        )
+        self._connection.executemany(
+            "INSERT INTO directory_snapshots VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                (run_id, host_name, root.path, d.path, d.total_size, d.direct_files_size, d.stale_size)
+                for d in root.top_directories
+            ),
+        )
+
+    def root_trend(self, host_name: str, root: str, since: float) -> tuple[float, int] | None:
+        """
+        Wylicza tempo przyrostu roota (regresja liniowa rozmiaru w czasie).
+
+        Args:
+            host_name: Nazwa hosta.
+            root: Ścieżka roota (jak w RootSummary.path).
+            since: Początek okna (timestamp).
+
+        Returns:
+            Krotka (bajty na dzień, liczba migawek) lub None przy < 2 migawkach.
+        """
+        trends = self._trends("root_snapshots", "s.root", host_name, root, since)
+        return trends.get(root)
+
+    def directory_trends(self, host_name: str, root: str, since: float) -> dict[str, tuple[float, int]]:
+        """
+        Wylicza tempo przyrostu wszystkich katalogów roota jednym zapytaniem.
+
+        Args:
+            host_name: Nazwa hosta.
+            root: Ścieżka roota (jak w RootSummary.path).
+            since: Początek okna (timestamp).
+
+        Returns:
+            Słownik katalog -> (bajty na dzień, liczba migawek), tylko dla >= 2 migawek.
+        """
+        return self._trends("directory_snapshots", "s.path", host_name, root, since)
+
+    def _trends(self, table: str, key: str, host_name: str, root: str, since: float) -> dict[str, tuple[float, int]]:
+        """Nachylenie prostej MNK (bajty/dzień) per klucz z agregatów SQL."""
+        query = TREND_QUERY.format(table=table, key=key)
+        rows = self._connection.execute(query, {"host": host_name, "root": root, "since": since})
+
+        trends: dict[str, tuple[float, int]] = {}
+        for name, count, covariance, variance in rows:
+            if variance <= 0:
+                continue
+            trends[name] = (covariance / variance, count)
+
+        return trends
+
+
+def days_until_full(available: int | None, bytes_per_day: float | None) -> float | None:
+    """
+    Szacuje liczbę dni do zapełnienia wolnego miejsca przy danym tempie.
+
+    Args:
+        available: Wolne miejsce w bajtach (None = nieznane).
+        bytes_per_day: Tempo przyrostu (None = nieznane).
+
+    Returns:
+        Liczba dni lub None, gdy dane są nieznane albo rozmiar nie rośnie.
+    """
+    if available is None or bytes_per_day is None or bytes_per_day <= 0:
+        return None
+    return available / bytes_per_day
+
+
+def annotate_growth(
+    results: list[HostResult],
+    store: HistoryStore,
+    window_days: int,
+    top_n: int,
+    now: float | None = None,
+) -> None:
+    """
+    Uzupełnia podsumowania rootów o tempo przyrostu z historii.
+
+    Dla każdego roota wylicza przyrost całkowity i listę Top N katalogów
+    o największym przyroście w oknie window_days dni.
+
+    Args:
+        results: Wyniki skanowania (modyfikowane w miejscu).
+        store: Magazyn historii (z już zapisaną bieżącą migawką).
+        window_days: Okno historii w dniach.
+        top_n: Liczba katalogów w rankingu przyrostu.
+        now: Bieżący czas (None = teraz).
+    """
+    since = (time.time() if now is None else now) - window_days * SECONDS_PER_DAY
+
+    for host_result in results:
+        for root in host_result.roots:
+            root_trend = store.root_trend(host_result.host_name, root.path, since)
+            if root_trend is not None:
+                root.growth_per_day = root_trend[0]
+                root.days_until_full = days_until_full(root.fs_available, root.growth_per_day)
+
+            current_sizes = {d.path: d.total_size for d in root.top_directories}
+            growth = [
+                DirectoryGrowth(
+                    path=path,
+                    total_size=current_sizes.get(path, 0),
+                    bytes_per_day=bytes_per_day,
+                    samples=samples,
+                    days_until_full=days_until_full(root.fs_available, bytes_per_day),
+                )
+                for path, (bytes_per_day, samples) in store.directory_trends(
+                    host_result.host_name, root.path, since
+                ).items()
+                if path in current_sizes
+            ]
+            growth.sort(key=lambda g: g.bytes_per_day, reverse=True)
+            root.growth = growth[:top_n]
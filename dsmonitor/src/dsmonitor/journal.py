@@ -0,0 +1,227 @@
+"""Dziennik przebiegu - zapis wyników rootów na bieżąco, do wznowienia skanu."""
+
+import json
+import os
+import time
+from pathlib import Path
+from types import TracebackType
+from urllib.parse import quote
+
+from dsmonitor.analyzer import RootSummary, root_summary_from_dict, root_summary_to_dict
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.executor import get_excludes
+
+JOURNAL_VERSION = 1
+JOURNAL_SUFFIX = ".jsonl"
+
+type JournalKey = tuple[str, str]
+
+
+def journal_dir(cache_dir: str) -> Path:
+    """
+    Zwraca katalog dzienników przebiegów.
+
+    Args:
+        cache_dir: Katalog cache.
+
+    Returns:
+        Ścieżka katalogu.
+    """
+    return Path(cache_dir) / "runs"
+
+
+def journal_path(cache_dir: str, run_id: str) -> Path:
+    """
+    Zwraca ścieżkę dziennika przebiegu.
+
+    Args:
+        cache_dir: Katalog cache.
+        run_id: Identyfikator przebiegu.
+
+    Returns:
+        Ścieżka pliku JSONL.
+    """
+    return journal_dir(cache_dir) / f"{quote(run_id, safe='')}{JOURNAL_SUFFIX}"
+
+
+def latest_run_id(cache_dir: str) -> str | None:
+    """
+    Zwraca identyfikator najnowszego (wg mtime) dziennika.
+
+    Args:
+        cache_dir: Katalog cache.
+
+    Returns:
+        Identyfikator przebiegu lub None, gdy dzienników nie ma.
+    """
+    try:
+        paths = [p for p in journal_dir(cache_dir).iterdir() if p.name.endswith(JOURNAL_SUFFIX)]
+    except OSError:
+        return None
+
+    if not paths:
+        return None
+
+    header = _read_header(max(paths, key=lambda p: p.stat().st_mtime))
+    run_id = header.get("run_id") if header else None
+    return run_id if isinstance(run_id, str) else None
+
+
+def scan_fingerprint(config: Config, host: HostProfile | None = None) -> dict[str, object]:
+    """
+    Zwraca ustawienia wpływające na wynik skanu roota.
+
+    Wyniki z dziennika i migawki zajętości są wykorzystywane tylko przy
+    identycznych ustawieniach. Z profilem hosta ustawienia uwzględniają
+    jego nadpisania (głębokość, wykluczenia, komendy du i find).
+
+    Args:
+        config: Konfiguracja.
+        host: Profil hosta (None = ustawienia globalne lub tryb lokalny).
+
+    Returns:
+        Słownik ustawień (serializowalny do JSON).
+    """
+    return {
+        "report_mode": config.report_mode,
+        "scan_method": config.scan_method,
+        "incremental": config.incremental,
+        "adaptive_depth": config.adaptive_depth,
+        "adaptive_step": config.adaptive_step,
+        "adaptive_share": config.adaptive_share,
+        "top_n": config.top_n,
+        "file_heavy_threshold": config.file_heavy_threshold,
+        "scan_depth": host.get_scan_depth(config.scan_depth) if host else config.scan_depth,
+        "stale_days": config.stale_days,
+        "stale_kind": config.stale_kind,
+        "excludes": sorted(get_excludes(host, config)),
+        "du_command": host.get_du_command(config.du_command) if host else config.du_command,
+        "find_command": host.get_find_command(config.find_command) if host else config.find_command,
+        "approx_error": config.approx_error,
+        "fill_threshold": config.fill_threshold,
+        "usage_delta": config.usage_delta,
+    }
+
+
+def _read_header(path: Path) -> dict[str, object] | None:
+    """Odczytuje pierwszą linię dziennika (nagłówek)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(header, dict) or header.get("version") != JOURNAL_VERSION:
+        return None
+    return header
+
+
+def load_journal(
+    path: Path,
+    fingerprint: dict[str, object],
+    root_fingerprints: dict[JournalKey, dict[str, object]] | None = None,
+) -> dict[JournalKey, RootSummary]:
+    """
+    Wczytuje zakończone rooty z dziennika.
+
+    Niepełna ostatnia linia (przerwany zapis) i uszkodzone wpisy są
+    pomijane. Dziennik z innymi ustawieniami skanu daje pusty wynik,
+    a wpis roota z innymi ustawieniami hosta jest pomijany.
+
+    Args:
+        path: Ścieżka dziennika.
+        fingerprint: Bieżące ustawienia skanu (scan_fingerprint).
+        root_fingerprints: Bieżące ustawienia per (host, root) (None = bez sprawdzania wpisów).
+
+    Returns:
+        Słownik (host, root) -> RootSummary.
+    """
+    header = _read_header(path)
+    if header is None or header.get("fingerprint") != fingerprint:
+        return {}
+
+    completed: dict[JournalKey, RootSummary] = {}
+    with open(path, encoding="utf-8") as f:
+        next(f, None)
+        for line in f:
+            try:
+                entry = json.loads(line)
+                key = (entry["host"], entry["root"])
+                if root_fingerprints is not None and entry.get("fingerprint") != root_fingerprints.get(key):
+                    continue
+                completed[key] = root_summary_from_dict(entry["summary"])
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    return completed
+
+
+class ScanJournal:
+    """
+    Dziennik przebiegu w formacie JSONL (tylko dopisywanie).
+
+    Pierwsza linia to nagłówek z identyfikatorem przebiegu i ustawieniami
+    skanu, każda kolejna - wynik jednego roota zakończonego bez błędu
+    razem z ustawieniami skanu jego hosta.
+    Linie są zapisywane na dysk (fsync) od razu po zakończeniu roota.
+    """
+
+    def __init__(self, path: Path, run_id: str, fingerprint: dict[str, object]) -> None:
+        """
+        Otwiera dziennik do dopisywania (tworzy go z nagłówkiem, jeśli go nie ma).
+
+        Args:
+            path: Ścieżka dziennika.
+            run_id: Identyfikator przebiegu.
+            fingerprint: Ustawienia skanu (scan_fingerprint).
+        """
+        self.path = path
+        self.run_id = run_id
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        header = _read_header(path) if path.exists() else None
+        mode = "a" if header is not None and header.get("fingerprint") == fingerprint else "w"
+        self._file = open(path, mode, encoding="utf-8")  # noqa: SIM115
+        if mode == "w":
+            header = {"version": JOURNAL_VERSION, "run_id": run_id, "started": time.time(), "fingerprint": fingerprint}
+            self._write(header)
+
+    def __enter__(self) -> "ScanJournal":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _write(self, data: dict[str, object]) -> None:
+        """Dopisuje linię i wymusza zapis na dysk."""
+        self._file.write(json.dumps(data, separators=(",", ":")) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def record(self, host_name: str, summary: RootSummary, fingerprint: dict[str, object] | None = None) -> None:
+        """
+        Zapisuje wynik zakończonego roota.
+
+        Args:
+            host_name: Nazwa hosta.
+            summary: Wynik roota.
+            fingerprint: Ustawienia skanu hosta (scan_fingerprint z profilem hosta).
+        """
+        entry: dict[str, object] = {"host": host_name, "root": summary.path, "summary": root_summary_to_dict(summary)}
+        if fingerprint is not None:
+            entry["fingerprint"] = fingerprint
+        self._write(entry)
+
+    def close(self) -> None:
+        """Zamyka plik dziennika."""
+        self._file.close()
+
+    def discard(self) -> None:
+        """Zamyka i usuwa dziennik (przebieg zakończony w całości)."""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,271 @@
+"""Metryki skanu - czasy faz i liczniki per root, eksport do JSON i Prometheus."""
+
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from dsmonitor.analyzer import HostResult
+
+PEAK_PREFIX = "peak_"
+METRICS_VERSION = 1
+PROFILE_TOP = 20
+
+
+@dataclass(slots=True)
+class ScanMetrics:
+    """
+    Czasy faz (w sekundach) i liczniki skanu roota, hosta lub przebiegu.
+
+    Fazy komend nazywają się jak krok planu (du, stale, scan, native,
+    listing, df, agent), parse to obsługa linii stdout, analysis to praca
+    planu między komendami (drzewo, Top N, stale), a connect to próba
+    połączenia z hostem przed skanem. Liczniki z przedrostkiem
+    peak_ przechowują maksimum (np. peak_directories - rozmiar słownika
+    rozmiarów), pozostałe są sumowane.
+    """
+
+    phases: dict[str, float] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        """Dodaje czas do fazy."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Zwiększa licznik (dla peak_* zapamiętuje maksimum)."""
+        if name.startswith(PEAK_PREFIX):
+            self.counters[name] = max(self.counters.get(name, 0), value)
+        else:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mierzy czas bloku i dodaje go do fazy."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - started)
+
+    def record_command(self, phase: str, seconds: float, meter: "LineMeter | None" = None) -> None:
+        """
+        Rejestruje wykonaną komendę planu.
+
+        Args:
+            phase: Faza (nazwa kroku planu).
+            seconds: Czas od uruchomienia do zakończenia komendy.
+            meter: Pomiar obsługi linii (jego czas trafia do fazy parse
+                zamiast do fazy komendy).
+        """
+        self.count("commands")
+        if meter is not None:
+            self.add_time("parse", meter.seconds)
+            self.count("lines", meter.lines)
+            self.count("bytes", meter.bytes)
+            seconds -= meter.seconds
+        self.add_time(phase, seconds)
+
+    def merge(self, other: "ScanMetrics") -> None:
+        """Dołącza czasy i liczniki innych metryk (np. rootów hosta)."""
+        for phase, seconds in other.phases.items():
+            self.add_time(phase, seconds)
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Zwraca słownik serializowalny do JSON."""
+        return {
+            "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            "counters": dict(self.counters),
+        }
+
+    def summary(self) -> str:
+        """Zwraca jednoliniowe podsumowanie faz i liczników (do logów verbose)."""
+        phases = ", ".join(f"{phase} {seconds:.2f} s" for phase, seconds in self.phases.items())
+        counters = ", ".join(f"{name} {value}" for name, value in self.counters.items())
+        return "; ".join(part for part in (phases, counters) if part)
+
+
+class LineMeter:
+    """
+    Obsługa linii stdout z pomiarem: liczba linii, bajtów i czas parsowania.
+
+    Pomiar czasu każdej linii kosztuje, więc silniki używają go tylko
+    przy włączonym eksporcie metryk lub --verbose (Config.collect_line_metrics).
+    """
+
+    __slots__ = ("bytes", "lines", "on_line", "seconds")
+
+    def __init__(self, on_line: Callable[[str], None]) -> None:
+        """
+        Opakowuje obsługę linii.
+
+        Args:
+            on_line: Właściwa obsługa linii.
+        """
+        self.on_line = on_line
+        self.lines = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def __call__(self, line: str) -> None:
+        started = time.perf_counter()
+        self.on_line(line)
+        self.seconds += time.perf_counter() - started
+        self.lines += 1
+        self.bytes += len(line) + 1
+
+
+def metrics_to_json(results: list["HostResult"], run_metrics: ScanMetrics) -> dict[str, Any]:
+    """
+    Buduje dokument JSON z metrykami przebiegu, hostów i rootów.
+
+    Args:
+        results: Wyniki hostów.
+        run_metrics: Metryki całego przebiegu (np. faza report).
+
+    Returns:
+        Słownik do zapisania jako JSON.
+    """
+    return {
+        "version": METRICS_VERSION,
+        "timestamp": time.time(),
+        "run": run_metrics.to_dict(),
+        "hosts": [
+            {
+                "name": host_result.host_name,
+                "success": host_result.success,
+                **host_result.metrics.to_dict(),
+                "roots": [
+                    {"path": root, **root_metrics.to_dict()} for root, root_metrics in host_result.root_metrics.items()
+                ],
+            }
+            for host_result in results
+        ],
+    }
+
+
+def escape_label_value(value: str) -> str:
+    """Escapuje wartość etykiety Prometheus."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metrics_to_prometheus(results: list["HostResult"], run_metrics: ScanMetrics) -> str:
+    """
+    Formatuje metryki w formacie tekstowym Prometheus (node_exporter textfile).
+
+    Args:
+        results: Wyniki hostów.
+        run_metrics: Metryki całego przebiegu.
+
+    Returns:
+        Treść pliku .prom.
+    """
+    samples: dict[str, list[str]] = {}
+
+    def add(name: str, labels: dict[str, str], value: float) -> None:
+        label_text = ",".join(f'{key}="{escape_label_value(label)}"' for key, label in labels.items())
+        selector = f"{name}{{{label_text}}}" if labels else name
+        samples.setdefault(name, []).append(f"{selector} {value}")
+
+    for phase, seconds in run_metrics.phases.items():
+        add("dsmonitor_run_phase_seconds", {"phase": phase}, round(seconds, 6))
+    add("dsmonitor_run_timestamp_seconds", {}, round(time.time(), 3))
+
+    for host_result in results:
+        add("dsmonitor_host_success", {"host": host_result.host_name}, int(host_result.success))
+        if "connect" in host_result.metrics.phases:
+            connect = round(host_result.metrics.phases["connect"], 6)
+            add("dsmonitor_connect_seconds", {"host": host_result.host_name}, connect)
+        for root, root_metrics in host_result.root_metrics.items():
+            labels = {"host": host_result.host_name, "root": root}
+            for phase, seconds in root_metrics.phases.items():
+                add("dsmonitor_phase_seconds", {**labels, "phase": phase}, round(seconds, 6))
+            for name, value in root_metrics.counters.items():
+                add(f"dsmonitor_{name}", labels, value)
+
+    lines: list[str] = []
+    for name, metric_samples in samples.items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(metric_samples)
+    return "\n".join(lines) + "\n"
+
+
+def _write_atomic(path: str, content: str) -> None:
+    """Zapisuje plik atomowo (plik tymczasowy + rename), np. dla kolektora textfile."""
+    target = Path(path)
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, target)
+
+
+def write_metrics(
+    results: list["HostResult"],
+    run_metrics: ScanMetrics,
+    json_path: str | None,
+    prometheus_path: str | None,
+) -> None:
+    """
+    Zapisuje metryki do pliku JSON i/lub pliku textfile Prometheus.
+
+    Args:
+        results: Wyniki hostów.
+        run_metrics: Metryki całego przebiegu.
+        json_path: Ścieżka pliku JSON (None = bez zapisu).
+        prometheus_path: Ścieżka pliku .prom (None = bez zapisu).
+    """
+    if json_path:
+        _write_atomic(json_path, json.dumps(metrics_to_json(results, run_metrics), indent=2, ensure_ascii=False) + "\n")
+    if prometheus_path:
+        _write_atomic(prometheus_path, metrics_to_prometheus(results, run_metrics))
+
+
+@contextmanager
+def profiling(profile_path: str | None, trace_memory: bool) -> Iterator[None]:
+    """
+    Opcjonalnie profiluje blok (cProfile) i śledzi alokacje (tracemalloc).
+
+    Statystyki cProfile trafiają do profile_path (format pstats, np. dla
+    snakeviz), a najdroższe funkcje i miejsca alokacji - na stderr.
+
+    Args:
+        profile_path: Plik statystyk cProfile (None = bez profilowania).
+        trace_memory: Czy śledzić alokacje pamięci.
+    """
+    profiler = cProfile.Profile() if profile_path else None
+    if trace_memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+
+        if trace_memory:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"Pamięć (tracemalloc): bieżąca {current / 2**20:.1f} MB, szczyt {peak / 2**20:.1f} MB", file=sys.stderr
+            )
+            for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+                print(f"  {stat}", file=sys.stderr)
+
+        if profiler is not None and profile_path:
+            profiler.dump_stats(profile_path)
+            print(f"Profil zapisano do: {profile_path}", file=sys.stderr)
+            pstats.Stats(profiler, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_TOP)
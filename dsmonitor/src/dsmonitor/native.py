@@ -0,0 +1,174 @@
+"""Natywny skaner lokalny - przejście drzewa przez os.scandir bez du i find.
+
+Katalogi są odczytywane równolegle w puli wątków (przy sieciowych systemach
+plików dominuje opóźnienie operacji na metadanych). Wynik ma postać jak
+z build_tree_scan_command: zajętość i stale bezpośrednie per katalog.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from dsmonitor.agent import STAT_TIME_ATTRIBUTES, is_excluded
+from dsmonitor.utils import normalize_path
+
+type EntryKey = tuple[int, ...]
+
+
+@dataclass
+class DirectoryListing:
+    """Wynik odczytu jednego katalogu."""
+
+    path: str
+    used: int = 0
+    stale: int = 0
+    subdirectories: list[tuple[str, EntryKey, int]] = field(default_factory=list)
+    hard_links: list[tuple[EntryKey, tuple[int, int], int]] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class NativeScan:
+    """Wynik natywnego skanu roota."""
+
+    totals: dict[str, int]
+    stale: dict[str, int]
+    errors: list[str]
+    timed_out: bool = False
+
+
+def read_listing(
+    path: str,
+    key: EntryKey,
+    device: int,
+    excludes: list[str],
+    cutoff: float | None,
+    time_attribute: str,
+) -> DirectoryListing:
+    """
+    Odczytuje wpisy katalogu i sumuje zajętość plików bezpośrednich.
+
+    Pliki z kilkoma twardymi linkami nie są sumowane od razu, tylko
+    zwracane z kluczem kolejności przejścia (indeksy wpisów od roota),
+    aby po skanie przypisać je do pierwszego katalogu jak du.
+
+    Args:
+        path: Ścieżka katalogu.
+        key: Klucz kolejności katalogu.
+        device: Urządzenie roota (katalogi z innych systemów plików są pomijane).
+        excludes: Wzorce wykluczeń (jak du --exclude).
+        cutoff: Graniczny czas plików stale (None = bez stale).
+        time_attribute: Atrybut stat z czasem (st_mtime, st_atime, st_ctime).
+
+    Returns:
+        Wpisy i sumy katalogu.
+    """
+    listing = DirectoryListing(path=path)
+
+    try:
+        with os.scandir(path) as entries:
+            for index, entry in enumerate(entries):
+                if excludes and is_excluded(entry.path, excludes):
+                    continue
+                try:
+                    stat = entry.stat(follow_symlinks=False)
+                    is_directory = entry.is_dir(follow_symlinks=False)
+                    is_file = entry.is_file(follow_symlinks=False)
+                except OSError as e:
+                    listing.errors.append(f"dsmonitor: cannot access '{entry.path}': {e.strerror}")
+                    continue
+
+                used = stat.st_blocks * 512
+                if is_directory:
+                    if stat.st_dev == device:
+                        listing.subdirectories.append((entry.path, (*key, index), used))
+                    continue
+
+                if cutoff is not None and is_file and getattr(stat, time_attribute) <= cutoff:
+                    listing.stale += stat.st_size
+
+                if stat.st_nlink > 1:
+                    listing.hard_links.append(((*key, index), (stat.st_dev, stat.st_ino), used))
+                else:
+                    listing.used += used
+    except OSError as e:
+        listing.errors.append(f"dsmonitor: cannot read directory '{path}': {e.strerror}")
+
+    return listing
+
+
+def scan_tree(
+    root: str,
+    excludes: list[str],
+    workers: int,
+    stale_days: int | None = None,
+    stale_kind: str = "mtime",
+    timeout: float | None = None,
+    now: float | None = None,
+) -> NativeScan:
+    """
+    Skanuje drzewo roota w obrębie jednego systemu plików.
+
+    Każdy katalog jest osobnym zadaniem puli wątków, więc rodzeństwo jest
+    odczytywane równolegle. Twarde linki są liczone raz - w katalogu, który
+    du odwiedziłby jako pierwszy (kolejność w głąb wg readdir).
+
+    Args:
+        root: Ścieżka roota.
+        excludes: Wzorce wykluczeń.
+        workers: Liczba wątków.
+        stale_days: Wiek plików stale w dniach (None = bez stale).
+        stale_kind: Typ czasu (mtime, atime, ctime).
+        timeout: Limit czasu skanu w sekundach (None = bez limitu).
+        now: Bieżący czas (None = teraz).
+
+    Returns:
+        Zajętość i stale bezpośrednie per katalog oraz błędy odczytu.
+
+    Raises:
+        OSError: Gdy root nie istnieje lub jest niedostępny.
+    """
+    root = normalize_path(root)
+    root_stat = os.lstat(root)
+    cutoff = None
+    if stale_days is not None:
+        cutoff = (time.time() if now is None else now) - (stale_days + 1) * 86400
+    time_attribute = STAT_TIME_ATTRIBUTES[stale_kind]
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    scan = NativeScan(totals={root: root_stat.st_blocks * 512}, stale={}, errors=[])
+    hard_links: list[tuple[EntryKey, tuple[int, int], str, int]] = []
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+
+        def submit(path: str, key: EntryKey) -> Future[DirectoryListing]:
+            return pool.submit(read_listing, path, key, root_stat.st_dev, excludes, cutoff, time_attribute)
+
+        pending = {submit(root, ())}
+        while pending:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                scan.timed_out = True
+                for future in pending:
+                    future.cancel()
+                break
+            for future in done:
+                listing = future.result()
+                scan.totals[listing.path] += listing.used
+                if listing.stale > 0:
+                    scan.stale[listing.path] = listing.stale
+                scan.errors.extend(listing.errors)
+                hard_links.extend((key, inode, listing.path, used) for key, inode, used in listing.hard_links)
+                for path, key, used in listing.subdirectories:
+                    scan.totals[path] = used
+                    pending.add(submit(path, key))
+
+    seen_inodes: set[tuple[int, int]] = set()
+    for _, inode, directory, used in sorted(hard_links):
+        if inode not in seen_inodes:
+            seen_inodes.add(inode)
+            scan.totals[directory] += used
+
+    return scan
@@ -0,0 +1,892 @@
+"""Plan skanu roota - logika niezależna od sposobu wykonywania komend.
+
+Plan jest generatorem: zwraca kolejne kroki CommandStep (komenda i obsługa
+linii stdout) lub CallStep (praca w procesie, np. natywny skan lokalny),
+a w odpowiedzi dostaje CommandResult. Ten sam plan wykonuje
+silnik wątkowy (run_plan) i asynchroniczny (async_engine.run_plan_async),
+więc oba zwracają identyczne RootSummary.
+"""
+
+import json
+import os
+import time
+from collections.abc import Callable, Generator, Iterable
+from dataclasses import dataclass
+from functools import partial
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+from dsmonitor.analyzer import (
+    SOURCE_FILESYSTEM,
+    SOURCE_PREVIOUS,
+    HostResult,
+    RootSummary,
+    add_du_line,
+    add_tree_scan_line,
+    attribute_stale,
+    enrich_with_stale,
+    find_top_n_by_stale,
+    find_top_n_file_heavy,
+    rollup_tree_scan,
+    root_summary_from_dict,
+)
+from dsmonitor.cache import (
+    DirectSizes,
+    UsageSnapshot,
+    add_dir_mtime_line,
+    load_scan_cache,
+    load_usage_snapshot,
+    save_scan_cache,
+    save_usage_snapshot,
+    scan_cache_path,
+    split_dirty_directories,
+    usage_cache_path,
+)
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.executor import (
+    CommandResult,
+    HostHealth,
+    add_stale_batch_line,
+    build_df_command,
+    build_host_agent_command,
+    build_host_dir_listing_command,
+    build_host_direct_size_commands,
+    build_host_du_args,
+    build_host_du_batch_args,
+    build_host_find_stale_batch_command,
+    build_host_tree_scan_command,
+    get_excludes,
+    parse_df_line,
+    stream_command,
+)
+from dsmonitor.journal import scan_fingerprint
+from dsmonitor.metrics import LineMeter, ScanMetrics
+from dsmonitor.native import scan_tree
+from dsmonitor.tree import DirectoryTree, parent_of
+from dsmonitor.utils import count_access_denied_errors, human_size, normalize_path
+
+if TYPE_CHECKING:
+    from dsmonitor.scheduler import ScanJob
+
+
+@dataclass
+class CommandStep:
+    """Krok planu: komenda do wykonania i obsługa kolejnych linii stdout (phase - faza w metrykach)."""
+
+    cmd: str | list[str]
+    on_line: Callable[[str], None]
+    phase: str = "du"
+
+
+@dataclass
+class CallStep:
+    """Krok planu wykonywany w procesie zamiast komendy (blokujący, bez stdout)."""
+
+    call: Callable[[], CommandResult]
+    phase: str = "native"
+
+
+type ScanPlan[T] = Generator[CommandStep | CallStep, CommandResult, T]
+
+
+def run_plan[T](
+    plan: ScanPlan[T],
+    host: HostProfile | None,
+    config: Config,
+    health: HostHealth | None = None,
+    metrics: ScanMetrics | None = None,
+) -> T:
+    """
+    Wykonuje plan synchronicznie (strumieniowo, w bieżącym wątku).
+
+    Args:
+        plan: Plan skanu.
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja.
+        health: Stan hosta dla bezpiecznika (None = bez bezpiecznika).
+        metrics: Metryki roota (czasy faz, liczniki) uzupełniane w miejscu.
+
+    Returns:
+        Wynik planu.
+    """
+    if metrics is None:
+        metrics = ScanMetrics()
+
+    try:
+        with metrics.phase("analysis"):
+            step = next(plan)
+        while True:
+            if isinstance(step, CallStep):
+                with metrics.phase(step.phase):
+                    result = step.call()
+            elif health is not None and health.is_down:
+                metrics.count("skipped_commands")
+                result = health.fast_fail_result(step.cmd)
+            else:
+                meter = LineMeter(step.on_line) if config.collect_line_metrics else None
+                on_line = meter or step.on_line
+                started = time.perf_counter()
+                with stream_command(step.cmd, host, config) as stream:
+                    for line in stream:
+                        on_line(line)
+                    result = stream.result()
+                metrics.record_command(step.phase, time.perf_counter() - started, meter)
+                if health is not None:
+                    health.record(result)
+            with metrics.phase("analysis"):
+                step = plan.send(result)
+    except StopIteration as stop:
+        value: T = stop.value
+        return value
+
+
+def build_host_result(host_name: str, outcomes: Iterable[tuple[RootSummary, str | None]]) -> HostResult:
+    """
+    Składa wynik hosta z wyników rootów (w kolejności z konfiguracji).
+
+    Args:
+        host_name: Nazwa hosta.
+        outcomes: Pary (RootSummary, komunikat błędu lub None).
+
+    Returns:
+        Wynik skanowania hosta.
+    """
+    result = HostResult(host_name=host_name)
+
+    for root_summary, error in outcomes:
+        if error:
+            result.success = False
+            result.errors.append(error)
+            result.failed_roots.append(root_summary.path)
+
+        result.roots.append(root_summary)
+
+    return result
+
+
+def resolve_host_health(config: Config, probed: dict[str, HostHealth]) -> dict[str, HostHealth]:
+    """
+    Buduje stan hostów do skanu z wyników próby osiągalności (wspólne dla obu silników).
+
+    Przy verbose wypisuje hosty, które nie odpowiedziały.
+
+    Args:
+        config: Konfiguracja.
+        probed: Wyniki próby (nazwa hosta -> stan); hosty bez próby dostają świeży stan.
+
+    Returns:
+        Słownik nazwa hosta -> stan hosta dla wszystkich hostów z konfiguracji.
+    """
+    if config.verbose:
+        for host_name, host_health in probed.items():
+            if host_health.is_down:
+                print(f"[{host_name}] Host niedostępny: {host_health.failure}")
+
+    return {host.name: probed.get(host.name) or HostHealth() for host in config.hosts}
+
+
+class RootScan:
+    """
+    Zadanie skanu jednego roota hosta, wspólne dla obu silników.
+
+    Tworzy plan i metryki roota, mierzy czas skanu i zamienia wyjątek
+    zgłoszony w bloku with na błąd roota. Silnik tylko wykonuje plan
+    w bloku with i przypisuje wynik do outcome:
+
+        with RootScan(job, config) as scan:
+            scan.outcome = run_plan(scan.plan, job.host, config, health, scan.metrics)
+        return scan.result()
+    """
+
+    def __init__(self, job: "ScanJob", config: Config) -> None:
+        """
+        Przygotowuje plan skanu roota.
+
+        Args:
+            job: Zadanie (host, root).
+            config: Konfiguracja.
+        """
+        self.job = job
+        self.config = config
+        self.metrics = ScanMetrics()
+        self.plan = plan_root_scan(job.path, job.host, config, job.host_name, self.metrics)
+        self.outcome: tuple[RootSummary, str | None] = RootSummary(path=job.path, total_size=0), None
+        self.seconds = 0.0
+        self._started = 0.0
+
+    def __enter__(self) -> "RootScan":
+        if self.config.verbose:
+            previous = f" (poprzednio {self.job.expected:.1f} s)" if self.job.expected is not None else ""
+            print(f"[{self.job.host_name}] Skanuję: {self.job.path}{previous}")
+        self._started = time.monotonic()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> bool:
+        self.seconds = time.monotonic() - self._started
+        failed = isinstance(exc, Exception)
+        if failed:
+            self.outcome = RootSummary(path=self.job.path, total_size=0, warnings=[f"Błąd: {exc}"]), str(exc)
+        if self.config.verbose:
+            print(f"[{self.job.host_name}] Metryki {self.job.path}: {self.metrics.summary()}")
+        return failed
+
+    def result(self) -> tuple[tuple[RootSummary, str | None], float, ScanMetrics]:
+        """
+        Zwraca wynik zadania dla ScanRun.complete.
+
+        Returns:
+            Krotka (wynik roota, czas skanu w sekundach, metryki roota).
+        """
+        return self.outcome, self.seconds, self.metrics
+
+
+def plan_root_scan(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+    metrics: ScanMetrics | None = None,
+) -> ScanPlan[tuple[RootSummary, str | None]]:
+    """
+    Planuje skan pojedynczej ścieżki: du → analyze → stale.
+
+    W zależności od report_mode:
+    - "size": Top N największych katalogów (file-heavy)
+    - "stale": Top N katalogów z największą ilością starych plików
+    - "growth": jak size, dodatkowo rozmiar i wolne miejsce systemu plików (df)
+
+    Przy fill_threshold lub usage_delta najpierw odczytywana jest zajętość
+    systemu plików roota (statvfs lokalnie, df zdalnie). Root, którego
+    zajętość zmieniła się od ostatniego pełnego skanu najwyżej o usage_delta
+    (i nie przekroczyła progu zapełnienia w żadną stronę), dostaje wynik
+    tamtego skanu; root poniżej fill_threshold bez takiego wyniku - rozmiar
+    z zajętości systemu plików (approx). Pominięcie liczy skipped_scans.
+    Błąd zapisu migawki zajętości trafia do ostrzeżeń roota.
+
+    Dla scan_method "combined" rozmiary i stale pochodzą z jednego
+    przejścia find, bez osobnego du i find stale, a dla "native" z jednego
+    przejścia os.scandir w procesie (tylko tryb lokalny). W trybie incremental
+    rozmiary powstają z cache i pomiaru tylko zmienionych katalogów.
+    Dla scan_method "agent" cały skan i selekcja Top N odbywają się na
+    hoście, a wraca tylko gotowe RootSummary.
+
+    Args:
+        path: Ścieżka do skanowania.
+        host: Profil hosta (None dla trybu lokalnego).
+        config: Konfiguracja.
+        host_name: Nazwa hosta (do logowania).
+        metrics: Metryki roota - plan zapisuje w nich rozmiary słowników
+            (peak_directories, peak_stale_entries).
+
+    Returns:
+        (RootSummary, None) - sukces
+        (RootSummary z ostrzeżeniem, error_message) - błąd
+    """
+    usage: tuple[int, int, int] | None = None
+    if config.fill_threshold is not None or config.usage_delta is not None:
+        usage, _ = yield from _plan_root_usage(path, host, config)
+
+    if usage is not None:
+        skipped = _skip_full_scan(path, host, config, host_name, usage)
+        if skipped is not None:
+            if metrics is not None:
+                metrics.count("skipped_scans")
+            if config.verbose:
+                print(f"[{host_name}] Pomijam skan {path}: {skipped.warnings[-1]}")
+            return skipped, None
+
+    outcome = yield from _plan_full_scan(path, host, config, host_name, metrics, usage)
+    if usage is not None and config.usage_delta is not None and outcome[1] is None:
+        snapshot = UsageSnapshot(usage[1], filesystem_fill(usage), time.time(), outcome[0])
+        try:
+            save_usage_snapshot(
+                usage_cache_path(config.cache_dir, host_name, path), scan_fingerprint(config, host), snapshot
+            )
+        except OSError as e:
+            outcome[0].warnings.append(f"Nie udało się zapisać migawki zajętości: {e}")
+    return outcome
+
+
+def _skip_full_scan(
+    path: str, host: HostProfile | None, config: Config, host_name: str, usage: tuple[int, int, int]
+) -> RootSummary | None:
+    """
+    Decyduje na podstawie zajętości systemu plików, czy pominąć pełny skan roota.
+
+    Returns:
+        Wynik roota bez pełnego skanu (poprzedni lub z df) albo None, gdy root trzeba przeskanować.
+    """
+    fill = filesystem_fill(usage)
+
+    if config.usage_delta is not None:
+        previous = load_usage_snapshot(
+            usage_cache_path(config.cache_dir, host_name, path), scan_fingerprint(config, host)
+        )
+        if previous is not None:
+            moved = abs(usage[1] - previous.used)
+            crossed = config.fill_threshold is not None and (previous.fill < config.fill_threshold) != (
+                fill < config.fill_threshold
+            )
+            if moved <= config.usage_delta and not crossed:
+                summary = previous.summary
+                summary.source = SOURCE_PREVIOUS
+                summary.fs_size, _, summary.fs_available = usage
+                scanned = time.strftime("%Y-%m-%d %H:%M", time.localtime(previous.timestamp))
+                summary.warnings.append(
+                    f"Wynik skanu z {scanned}: zajętość zmieniła się o {human_size(moved)} "
+                    f"(próg {human_size(config.usage_delta)})"
+                )
+                return summary
+
+    if config.fill_threshold is not None and fill < config.fill_threshold:
+        return usage_summary(path, usage, config.fill_threshold)
+
+    return None
+
+
+def _plan_full_scan(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+    metrics: ScanMetrics | None,
+    usage: tuple[int, int, int] | None,
+) -> ScanPlan[tuple[RootSummary, str | None]]:
+    """Planuje pełny skan roota wybraną metodą (usage - już odczytana zajętość dla trybu growth)."""
+    if config.scan_method == "agent":
+        outcome = yield from _plan_agent_scan(path, host, config)
+        if config.report_mode == "growth" and not config.dry_run:
+            yield from _plan_filesystem_usage(path, host, config, outcome[0], usage)
+        return outcome
+
+    root = normalize_path(path)
+    combined = config.scan_method in ("combined", "native")
+    scan_label = "skanu" if combined else "du"
+    all_stale: dict[str, int] | None = None
+    sizes: dict[str, int] = {}
+    warnings: list[str] = []
+
+    if combined:
+        all_stale = {}
+        if config.scan_method == "native":
+            du_result = yield CallStep(partial(_run_native_scan, path, config, sizes, all_stale))
+        else:
+            du_result = yield CommandStep(
+                build_host_tree_scan_command(path, host, config), partial(add_tree_scan_line, sizes, all_stale), "scan"
+            )
+        depth = host.get_scan_depth(config.scan_depth) if host else config.scan_depth
+        sizes = rollup_tree_scan(sizes, root, depth)
+    elif config.adaptive_depth and config.report_mode != "stale":
+        sizes, du_result = yield from _plan_adaptive_sizes(path, host, config, host_name)
+    elif config.incremental:
+        scan_label = "skanu przyrostowego"
+        sizes, du_result = yield from _plan_incremental_sizes(path, host, config, host_name, warnings)
+        depth = host.get_scan_depth(config.scan_depth) if host else config.scan_depth
+        sizes = rollup_tree_scan(sizes, root, depth)
+    else:
+        du_result = yield CommandStep(build_host_du_args(path, host, config), partial(add_du_line, sizes))
+
+    if du_result.dry_run:
+        print(f"[DRY-RUN] {du_result.command}")
+        return (
+            RootSummary(path=path, total_size=0, warnings=["Tryb dry-run"]),
+            None,
+        )
+
+    if du_result.timed_out or (not du_result.success and root not in sizes):
+        detail = du_result.stderr
+        if du_result.timed_out and "Timeout" not in detail:
+            detail = f"Timeout po {config.timeout} sekundach\n{detail}".rstrip("\n")
+        return (
+            RootSummary(
+                path=path,
+                total_size=0,
+                warnings=[f"Błąd {scan_label}: {detail}"],
+            ),
+            f"Błąd {scan_label} dla {path}: {detail}",
+        )
+
+    if metrics is not None:
+        metrics.count("peak_directories", len(sizes))
+        if all_stale is not None:
+            metrics.count("peak_stale_entries", len(all_stale))
+
+    if all_stale is not None and config.verbose:
+        print(f"[{host_name}] Skan jednoprzebiegowy: {len(all_stale)} katalogów z plikami stale")
+
+    root_total = sizes.get(root, 0)
+    tree = DirectoryTree(sizes, root)
+
+    if du_result.stderr:
+        access_denied_count = count_access_denied_errors(du_result.stderr)
+        if access_denied_count > 0:
+            warnings.append(f"Pominięto {access_denied_count} katalogów z powodu braku dostępu")
+
+    if config.report_mode == "stale":
+        return (
+            yield from _plan_stale_mode(
+                path, host, config, host_name, sizes, tree, root_total, warnings, all_stale, metrics
+            )
+        )
+
+    outcome = yield from _plan_size_mode(
+        path, host, config, host_name, sizes, tree, root_total, warnings, all_stale, metrics
+    )
+    if config.report_mode == "growth":
+        yield from _plan_filesystem_usage(path, host, config, outcome[0], usage)
+    return outcome
+
+
+def _run_native_scan(path: str, config: Config, totals: dict[str, int], stale: dict[str, int]) -> CommandResult:
+    """
+    Wykonuje natywny skan lokalny i uzupełnia słowniki jak add_tree_scan_line.
+
+    Returns:
+        Wynik w postaci CommandResult (błędy odczytu w stderr).
+    """
+    command = f"native-scan {path}"
+    if config.dry_run:
+        return CommandResult(command=command, stdout="", stderr="", return_code=0, dry_run=True)
+
+    try:
+        scan = scan_tree(
+            path, config.excludes, config.native_workers, config.stale_days, config.stale_kind, config.timeout
+        )
+    except OSError as e:
+        return CommandResult(
+            command=command, stdout="", stderr=f"dsmonitor: cannot access '{path}': {e.strerror}\n", return_code=1
+        )
+
+    totals.update(scan.totals)
+    stale.update(scan.stale)
+    return CommandResult(
+        command=command,
+        stdout="",
+        stderr="".join(f"{error}\n" for error in scan.errors),
+        return_code=1 if scan.errors else 0,
+        timed_out=scan.timed_out,
+    )
+
+
+def _plan_agent_scan(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+) -> ScanPlan[tuple[RootSummary, str | None]]:
+    """
+    Planuje skan roota przez agenta zdalnego (jedna linia JSON z RootSummary).
+
+    Returns:
+        (RootSummary, None) - sukces
+        (RootSummary z ostrzeżeniem, error_message) - błąd
+    """
+    lines: list[str] = []
+    agent_result = yield CommandStep(build_host_agent_command(path, host, config), lines.append, "agent")
+
+    if agent_result.dry_run:
+        print(f"[DRY-RUN] {agent_result.command}")
+        return RootSummary(path=path, total_size=0, warnings=["Tryb dry-run"]), None
+
+    summary: RootSummary | None = None
+    if lines:
+        try:
+            summary = root_summary_from_dict(json.loads(lines[-1]))
+        except (ValueError, TypeError):
+            summary = None
+
+    if summary is None:
+        error = agent_result.stderr.strip() or f"kod wyjścia {agent_result.return_code}"
+        return (
+            RootSummary(path=path, total_size=0, warnings=[f"Błąd agenta: {error}"]),
+            f"Błąd agenta dla {path}: {error}",
+        )
+
+    access_denied_count = count_access_denied_errors(agent_result.stderr)
+    if access_denied_count > 0:
+        summary.warnings.insert(0, f"Pominięto {access_denied_count} katalogów z powodu braku dostępu")
+
+    return summary, None
+
+
+def _plan_adaptive_sizes(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+) -> ScanPlan[tuple[dict[str, int], CommandResult]]:
+    """
+    Planuje du o adaptacyjnej głębokości.
+
+    Pierwsze du sięga adaptive_step poziomów. W kolejnych rundach du
+    (jedno wywołanie na wiele katalogów) schodzi o adaptive_step poziomów
+    tylko pod katalogami z dolnej krawędzi skanu, które są nie mniejsze niż
+    N-ty kandydat Top N (podkatalog nie może być większy od przodka) i mają
+    co najmniej adaptive_share rozmiaru rodzica. Rundy kończą się, gdy
+    żaden katalog krawędzi nie wymaga rozwinięcia; przy adaptive_share 0
+    Top N jest taki sam jak z pełnego du do scan_depth. Wyjątkiem są twarde
+    linki współdzielone między poddrzewami mierzonymi w różnych rundach -
+    du może je wtedy przypisać innemu katalogowi (rozmiary katalogów
+    z wcześniejszych rund nie są nadpisywane).
+
+    Returns:
+        (ścieżka -> rozmiar jak z du, zbiorczy wynik komend)
+    """
+    root = normalize_path(path)
+    max_depth = host.get_scan_depth(config.scan_depth) if host else config.scan_depth
+    step = min(config.adaptive_step, max_depth)
+    sizes: dict[str, int] = {}
+
+    first = yield CommandStep(build_host_du_args(path, host, config, depth=step), partial(add_du_line, sizes))
+    if first.dry_run or not sizes:
+        return sizes, first
+
+    tree = DirectoryTree(sizes, root)
+    frontier = {p: step for p in tree.paths if step < max_depth and tree.depth_of(p) == step}
+    stderr_parts = [first.stderr]
+    return_code = first.return_code
+    timed_out = first.timed_out
+    rounds = 0
+
+    while frontier and not timed_out:
+        top = find_top_n_file_heavy(sizes, root, config.top_n, config.file_heavy_threshold)
+        bound = top[-1].total_size if len(top) >= config.top_n else 0
+        expand = [
+            p
+            for p in frontier
+            if sizes.get(p, 0) >= bound
+            and sizes.get(p, 0) >= config.adaptive_share * sizes.get(parent_of(p), 0)
+            and sizes.get(p, 0) > 0
+        ]
+        if not expand:
+            break
+
+        rounds += 1
+        by_depth: dict[int, list[str]] = {}
+        for p in expand:
+            by_depth.setdefault(frontier.pop(p), []).append(p)
+
+        for depth, paths in by_depth.items():
+            levels = min(step, max_depth - depth)
+            for args in build_host_du_batch_args(paths, host, config, levels):
+                measured: dict[str, int] = {}
+                result = yield CommandStep(args, partial(add_du_line, measured))
+                stderr_parts.append(result.stderr)
+                return_code = return_code or result.return_code
+                timed_out = timed_out or result.timed_out
+                sizes.update((p, size) for p, size in measured.items() if p not in sizes)
+                if depth + levels < max_depth:
+                    frontier.update((p, depth + levels) for p in measured if tree.depth_of(p) == depth + levels)
+
+    if config.verbose:
+        print(f"[{host_name}] Adaptacyjna głębokość: {rounds} rund, {len(sizes)} katalogów")
+
+    return sizes, CommandResult(
+        command=first.command,
+        stdout="",
+        stderr="".join(stderr_parts),
+        return_code=return_code,
+        timed_out=timed_out,
+    )
+
+
+def _plan_incremental_sizes(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+    warnings: list[str],
+) -> ScanPlan[tuple[dict[str, int], CommandResult]]:
+    """
+    Planuje przyrostowy pomiar zajętości bezpośredniej katalogów roota.
+
+    Listing katalogów z mtime jest porównywany z cache; ponownie mierzone są
+    tylko katalogi nowe, o zmienionym mtime lub z plikami o wielu twardych
+    linkach (te liczone są raz, jak w du). Cache jest aktualizowany,
+    o ile żaden krok nie przekroczył timeoutu. Błąd zapisu cache trafia
+    do warnings i nie przerywa skanu.
+
+    Returns:
+        (katalog -> zajętość bezpośrednia, zbiorczy wynik komend)
+    """
+    mtimes: dict[str, str] = {}
+    listing = yield CommandStep(
+        build_host_dir_listing_command(path, host, config), partial(add_dir_mtime_line, mtimes), "listing"
+    )
+
+    if listing.dry_run or not mtimes:
+        return {}, listing
+
+    excludes = get_excludes(host, config)
+    cache_file = scan_cache_path(config.cache_dir, host_name, path)
+    direct, dirty = split_dirty_directories(mtimes, load_scan_cache(cache_file, excludes))
+
+    if config.verbose:
+        print(f"[{host_name}] Skan przyrostowy: {len(dirty)} z {len(mtimes)} katalogów do pomiaru")
+
+    measured = DirectSizes()
+    stderr_parts = [listing.stderr]
+    return_code = listing.return_code
+    timed_out = listing.timed_out
+
+    for cmd in build_host_direct_size_commands(dirty, host, config):
+        result = yield CommandStep(cmd, measured.add_line)
+        stderr_parts.append(result.stderr)
+        return_code = return_code or result.return_code
+        timed_out = timed_out or result.timed_out
+
+    if not timed_out:
+        entries = {directory: (mtimes[directory], size, False) for directory, size in direct.items()}
+        entries.update(
+            (directory, (mtimes[directory], measured.sizes[directory], directory in measured.linked))
+            for directory in dirty
+            if directory in measured.sizes
+        )
+        try:
+            save_scan_cache(cache_file, path, excludes, entries)
+        except OSError as e:
+            warnings.append(f"Nie udało się zapisać cache skanu: {e}")
+
+    direct.update(measured.sizes)
+    combined_result = CommandResult(
+        command=listing.command,
+        stdout="",
+        stderr="".join(stderr_parts),
+        return_code=return_code,
+        timed_out=timed_out,
+    )
+    return direct, combined_result
+
+
+def _add_df_line(usage: list[tuple[int, int, int]], line: str) -> None:
+    """Dodaje sparsowaną linię danych df do listy (nagłówek jest pomijany)."""
+    parsed = parse_df_line(line)
+    if parsed is not None:
+        usage.append(parsed)
+
+
+def filesystem_fill(usage: tuple[int, int, int]) -> float:
+    """
+    Zwraca zapełnienie systemu plików jak kolumna Capacity w df.
+
+    Args:
+        usage: Krotka (rozmiar, zajęte, wolne) w bajtach.
+
+    Returns:
+        Zajęte / (zajęte + wolne dla użytkowników), 0.0 dla pustego systemu plików.
+    """
+    _, used, available = usage
+    return used / (used + available) if used + available > 0 else 0.0
+
+
+def usage_summary(path: str, usage: tuple[int, int, int], fill_threshold: float) -> RootSummary:
+    """
+    Buduje podsumowanie roota bez skanu - rozmiar to zajętość systemu plików.
+
+    Args:
+        path: Ścieżka roota.
+        usage: Krotka (rozmiar, zajęte, wolne) w bajtach.
+        fill_threshold: Próg zapełnienia, poniżej którego root nie był skanowany.
+
+    Returns:
+        Podsumowanie z approx=True, source=SOURCE_FILESYSTEM i bez Top N.
+    """
+    fs_size, used, available = usage
+    return RootSummary(
+        path=path,
+        total_size=used,
+        approx=True,
+        fs_size=fs_size,
+        fs_available=available,
+        source=SOURCE_FILESYSTEM,
+        warnings=[
+            f"Bez skanu: zapełnienie {filesystem_fill(usage):.0%} poniżej progu {fill_threshold:.0%} "
+            "(rozmiar = zajętość systemu plików)"
+        ],
+    )
+
+
+def _statvfs_usage(path: str, config: Config, usage: list[tuple[int, int, int]]) -> CommandResult:
+    """
+    Odczytuje zajętość systemu plików przez os.statvfs (jak df -Pk, bez procesu df).
+
+    Returns:
+        Wynik w postaci CommandResult (błąd w stderr).
+    """
+    command = f"statvfs {path}"
+    if config.dry_run:
+        return CommandResult(command=command, stdout="", stderr="", return_code=0, dry_run=True)
+
+    try:
+        stat = os.statvfs(path)
+    except OSError as e:
+        return CommandResult(command=command, stdout="", stderr=f"statvfs: {path}: {e.strerror}\n", return_code=1)
+
+    usage.append(
+        (
+            stat.f_blocks * stat.f_frsize,
+            (stat.f_blocks - stat.f_bfree) * stat.f_frsize,
+            stat.f_bavail * stat.f_frsize,
+        )
+    )
+    return CommandResult(command=command, stdout="", stderr="", return_code=0)
+
+
+def _plan_root_usage(
+    path: str, host: HostProfile | None, config: Config
+) -> ScanPlan[tuple[tuple[int, int, int] | None, str]]:
+    """
+    Planuje odczyt zajętości systemu plików roota (statvfs lokalnie, df -Pk zdalnie).
+
+    Returns:
+        ((rozmiar, zajęte, wolne) w bajtach, stderr) - sukces
+        (None, stderr) - błąd lub dry-run
+    """
+    usage: list[tuple[int, int, int]] = []
+    if host is None:
+        result = yield CallStep(partial(_statvfs_usage, path, config, usage), "df")
+    else:
+        result = yield CommandStep(build_df_command(path), partial(_add_df_line, usage), "df")
+
+    if result.dry_run:
+        print(f"[DRY-RUN] {result.command}")
+    return (usage[-1] if usage else None), result.stderr
+
+
+def _plan_filesystem_usage(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    summary: RootSummary,
+    usage: tuple[int, int, int] | None = None,
+) -> ScanPlan[None]:
+    """Uzupełnia fs_size/fs_available podsumowania (z usage lub z nowego odczytu)."""
+    stderr = ""
+    if usage is None:
+        usage, stderr = yield from _plan_root_usage(path, host, config)
+
+    if usage is not None:
+        summary.fs_size, _, summary.fs_available = usage
+    elif stderr:
+        summary.warnings.append(f"Błąd df: {stderr[:100]}")
+
+
+def _plan_stale_batch(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+    metrics: ScanMetrics | None = None,
+) -> ScanPlan[tuple[dict[str, int] | None, str]]:
+    """
+    Planuje find stale dla roota.
+
+    Returns:
+        (słownik ścieżka -> stale, stderr) - sukces
+        (None, stderr) - błąd
+    """
+    if config.verbose:
+        print(f"[{host_name}] Obliczam stale dla {path}...")
+
+    all_stale: dict[str, int] = {}
+    stale_batch_result = yield CommandStep(
+        build_host_find_stale_batch_command(path, host, config), partial(add_stale_batch_line, all_stale), "stale"
+    )
+
+    if not stale_batch_result.success:
+        return None, stale_batch_result.stderr
+
+    if metrics is not None:
+        metrics.count("peak_stale_entries", len(all_stale))
+
+    if config.verbose:
+        print(f"[{host_name}] Stale batch: {len(all_stale)} katalogów z plikami stale")
+
+    return all_stale, stale_batch_result.stderr
+
+
+def _plan_size_mode(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+    sizes: dict[str, int],
+    tree: DirectoryTree,
+    root_total: int,
+    warnings: list[str],
+    all_stale: dict[str, int] | None = None,
+    metrics: ScanMetrics | None = None,
+) -> ScanPlan[tuple[RootSummary, str | None]]:
+    """Tryb size: Top N największych katalogów file-heavy, wzbogacone o stale."""
+
+    top_dirs = find_top_n_file_heavy(sizes, path, config.top_n, config.file_heavy_threshold, tree=tree)
+
+    root_summary = RootSummary(
+        path=path,
+        total_size=root_total,
+        top_directories=top_dirs,
+        warnings=warnings[:10],
+    )
+
+    if config.stale_days > 0 and root_summary.top_directories:
+        stale_error = ""
+        if all_stale is None:
+            all_stale, stale_error = yield from _plan_stale_batch(path, host, config, host_name, metrics)
+
+        if all_stale is not None:
+            top_paths = (d.path for d in root_summary.top_directories)
+            stale_results, unmatched_size, root_stale = attribute_stale(all_stale, top_paths)
+
+            if config.verbose and unmatched_size > 0:
+                print(f"[{host_name}] Niedopasowane stale: {human_size(unmatched_size)} (poza Top N)")
+
+            enrich_with_stale(root_summary, stale_results, root_stale)
+        elif stale_error:
+            root_summary.warnings.append(f"Błąd stale: {stale_error[:100]}")
+
+    return root_summary, None
+
+
+def _plan_stale_mode(
+    path: str,
+    host: HostProfile | None,
+    config: Config,
+    host_name: str,
+    sizes: dict[str, int],
+    tree: DirectoryTree,
+    root_total: int,
+    warnings: list[str],
+    all_stale: dict[str, int] | None = None,
+    metrics: ScanMetrics | None = None,
+) -> ScanPlan[tuple[RootSummary, str | None]]:
+    """Tryb stale: Top N katalogów z największą ilością starych plików."""
+    if all_stale is None:
+        all_stale, stale_error = yield from _plan_stale_batch(path, host, config, host_name, metrics)
+
+        if all_stale is None:
+            return (
+                RootSummary(
+                    path=path,
+                    total_size=root_total,
+                    warnings=[*warnings, f"Błąd stale: {stale_error[:100]}"],
+                ),
+                None,
+            )
+
+    top_dirs = find_top_n_by_stale(all_stale, sizes, path, config.top_n, tree=tree)
+    root_stale = sum(all_stale.values())
+
+    return (
+        RootSummary(
+            path=path,
+            total_size=root_total,
+            stale_size=root_stale,
+            top_directories=top_dirs,
+            warnings=warnings[:10],
+        ),
+        None,
+    )
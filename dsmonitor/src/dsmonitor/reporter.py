@@ -3,8 +3,9 @@
 import csv
 import io
 import json
+from abc import ABC, abstractmethod
 from datetime import UTC, datetime
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TextIO
 
 from dsmonitor import __version__
 from dsmonitor.utils import human_size
@@ -25,12 +26,13 @@ def generate_report(results: list["HostResult"], config: "Config") -> str:
     Returns:
         Sformatowany raport.
     """
-    if config.output_format == "json":
-        return format_json_report(results, config)
-    elif config.output_format == "csv":
-        return format_csv_report(results)
-    else:
-        return format_text_report(results, config)
+    output = io.StringIO()
+    writer = create_report_writer(output, config)
+    writer.begin()
+    for host_result in results:
+        writer.write_host(host_result)
+    writer.end()
+    return output.getvalue()
 
 
 def get_metadata(config: "Config") -> dict[str, Any]:
@@ -59,7 +61,11 @@ def get_metadata(config: "Config") -> dict[str, Any]:
 
 def _format_report_header(config: "Config") -> list[str]:
     """Buduje nagłówek raportu tekstowego."""
-    mode_label = "NAJWIĘKSZE KATALOGI" if config.report_mode == "size" else "KATALOGI ZE STARYMI PLIKAMI"
+    mode_label = {
+        "size": "NAJWIĘKSZE KATALOGI",
+        "stale": "KATALOGI ZE STARYMI PLIKAMI",
+        "growth": "TEMPO PRZYROSTU KATALOGÓW",
+    }.get(config.report_mode, "NAJWIĘKSZE KATALOGI")
     return [
         "=" * 70,
         f"DISK SPACE MONITOR - {mode_label}",
@@ -82,43 +88,80 @@ def _format_report_footer() -> list[str]:
     ]
 
 
-def format_text_report(results: list["HostResult"], config: "Config") -> str:
-    """
-    Formatuje raport tekstowy.
-
-    Args:
-        results: Lista wyników dla hostów.
-        config: Konfiguracja.
+def _format_host_section(host_result: "HostResult", config: "Config") -> list[str]:
+    """Buduje sekcję hosta raportu tekstowego (błędy i podsumowania rootów)."""
+    host_label = "LOCALHOST" if config.local else host_result.host_name
+    lines = ["", "=" * 70, f"HOST: {host_label}", "=" * 70]
 
-    Returns:
-        Raport tekstowy.
-    """
-    lines: list[str] = _format_report_header(config)
+    if host_result.errors:
+        lines.append("")
+        lines.append("BŁĘDY:")
+        for error in host_result.errors:
+            lines.append(f"  ✗ {error}")
 
-    for host_result in results:
+    for root in host_result.roots:
         lines.append("")
-        lines.append("=" * 70)
-        host_label = "LOCALHOST" if config.local else host_result.host_name
-        lines.append(f"HOST: {host_label}")
-        lines.append("=" * 70)
+        lines.append(_format_root_summary(root, config))
 
-        if host_result.errors:
-            lines.append("")
-            lines.append("BŁĘDY:")
-            for error in host_result.errors:
-                lines.append(f"  ✗ {error}")
+    return lines
 
-        for root in host_result.roots:
-            lines.append("")
-            lines.append(_format_root_summary(root, config))
 
-    lines.extend(_format_report_footer())
+def _format_growth_rate(bytes_per_day: float) -> str:
+    """Formatuje tempo przyrostu ze znakiem (np. "+1.5 GB/dzień")."""
+    sign = "-" if bytes_per_day < 0 else "+"
+    return f"{sign}{human_size(round(abs(bytes_per_day)))}/dzień"
+
+
+def _format_days_until_full(days: float | None) -> str:
+    """Formatuje prognozę zapełnienia."""
+    return "brak prognozy" if days is None else f"{days:.0f} dni"
+
+
+def _round_optional(value: float | None) -> float | None:
+    """Zaokrągla wartość do 1 miejsca po przecinku (None bez zmian)."""
+    return None if value is None else round(value, 1)
+
+
+def _format_growth_summary(root: "RootSummary") -> str:
+    """Formatuje podsumowanie roota w trybie growth."""
+    lines: list[str] = []
+
+    growth_info = ""
+    if root.growth_per_day is not None:
+        growth_info = f", Przyrost: {_format_growth_rate(root.growth_per_day)}"
+
+    lines.append(f"ROOT: {root.path}")
+    lines.append(f"  Rozmiar: {human_size(root.total_size)}{growth_info}")
+    if root.fs_available is not None:
+        lines.append(
+            f"  Wolne: {human_size(root.fs_available)}, Pełny za: {_format_days_until_full(root.days_until_full)}"
+        )
+    lines.append("─" * 60)
+
+    if root.warnings:
+        lines.append("  Ostrzeżenia:")
+        for warning in root.warnings[:5]:
+            lines.append(f"    ⚠ {warning}")
+        lines.append("")
+
+    if not root.growth:
+        lines.append("  Brak historii do wyliczenia przyrostu (potrzebne co najmniej 2 skany).")
+    else:
+        for i, growth in enumerate(root.growth, 1):
+            lines.append(f"  {i:3}. {growth.path}")
+            lines.append(f"       Przyrost: {_format_growth_rate(growth.bytes_per_day)} (skanów: {growth.samples})")
+            lines.append(f"       Rozmiar: {human_size(growth.total_size)}")
+            lines.append(f"       Pełny za: {_format_days_until_full(growth.days_until_full)}")
+            lines.append("")
 
     return "\n".join(lines)
 
 
 def _format_root_summary(root: "RootSummary", config: "Config") -> str:
     """Formatuje podsumowanie dla roota."""
+    if config.report_mode == "growth":
+        return _format_growth_summary(root)
+
     lines: list[str] = []
     is_stale_mode = config.report_mode == "stale"
     stale_days = config.stale_days
@@ -161,117 +204,252 @@ def _format_root_summary(root: "RootSummary", config: "Config") -> str:
     return "\n".join(lines)
 
 
-def format_json_report(results: list["HostResult"], config: "Config") -> str:
+def host_result_to_json(host_result: "HostResult", config: "Config") -> dict[str, Any]:
     """
-    Formatuje raport JSON.
+    Buduje słownik JSON dla wyniku hosta.
 
     Args:
-        results: Lista wyników dla hostów.
+        host_result: Wynik hosta.
         config: Konfiguracja.
 
     Returns:
-        Raport JSON.
+        Słownik w formacie elementu "hosts" raportu JSON.
     """
-    data: dict[str, Any] = {
-        "metadata": get_metadata(config),
-        "hosts": [],
+    host_data: dict[str, Any] = {
+        "name": host_result.host_name,
+        "success": host_result.success,
+        "errors": host_result.errors,
+        "roots": [],
     }
 
-    for host_result in results:
-        host_data: dict[str, Any] = {
-            "name": host_result.host_name,
-            "success": host_result.success,
-            "errors": host_result.errors,
-            "roots": [],
+    for root in host_result.roots:
+        root_data: dict[str, Any] = {
+            "path": root.path,
+            "total_size_bytes": root.total_size,
+            "total_size_human": human_size(root.total_size),
+            "stale_size_bytes": root.stale_size,
+            "stale_size_human": human_size(root.stale_size) if root.stale_size is not None else None,
+            "approx": root.approx,
+            "source": root.source,
+            "warnings": root.warnings,
+            "directories": [],
         }
 
-        for root in host_result.roots:
-            root_data: dict[str, Any] = {
-                "path": root.path,
-                "total_size_bytes": root.total_size,
-                "total_size_human": human_size(root.total_size),
-                "stale_size_bytes": root.stale_size,
-                "stale_size_human": human_size(root.stale_size) if root.stale_size is not None else None,
-                "approx": root.approx,
-                "warnings": root.warnings,
-                "directories": [],
+        for dir_info in root.top_directories:
+            dir_data = {
+                "path": dir_info.path,
+                "total_size_bytes": dir_info.total_size,
+                "total_size_human": human_size(dir_info.total_size),
+                "direct_files_size_bytes": dir_info.direct_files_size,
+                "direct_files_size_human": human_size(dir_info.direct_files_size),
+                "file_heavy_ratio": round(dir_info.file_heavy_ratio, 3),
+                "stale_size_bytes": dir_info.stale_size,
+                "stale_size_human": human_size(dir_info.stale_size) if dir_info.stale_size is not None else None,
+                "parent_path": dir_info.parent_path,
+                "parent_total_size_bytes": dir_info.parent_total_size,
+                "parent_total_size_human": (
+                    human_size(dir_info.parent_total_size) if dir_info.parent_total_size else None
+                ),
+                "depth": dir_info.depth,
             }
-
-            for dir_info in root.top_directories:
-                dir_data = {
-                    "path": dir_info.path,
-                    "total_size_bytes": dir_info.total_size,
-                    "total_size_human": human_size(dir_info.total_size),
-                    "direct_files_size_bytes": dir_info.direct_files_size,
-                    "direct_files_size_human": human_size(dir_info.direct_files_size),
-                    "file_heavy_ratio": round(dir_info.file_heavy_ratio, 3),
-                    "stale_size_bytes": dir_info.stale_size,
-                    "stale_size_human": human_size(dir_info.stale_size) if dir_info.stale_size is not None else None,
-                    "parent_path": dir_info.parent_path,
-                    "parent_total_size_bytes": dir_info.parent_total_size,
-                    "parent_total_size_human": (
-                        human_size(dir_info.parent_total_size) if dir_info.parent_total_size else None
-                    ),
-                    "depth": dir_info.depth,
+            root_data["directories"].append(dir_data)
+
+        if config.report_mode == "growth":
+            root_data.update(
+                {
+                    "fs_size_bytes": root.fs_size,
+                    "fs_available_bytes": root.fs_available,
+                    "growth_bytes_per_day": _round_optional(root.growth_per_day),
+                    "days_until_full": _round_optional(root.days_until_full),
+                    "growth": [
+                        {
+                            "path": growth.path,
+                            "total_size_bytes": growth.total_size,
+                            "growth_bytes_per_day": round(growth.bytes_per_day, 1),
+                            "days_until_full": _round_optional(growth.days_until_full),
+                            "samples": growth.samples,
+                        }
+                        for growth in root.growth
+                    ],
                 }
-                root_data["directories"].append(dir_data)
+            )
 
-            host_data["roots"].append(root_data)
+        host_data["roots"].append(root_data)
 
-        data["hosts"].append(host_data)
+    return host_data
 
-    return json.dumps(data, indent=2, ensure_ascii=False)
 
+CSV_HEADER = [
+    "host",
+    "root",
+    "path",
+    "total_size_bytes",
+    "total_size_human",
+    "direct_files_size_bytes",
+    "file_heavy_ratio",
+    "stale_size_bytes",
+    "parent_path",
+    "parent_total_size_bytes",
+    "depth",
+]
 
-def format_csv_report(results: list["HostResult"]) -> str:
-    """
-    Formatuje raport CSV.
+GROWTH_CSV_HEADER = ["host", "root", "path", "total_size_bytes", "growth_bytes_per_day", "days_until_full", "samples"]
 
-    Args:
-        results: Lista wyników dla hostów.
 
-    Returns:
-        Raport CSV.
-    """
-    output = io.StringIO()
-    writer = csv.writer(output)
+def _csv_rows(host_result: "HostResult") -> list[list[Any]]:
+    """Buduje wiersze CSV (jeden na katalog z Top N) dla wyniku hosta."""
+    return [
+        [
+            host_result.host_name,
+            root.path,
+            dir_info.path,
+            dir_info.total_size,
+            human_size(dir_info.total_size),
+            dir_info.direct_files_size,
+            round(dir_info.file_heavy_ratio, 3),
+            dir_info.stale_size if dir_info.stale_size is not None else "",
+            dir_info.parent_path,
+            dir_info.parent_total_size if dir_info.parent_total_size else "",
+            dir_info.depth,
+        ]
+        for root in host_result.roots
+        for dir_info in root.top_directories
+    ]
 
-    writer.writerow(
+
+def _growth_csv_rows(host_result: "HostResult") -> list[list[Any]]:
+    """Buduje wiersze CSV trybu growth dla wyniku hosta."""
+    return [
         [
-            "host",
-            "root",
-            "path",
-            "total_size_bytes",
-            "total_size_human",
-            "direct_files_size_bytes",
-            "file_heavy_ratio",
-            "stale_size_bytes",
-            "parent_path",
-            "parent_total_size_bytes",
-            "depth",
+            host_result.host_name,
+            root.path,
+            growth.path,
+            growth.total_size,
+            round(growth.bytes_per_day, 1),
+            _round_optional(growth.days_until_full) if growth.days_until_full is not None else "",
+            growth.samples,
         ]
-    )
+        for root in host_result.roots
+        for growth in root.growth
+    ]
 
-    for host_result in results:
-        for root in host_result.roots:
-            for dir_info in root.top_directories:
-                writer.writerow(
-                    [
-                        host_result.host_name,
-                        root.path,
-                        dir_info.path,
-                        dir_info.total_size,
-                        human_size(dir_info.total_size),
-                        dir_info.direct_files_size,
-                        round(dir_info.file_heavy_ratio, 3),
-                        dir_info.stale_size if dir_info.stale_size is not None else "",
-                        dir_info.parent_path,
-                        dir_info.parent_total_size if dir_info.parent_total_size else "",
-                        dir_info.depth,
-                    ]
-                )
 
-    return output.getvalue()
+class ReportWriter(ABC):
+    """
+    Strumieniowy zapis raportu.
+
+    begin() zapisuje nagłówek, write_host() - sekcję jednego hosta zaraz po
+    zakończeniu jego skanu (z flush), a end() - zamknięcie raportu. Pamięć
+    nie rośnie z liczbą hostów, a częściowy raport jest widoczny od razu
+    (np. przez tail -f). generate_report składa ten sam raport w pamięci.
+    """
+
+    def __init__(self, stream: TextIO, config: "Config") -> None:
+        """
+        Tworzy writer.
+
+        Args:
+            stream: Strumień wyjściowy (plik lub stdout).
+            config: Konfiguracja.
+        """
+        self.stream = stream
+        self.config = config
+
+    @abstractmethod
+    def begin(self) -> None:
+        """Zapisuje nagłówek raportu."""
+
+    def write_host(self, host_result: "HostResult") -> None:
+        """
+        Zapisuje sekcję hosta i opróżnia bufor strumienia.
+
+        Args:
+            host_result: Wynik hosta.
+        """
+        self._write_host(host_result)
+        self.stream.flush()
+
+    @abstractmethod
+    def _write_host(self, host_result: "HostResult") -> None:
+        """Zapisuje sekcję hosta (implementacja formatu)."""
+
+    def end(self) -> None:
+        """Zapisuje zakończenie raportu."""
+        self.stream.flush()
+
+
+class TextReportWriter(ReportWriter):
+    """Raport tekstowy: nagłówek, sekcje hostów, stopka."""
+
+    def begin(self) -> None:
+        self.stream.write("\n".join(_format_report_header(self.config)))
+
+    def _write_host(self, host_result: "HostResult") -> None:
+        self.stream.write("\n" + "\n".join(_format_host_section(host_result, self.config)))
+
+    def end(self) -> None:
+        self.stream.write("\n" + "\n".join(_format_report_footer()) + "\n")
+        super().end()
+
+
+class JsonReportWriter(ReportWriter):
+    """Raport JSON (jeden dokument) zapisywany kawałkami - hosty jako kolejne elementy listy."""
+
+    def begin(self) -> None:
+        metadata = json.dumps(get_metadata(self.config), indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self.stream.write(f'{{\n  "metadata": {metadata},\n  "hosts": [')
+        self._hosts = 0
+
+    def _write_host(self, host_result: "HostResult") -> None:
+        host_data = json.dumps(host_result_to_json(host_result, self.config), indent=2, ensure_ascii=False)
+        separator = "," if self._hosts else ""
+        self.stream.write(separator + "\n    " + host_data.replace("\n", "\n    "))
+        self._hosts += 1
+
+    def end(self) -> None:
+        self.stream.write("\n  ]\n}\n" if self._hosts else "]\n}\n")
+        super().end()
+
+
+class JsonLinesReportWriter(ReportWriter):
+    """Raport JSON Lines: linia z metadanymi, potem jedna linia na host."""
+
+    def begin(self) -> None:
+        self.stream.write(json.dumps({"metadata": get_metadata(self.config)}, ensure_ascii=False) + "\n")
+
+    def _write_host(self, host_result: "HostResult") -> None:
+        self.stream.write(json.dumps(host_result_to_json(host_result, self.config), ensure_ascii=False) + "\n")
+
+
+class CsvReportWriter(ReportWriter):
+    """Raport CSV: wiersz nagłówka, potem wiersze kolejnych hostów."""
+
+    def begin(self) -> None:
+        self._growth = self.config.report_mode == "growth"
+        self._writer = csv.writer(self.stream)
+        self._writer.writerow(GROWTH_CSV_HEADER if self._growth else CSV_HEADER)
+
+    def _write_host(self, host_result: "HostResult") -> None:
+        self._writer.writerows(_growth_csv_rows(host_result) if self._growth else _csv_rows(host_result))
+
+
+def create_report_writer(stream: TextIO, config: "Config") -> ReportWriter:
+    """
+    Tworzy writer raportu dla formatu z konfiguracji.
+
+    Args:
+        stream: Strumień wyjściowy.
+        config: Konfiguracja.
+
+    Returns:
+        Writer raportu.
+    """
+    writers: dict[str, type[ReportWriter]] = {
+        "json": JsonReportWriter,
+        "jsonl": JsonLinesReportWriter,
+        "csv": CsvReportWriter,
+    }
+    return writers.get(config.output_format, TextReportWriter)(stream, config)
 
 
 def write_report(report: str, config: "Config") -> None:
@@ -288,4 +466,4 @@ def write_report(report: str, config: "Config") -> None:
         if config.verbose:
             print(f"Raport zapisano do: {config.output_file}")
     else:
-        print(report)
+        print(report, end="")
@@ -0,0 +1,327 @@
+"""Harmonogram skanów - wspólna kolejka zadań (host, root), najdłuższe najpierw."""
+
+import json
+import os
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+from dsmonitor.analyzer import SOURCE_SCAN, HostResult, RootSummary
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.executor import HostHealth
+from dsmonitor.journal import ScanJournal, journal_path, latest_run_id, load_journal, scan_fingerprint
+from dsmonitor.metrics import ScanMetrics
+from dsmonitor.pipeline import build_host_result
+
+DURATIONS_VERSION = 1
+
+type JobKey = tuple[str, str]
+type JobOutcome = tuple[RootSummary, str | None]
+
+
+@dataclass
+class ScanJob:
+    """Zadanie skanu jednego roota na hoście."""
+
+    host: HostProfile | None
+    host_name: str
+    path: str
+    index: int
+    expected: float | None = None
+
+    @property
+    def key(self) -> JobKey:
+        """Klucz zadania (host, root)."""
+        return self.host_name, self.path
+
+
+def durations_path(cache_dir: str) -> Path:
+    """
+    Zwraca ścieżkę pliku z czasami skanów.
+
+    Args:
+        cache_dir: Katalog cache.
+
+    Returns:
+        Ścieżka pliku JSON.
+    """
+    return Path(cache_dir) / "durations.json"
+
+
+def load_durations(path: Path) -> dict[JobKey, float]:
+    """
+    Wczytuje czasy skanów z poprzednich przebiegów.
+
+    Brakujący lub uszkodzony plik daje pusty słownik.
+
+    Args:
+        path: Ścieżka pliku.
+
+    Returns:
+        Słownik (host, root) -> czas skanu w sekundach.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if not isinstance(data, dict) or data.get("version") != DURATIONS_VERSION:
+        return {}
+
+    try:
+        return {(host, root): float(seconds) for host, root, seconds in data["jobs"]}
+    except (KeyError, TypeError, ValueError):
+        return {}
+
+
+def save_durations(path: Path, durations: dict[JobKey, float]) -> None:
+    """
+    Zapisuje czasy skanów atomowo (plik tymczasowy + rename).
+
+    Args:
+        path: Ścieżka pliku.
+        durations: Słownik (host, root) -> czas skanu w sekundach.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "version": DURATIONS_VERSION,
+        "jobs": [[host, root, round(seconds, 3)] for (host, root), seconds in sorted(durations.items())],
+    }
+
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def build_jobs(config: Config, durations: dict[JobKey, float]) -> list[ScanJob]:
+    """
+    Buduje listę zadań wszystkich hostów w kolejności najdłuższe najpierw.
+
+    Zadania bez historii trafiają na początek (w kolejności z konfiguracji),
+    bo ich czas jest nieznany i mogą być najdłuższe.
+
+    Args:
+        config: Konfiguracja.
+        durations: Czasy skanów z poprzednich przebiegów.
+
+    Returns:
+        Posortowana lista zadań.
+    """
+    hosts: list[HostProfile | None] = [None] if config.local else list(config.hosts)
+    jobs: list[ScanJob] = []
+
+    for host in hosts:
+        host_name = "localhost" if host is None else host.name
+        paths = config.paths if host is None else host.paths
+        for index, path in enumerate(paths):
+            jobs.append(ScanJob(host, host_name, path, index, durations.get((host_name, path))))
+
+    jobs.sort(key=lambda job: -job.expected if job.expected is not None else float("-inf"))
+    return jobs
+
+
+class JobQueue:
+    """
+    Wspólna kolejka zadań z limitem jednoczesnych rootów per host.
+
+    take() zwraca pierwsze zadanie (w kolejności najdłuższe najpierw),
+    którego host nie wykorzystał jeszcze limitu root_parallel. Kolejka
+    nie jest bezpieczna dla wątków - korzysta z niej jeden dyspozytor.
+    """
+
+    def __init__(self, jobs: list[ScanJob], config: Config) -> None:
+        """
+        Tworzy kolejkę.
+
+        Args:
+            jobs: Zadania (kolejność = priorytet).
+            config: Konfiguracja (limity root_parallel).
+        """
+        self._pending = list(jobs)
+        self._running: dict[str, int] = {}
+        self._limits = {
+            job.host_name: job.host.get_root_parallel(config.root_parallel) if job.host else config.root_parallel
+            for job in jobs
+        }
+
+    def __bool__(self) -> bool:
+        return bool(self._pending)
+
+    def take(self) -> ScanJob | None:
+        """Pobiera następne zadanie lub None, gdy wszystkie hosty z zadaniami są zajęte."""
+        for position, job in enumerate(self._pending):
+            if self._running.get(job.host_name, 0) < self._limits[job.host_name]:
+                self._running[job.host_name] = self._running.get(job.host_name, 0) + 1
+                return self._pending.pop(position)
+        return None
+
+    def done(self, job: ScanJob) -> None:
+        """Zwalnia slot hosta po zakończeniu zadania."""
+        self._running[job.host_name] -= 1
+
+
+def record_durations(config: Config, measured: dict[JobKey, float]) -> None:
+    """
+    Dopisuje zmierzone czasy skanów do pliku w katalogu cache.
+
+    Args:
+        config: Konfiguracja (katalog cache).
+        measured: Czasy zadań zakończonych bez błędu w tym przebiegu.
+    """
+    if config.dry_run or not measured:
+        return
+
+    path = durations_path(config.cache_dir)
+    durations = load_durations(path)
+    durations.update(measured)
+    try:
+        save_durations(path, durations)
+    except OSError as e:
+        if config.verbose:
+            print(f"Nie udało się zapisać czasów skanów: {e}")
+
+
+class ScanRun:
+    """
+    Stan przebiegu skanu: kolejka zadań, wyniki, czasy i dziennik.
+
+    Wspólny dla obu silników - silnik pobiera zadania z queue, a po
+    zakończeniu każdego wywołuje complete(). Wyniki rootów zakończonych
+    bez błędu są od razu zapisywane w dzienniku przebiegu, więc po
+    przerwaniu procesu --resume pomija je w kolejnym uruchomieniu
+    (takie rooty trafiają do HostResult.resumed_roots i nie są ponownie
+    zapisywane w historii).
+    Wynik hosta powstaje po zakończeniu jego ostatniego roota i trafia
+    do on_host (np. do strumieniowego raportu), razem z metrykami rootów.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        on_host: Callable[[HostResult], None] | None = None,
+        health: dict[str, HostHealth] | None = None,
+        journal: bool = True,
+    ) -> None:
+        """
+        Przygotowuje przebieg (kolejkę, a przy --resume wyniki z dziennika).
+
+        Args:
+            config: Konfiguracja.
+            on_host: Wywoływana z wynikiem każdego hosta zaraz po zakończeniu jego rootów.
+            health: Stany hostów z próby połączenia (czas próby trafia do fazy connect).
+            journal: Czy prowadzić dziennik przebiegu (False np. w trybie serwera).
+        """
+        self.config = config
+        self.on_host = on_host
+        self.health = health or {}
+        self.results: dict[str, HostResult] = {}
+        self.measured: dict[JobKey, float] = {}
+        self.journal: ScanJournal | None = None
+        self._fingerprints: dict[JobKey, dict[str, object]] = {}
+        self.host_names = ["localhost"] if config.local else [host.name for host in config.hosts]
+
+        jobs = build_jobs(config, load_durations(durations_path(config.cache_dir)))
+        completed: dict[JobKey, RootSummary] = {}
+
+        if journal and not config.dry_run:
+            fingerprint = scan_fingerprint(config)
+            run_id = config.run_id
+            if run_id is None and config.resume:
+                run_id = latest_run_id(config.cache_dir)
+            if run_id is None:
+                run_id = time.strftime("%Y%m%d-%H%M%S")
+
+            path = journal_path(config.cache_dir, run_id)
+            self._fingerprints = {job.key: scan_fingerprint(config, job.host) for job in jobs}
+            if config.resume:
+                completed = load_journal(path, fingerprint, self._fingerprints)
+            self.journal = ScanJournal(path, run_id, fingerprint)
+
+            if config.verbose and config.resume:
+                print(f"Wznowienie przebiegu {run_id} (rooty z dziennika: {len(completed)})")
+
+        self._remaining = Counter(job.host_name for job in jobs if job.key not in completed)
+        self._outcomes: dict[str, list[tuple[int, JobOutcome, ScanMetrics | None]]] = {
+            host_name: [] for host_name in self.host_names
+        }
+        self._resumed: dict[str, list[str]] = {}
+        for job in jobs:
+            if job.key in completed:
+                self._outcomes[job.host_name].append((job.index, (completed[job.key], None), None))
+                self._resumed.setdefault(job.host_name, []).append(job.path)
+        self.queue = JobQueue([job for job in jobs if job.key not in completed], config)
+
+        for host_name in self.host_names:
+            if not self._remaining[host_name]:
+                self._finish_host(host_name)
+
+    def complete(self, job: ScanJob, outcome: JobOutcome, seconds: float, metrics: ScanMetrics | None = None) -> None:
+        """
+        Rejestruje zakończone zadanie.
+
+        Args:
+            job: Zadanie.
+            outcome: Wynik roota.
+            seconds: Czas skanu w sekundach (pomijany dla rootów bez pełnego skanu).
+            metrics: Metryki skanu roota.
+        """
+        self.queue.done(job)
+        self._outcomes[job.host_name].append((job.index, outcome, metrics))
+        if outcome[1] is None:
+            if outcome[0].source == SOURCE_SCAN:
+                self.measured[job.key] = seconds
+            if self.journal is not None:
+                self.journal.record(job.host_name, outcome[0], self._fingerprints.get(job.key))
+
+        self._remaining[job.host_name] -= 1
+        if not self._remaining[job.host_name]:
+            self._finish_host(job.host_name)
+
+    def _finish_host(self, host_name: str) -> None:
+        """Składa wynik hosta (rooty w kolejności z konfiguracji) i przekazuje go do on_host."""
+        outcomes = sorted(self._outcomes.pop(host_name), key=lambda item: item[0])
+        result = build_host_result(host_name, (outcome for _, outcome, _ in outcomes))
+        result.resumed_roots = self._resumed.pop(host_name, [])
+
+        health = self.health.get(host_name)
+        if health is not None and health.probe_seconds is not None:
+            result.metrics.add_time("connect", health.probe_seconds)
+        for _, outcome, metrics in outcomes:
+            if metrics is not None:
+                result.root_metrics[outcome[0].path] = metrics
+                result.metrics.merge(metrics)
+
+        self.results[host_name] = result
+        if self.on_host is not None:
+            self.on_host(result)
+
+    def finish(self) -> list[HostResult]:
+        """
+        Kończy przebieg: zapisuje czasy i zamyka dziennik.
+
+        Dziennik przebiegu zakończonego bez błędów jest usuwany; przy błędach
+        zostaje, a na stderr trafia podpowiedź, jak wznowić przebieg.
+
+        Returns:
+            Lista wyników hostów w kolejności z konfiguracji.
+        """
+        record_durations(self.config, self.measured)
+        results = [self.results[host_name] for host_name in self.host_names]
+
+        if self.journal is not None:
+            if all(result.success for result in results):
+                self.journal.discard()
+            else:
+                self.journal.close()
+                print(
+                    f"Przebieg {self.journal.run_id} z błędami - ponowienie nieudanych rootów: "
+                    f"--resume --run-id {self.journal.run_id}",
+                    file=sys.stderr,
+                )
+
+        return results
@@ -0,0 +1,100 @@
+"""Indeks drzewa katalogów - budowany raz na root z wyniku du."""
+
+from array import array
+
+
+def parent_of(path: str) -> str:
+    """
+    Zwraca rodzica znormalizowanej ścieżki bez ponownej normalizacji.
+
+    Odpowiednik get_parent_path dla ścieżek, które już przeszły przez
+    normalize_path (np. klucze słownika z parse_du_output).
+
+    Args:
+        path: Znormalizowana ścieżka.
+
+    Returns:
+        Ścieżka rodzica ("/" dla roota, "." dla ścieżki względnej bez separatora).
+    """
+    head, sep, _ = path.rpartition("/")
+    if not sep:
+        return "."
+    return head or "/"
+
+
+class DirectoryTree:
+    """
+    Zwarty indeks drzewa katalogów jednego roota.
+
+    Węzły są numerowane kolejno w porządku słownika rozmiarów. Dla każdego
+    węzła tablice przechowują: identyfikator rodzica (-1 gdy rodzica nie ma
+    w drzewie), głębokość względem roota, rozmiar całkowity oraz sumę
+    rozmiarów bezpośrednich dzieci. Ścieżki są współdzielone z kluczami
+    słownika rozmiarów, więc indeks nie kopiuje tekstu.
+    """
+
+    def __init__(self, sizes: dict[str, int], root: str) -> None:
+        """
+        Buduje indeks w jednym przejściu po słowniku rozmiarów.
+
+        Args:
+            sizes: Słownik ścieżka -> rozmiar (klucze znormalizowane, np. z parse_du_output).
+            root: Znormalizowana ścieżka roota.
+        """
+        self.root = root
+        self._sizes = sizes
+        self._prefix = root if root == "/" else root + "/"
+        self._root_separators = 0 if root == "/" else root.count("/")
+
+        self.paths: list[str] = [path for path in sizes if self.contains(path)]
+        self._index: dict[str, int] = {path: node for node, path in enumerate(self.paths)}
+
+        count = len(self.paths)
+        self.parents = array("q", [-1]) * count
+        self.depths = array("l", [0]) * count
+        self.sizes = array("q", [sizes[path] for path in self.paths])
+        self.children_sums = array("q", [0]) * count
+
+        for node, path in enumerate(self.paths):
+            if path == root:
+                continue
+            self.depths[node] = path.count("/") - self._root_separators
+            parent = self._index.get(parent_of(path), -1)
+            self.parents[node] = parent
+            if parent >= 0:
+                self.children_sums[parent] += self.sizes[node]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def contains(self, path: str) -> bool:
+        """Czy znormalizowana ścieżka leży w drzewie roota (lub jest rootem)."""
+        return path == self.root or path.startswith(self._prefix)
+
+    def find(self, path: str) -> int | None:
+        """Zwraca identyfikator węzła dla ścieżki lub None."""
+        return self._index.get(path)
+
+    def depth_of(self, path: str) -> int:
+        """
+        Oblicza głębokość znormalizowanej ścieżki względem roota.
+
+        Działa także dla ścieżek spoza indeksu (np. z wyniku find).
+
+        Args:
+            path: Znormalizowana ścieżka w drzewie roota.
+
+        Returns:
+            Głębokość (0 dla roota).
+        """
+        if path == self.root:
+            return 0
+        return path.count("/") - self._root_separators
+
+    def direct_files_size(self, node: int) -> int:
+        """Zwraca rozmiar plików bezpośrednio w katalogu węzła."""
+        return max(0, self.sizes[node] - self.children_sums[node])
+
+    def parent_size(self, path: str) -> int | None:
+        """Zwraca rozmiar rodzica ścieżki lub None, jeśli du go nie zwrócił."""
+        return self._sizes.get(parent_of(path))
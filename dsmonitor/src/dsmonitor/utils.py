@@ -29,6 +29,39 @@ def human_size(size_bytes: int) -> str:
     return f"{size:.1f} {units[-1]}"
 
 
+def parse_size(value: str | int) -> int:
+    """
+    Zamienia rozmiar z jednostką (np. "10G", "512 MB") na bajty.
+
+    Jednostki są dwójkowe jak w human_size (1K = 1024 B).
+
+    Args:
+        value: Rozmiar - liczba bajtów lub liczba z jednostką K, M, G, T, P (opcjonalnie z B).
+
+    Returns:
+        Rozmiar w bajtach.
+
+    Raises:
+        ValueError: Gdy wartość jest nieprawidłowa lub ujemna.
+    """
+    if isinstance(value, int):
+        size = value
+    else:
+        text = value.strip().upper().removesuffix("B").rstrip()
+        exponent = "KMGTP".find(text[-1:]) + 1 if text[-1:].isalpha() else 0
+        if text[-1:].isalpha() and exponent == 0:
+            raise ValueError(f"nieprawidłowy rozmiar: {value}")
+        number = text[:-1] if exponent else text
+        try:
+            size = int(float(number) * 1024**exponent)
+        except ValueError:
+            raise ValueError(f"nieprawidłowy rozmiar: {value}") from None
+
+    if size < 0:
+        raise ValueError(f"rozmiar nie może być ujemny: {value}")
+    return size
+
+
 def get_parent_path(path: str) -> str:
     """
     Zwraca ścieżkę do katalogu nadrzędnego.
@@ -52,12 +85,18 @@ def normalize_path(path: str) -> str:
     - Nie rozwiązuje symlinków
     - Bezpiecznie działa dla ścieżek zdalnych (du/find output)
 
+    Ścieżki już znormalizowane (typowe linie du i find) są zwracane bez
+    zmian i bez budowania PurePosixPath - zostaje ten sam obiekt str.
+
     Args:
         path: Ścieżka do normalizacji.
 
     Returns:
         Znormalizowana ścieżka.
     """
+    if path and "//" not in path and "/./" not in path and not path.endswith(("/", "/.")) and path[:2] != "./":
+        return path
+
     normalized = str(PurePosixPath(path))
     return normalized.rstrip("/") if normalized != "/" else "/"
 
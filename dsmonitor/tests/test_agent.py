@@ -0,0 +1,141 @@
+"""Testy dla modułu agent."""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+from dsmonitor.agent import SAMPLE_MIN, is_excluded, sample_walk, summarize, walk
+from dsmonitor.config import Config
+from dsmonitor.pipeline import plan_root_scan, run_plan
+
+
+def make_tree(root: Path) -> None:
+    """Tworzy drzewo testowe z twardym linkiem i starymi plikami."""
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "c").mkdir()
+    (root / "a" / "f1").write_bytes(b"x" * 20000)
+    (root / "a" / "b" / "f2").write_bytes(b"y" * 50000)
+    (root / "a" / "b" / "link").hardlink_to(root / "a" / "b" / "f2")
+    (root / "c" / "old").write_bytes(b"z" * 30000)
+    old = time.time() - 400 * 86400
+    os.utime(root / "c" / "old", (old, old))
+
+
+def make_wide_tree(root: Path, count: int = 200) -> None:
+    """Tworzy szeroki katalog: count podkatalogów z plikami różnej wielkości."""
+    for index in range(count):
+        directory = root / "wide" / f"d{index}"
+        directory.mkdir(parents=True)
+        (directory / "f").write_bytes(b"x" * (4096 * (1 + index % 5)))
+
+
+class TestIsExcluded:
+    """Testy dopasowania wykluczeń jak w du --exclude."""
+
+    def test_patterns(self) -> None:
+        """Test wzorców z ukośnikiem i nazw."""
+        assert is_excluded("/data/app/node_modules", ["node_modules"]) is True
+        assert is_excluded("/data/.snapshot/x", ["*/.snapshot/*"]) is True
+        assert is_excluded("/data/app", ["node_modules"]) is False
+        assert is_excluded("/data/app", []) is False
+
+
+class TestSummarize:
+    """Testy selekcji Top N po stronie agenta."""
+
+    def test_size_mode_with_stale(self, tmp_path: Path) -> None:
+        """Test Top N file-heavy i przypisania stale."""
+        make_tree(tmp_path)
+        root = str(tmp_path)
+        direct, stale = walk(root, [], time.time() - 366 * 86400, "st_mtime")
+
+        summary = summarize(root, direct, stale, 20, 2, 0.5, "size", True)
+
+        assert summary["total_size"] > 0
+        assert [d["path"] for d in summary["top_directories"]] == [f"{root}/a/b", f"{root}/c"]
+        assert summary["top_directories"][1]["stale_size"] == 30000
+        assert summary["stale_size"] == 30000
+
+
+class TestSampleWalk:
+    """Testy skanu przybliżonego (próbkowanie podkatalogów)."""
+
+    def test_small_directories_exact(self, tmp_path: Path) -> None:
+        """Test dokładnego wyniku, gdy żaden katalog nie ma więcej niż SAMPLE_MIN podkatalogów."""
+        make_tree(tmp_path)
+        root = str(tmp_path)
+        cutoff = time.time() - 366 * 86400
+
+        direct, stale, scale, error = sample_walk(root, [], cutoff, "st_mtime", 0.05)
+
+        assert (direct, stale) == walk(root, [], cutoff, "st_mtime")
+        assert scale == {}
+        assert error == 0.0
+
+    def test_wide_directory_sampled(self, tmp_path: Path) -> None:
+        """Test oszacowania szerokiego katalogu z próby w granicy błędu."""
+        make_wide_tree(tmp_path)
+        root = str(tmp_path)
+        exact = summarize(root, *walk(root, [], 0.0, "st_mtime"), 20, 5, 0.5, "size", False)
+
+        direct, stale, scale, error = sample_walk(root, [], 0.0, "st_mtime", 0.1)
+        approx = summarize(root, direct, stale, 20, 5, 0.5, "size", False, scale)
+
+        assert SAMPLE_MIN <= len(scale) < 200
+        assert set(scale.values()) == {200 / len(scale)}
+        assert 0.0 < error <= 0.1
+        assert abs(approx["total_size"] - exact["total_size"]) <= 0.1 * exact["total_size"]
+
+
+class TestAgentScan:
+    """Testy zgodności skanu agenta ze skanem du."""
+
+    def test_same_summary_as_du(self, tmp_path: Path) -> None:
+        """Test identycznego RootSummary w trybach size i stale."""
+        make_tree(tmp_path)
+
+        for mode in ("size", "stale"):
+            du_config = Config(local=True, paths=[str(tmp_path)], top_n=5, file_heavy_threshold=0.3, report_mode=mode)
+            agent_config = Config(
+                local=True,
+                paths=[str(tmp_path)],
+                top_n=5,
+                file_heavy_threshold=0.3,
+                report_mode=mode,
+                scan_method="agent",
+                python_command=sys.executable,
+            )
+
+            expected = run_plan(plan_root_scan(str(tmp_path), None, du_config, "localhost"), None, du_config)
+            actual = run_plan(plan_root_scan(str(tmp_path), None, agent_config, "localhost"), None, agent_config)
+
+            assert actual == expected
+
+    def test_approx_scan(self, tmp_path: Path) -> None:
+        """Test skanu przybliżonego przez agenta (approx i ostrzeżenie z błędem)."""
+        make_wide_tree(tmp_path)
+        config = Config(
+            local=True,
+            paths=[str(tmp_path)],
+            scan_method="agent",
+            python_command=sys.executable,
+            approx_error=0.1,
+        )
+
+        summary, error = run_plan(plan_root_scan(str(tmp_path), None, config, "localhost"), None, config)
+
+        assert error is None
+        assert summary.approx is True
+        assert summary.total_size > 0
+        assert "Wynik przybliżony" in summary.warnings[-1]
+
+    def test_missing_root(self, tmp_path: Path) -> None:
+        """Test błędu agenta dla nieistniejącej ścieżki."""
+        path = str(tmp_path / "brak")
+        config = Config(local=True, paths=[path], scan_method="agent", python_command=sys.executable)
+
+        summary, error = run_plan(plan_root_scan(path, None, config, "localhost"), None, config)
+
+        assert error is not None
+        assert "Błąd agenta" in summary.warnings[0]
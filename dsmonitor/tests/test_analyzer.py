@@ -1,10 +1,17 @@
 """Testy dla modułu analyzer."""
 
 from dsmonitor.analyzer import (
+    DirectoryInfo,
+    RootSummary,
+    attribute_stale,
     calculate_direct_files_size,
     find_top_n_file_heavy,
     get_path_depth,
+    parse_du_lines,
     parse_du_output,
+    parse_tree_scan_lines,
+    root_summary_from_dict,
+    root_summary_to_dict,
 )
 
 
@@ -40,6 +47,47 @@ invalid line
         assert "/data/dir1" in sizes
         assert "/data/dir2" in sizes
 
+    def test_parse_lines_iterator(self) -> None:
+        """Test parsowania strumienia linii."""
+        lines = iter(["1024\t/data/dir1/", "bad", "4096\t/data"])
+
+        sizes = parse_du_lines(lines)
+
+        assert sizes == {"/data/dir1": 1024, "/data": 4096}
+
+
+class TestParseTreeScanLines:
+    """Testy parsowania jednoprzebiegowego skanu drzewa."""
+
+    def test_rollup_and_stale(self) -> None:
+        """Test wyliczania rozmiarów rekurencyjnych i stale."""
+        lines = [
+            "/data/a/b\t500\t400",
+            "/data\t100\t0",
+            "/data/a\t200\t0",
+            "/data/c\t300\t300",
+        ]
+
+        sizes, stale = parse_tree_scan_lines(lines, "/data", max_depth=20)
+
+        assert sizes == {"/data": 1100, "/data/a": 700, "/data/a/b": 500, "/data/c": 300}
+        assert stale == {"/data/a/b": 400, "/data/c": 300}
+
+    def test_max_depth_limits_output(self) -> None:
+        """Test że głębokie katalogi wliczają się do przodków, ale nie są zwracane."""
+        lines = ["/data\t1\t0", "/data/a\t2\t0", "/data/a/b\t4\t0"]
+
+        sizes, _ = parse_tree_scan_lines(lines, "/data", max_depth=1)
+
+        assert sizes == {"/data": 7, "/data/a": 6}
+
+    def test_path_with_tab(self) -> None:
+        """Test ścieżki zawierającej tabulator."""
+        sizes, _ = parse_tree_scan_lines(["/data/x\ty\t10\t0", "/data\t1\t0"], "/data", max_depth=5)
+
+        assert sizes["/data/x\ty"] == 10
+        assert sizes["/data"] == 11
+
 
 class TestCalculateDirectFilesSize:
     """Testy wyliczania direct_files_size."""
@@ -136,6 +184,25 @@ class TestFindTopNFileHeavy:
         top = find_top_n_file_heavy(sizes, "/data", n=10, threshold=0.5)
         assert all(d.file_heavy_ratio >= 0.5 for d in top)
 
+    def test_ties_keep_du_order(self) -> None:
+        """Test że przy równych rozmiarach zachowana jest kolejność z du."""
+        sizes = {
+            "/data/b": 100,
+            "/data/a": 100,
+            "/data/c": 100,
+            "/data": 300,
+        }
+
+        top = find_top_n_file_heavy(sizes, "/data", n=2, threshold=0.8)
+
+        assert [d.path for d in top] == ["/data/b", "/data/a"]
+
+    def test_zero_n(self) -> None:
+        """Test pustego wyniku dla n=0."""
+        sizes = {"/data": 100}
+
+        assert find_top_n_file_heavy(sizes, "/data", n=0, threshold=0.0) == []
+
 
 class TestFindTopNByStale:
     """Testy znajdowania Top N katalogów po stale_size."""
@@ -182,3 +249,60 @@ class TestFindTopNByStale:
 
         assert len(top) == 1
         assert top[0].path == "/data/dir1"
+
+
+class TestAttributeStale:
+    """Testy przypisywania stale do katalogów Top N."""
+
+    def test_attribute_to_ancestors(self) -> None:
+        """Test przypisania stale z podkatalogów do katalogu Top N."""
+        all_stale = {
+            "/data/logs": 100,
+            "/data/logs/old/2020": 50,
+            "/data/other": 30,
+            "/data/logs2": 7,
+        }
+
+        results, unmatched, total = attribute_stale(all_stale, ["/data/logs"])
+
+        assert results == {"/data/logs": 150}
+        assert unmatched == 37
+        assert total == 187
+
+    def test_nearest_ancestor_wins(self) -> None:
+        """Test że stale trafia do najbliższego katalogu Top N."""
+        all_stale = {"/data/a/b/c": 10, "/data/a/x": 5}
+
+        results, unmatched, _ = attribute_stale(all_stale, ["/data/a", "/data/a/b"])
+
+        assert results == {"/data/a": 5, "/data/a/b": 10}
+        assert unmatched == 0
+
+    def test_root_slash_matches_all(self) -> None:
+        """Test że / dopasowuje wszystkie ścieżki."""
+        results, unmatched, _ = attribute_stale({"/x/y": 3}, ["/"])
+
+        assert results == {"/": 3}
+        assert unmatched == 0
+
+
+class TestRootSummaryDict:
+    """Testy serializacji RootSummary."""
+
+    def test_roundtrip(self) -> None:
+        """Test zapisu do słownika i odtworzenia."""
+        summary = RootSummary(
+            path="/data",
+            total_size=1000,
+            stale_size=10,
+            top_directories=[DirectoryInfo("/data/a", 800, 700, 0.875, 10, "/data", 1000, 1)],
+            warnings=["uwaga"],
+        )
+
+        assert root_summary_from_dict(root_summary_to_dict(summary)) == summary
+
+    def test_missing_optional_fields(self) -> None:
+        """Test domyślnych wartości dla brakujących pól."""
+        summary = root_summary_from_dict({"path": "/data", "total_size": 5})
+
+        assert summary == RootSummary(path="/data", total_size=5)
@@ -0,0 +1,86 @@
+"""Testy dla modułu async_engine."""
+
+import asyncio
+from pathlib import Path
+
+from dsmonitor.async_engine import run_command_lines_async, run_plan_async, scan_all_hosts_async
+from dsmonitor.cli import scan_all_hosts
+from dsmonitor.config import Config
+from dsmonitor.pipeline import plan_root_scan
+
+
+class TestRunCommandLinesAsync:
+    """Testy asynchronicznego wykonywania komend."""
+
+    def test_lines_and_stderr(self) -> None:
+        """Test przekazywania linii stdout i zbierania stderr."""
+        config = Config(local=True, paths=["/data"], timeout=10)
+        lines: list[str] = []
+
+        result = asyncio.run(run_command_lines_async("printf 'a\\nb\\n'; echo blad >&2", None, config, lines.append))
+
+        assert lines == ["a", "b"]
+        assert result.success is True
+        assert "blad" in result.stderr
+
+    def test_timeout(self) -> None:
+        """Test przerwania procesu po timeoucie."""
+        config = Config(local=True, paths=["/data"], timeout=1)
+
+        result = asyncio.run(run_command_lines_async(["sleep", "5"], None, config, lambda _: None))
+
+        assert result.timed_out is True
+        assert result.success is False
+
+    def test_dry_run(self) -> None:
+        """Test trybu dry-run."""
+        config = Config(dry_run=True, local=True, paths=["/data"])
+        lines: list[str] = []
+
+        result = asyncio.run(run_command_lines_async(["du", "/data"], None, config, lines.append))
+
+        assert result.dry_run is True
+        assert lines == []
+
+
+class TestScanAllHostsAsync:
+    """Testy zgodności silnika asyncio z silnikiem wątkowym."""
+
+    def test_same_result_as_threads(self, tmp_path: Path) -> None:
+        """Test identycznego wyniku obu silników dla skanu lokalnego."""
+        root = tmp_path / "data"
+        for name, size in (("a", 40000), ("b", 20000), ("a/c", 60000)):
+            directory = root / name
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / "plik").write_bytes(b"x" * size)
+
+        config = Config(
+            local=True,
+            paths=[str(root), str(root / "a")],
+            timeout=30,
+            root_parallel=2,
+            cache_dir=str(tmp_path / "cache"),
+        )
+
+        async_results = asyncio.run(scan_all_hosts_async(config))
+        thread_results = scan_all_hosts(config)
+
+        assert async_results == thread_results
+        assert async_results[0].success is True
+        assert async_results[0].roots[0].total_size > 0
+
+
+class TestRunPlanAsync:
+    """Testy asynchronicznego wykonywania planu skanu."""
+
+    def test_partial_output_then_timeout(self, tmp_path: Path) -> None:
+        """Test że timeout po częściowym wyjściu du zwraca błąd roota."""
+        fake_du = tmp_path / "du"
+        fake_du.write_text("#!/bin/sh\necho '100\t/data/a'\necho '200\t/data/b'\nexec sleep 5\n")
+        fake_du.chmod(0o755)
+        config = Config(local=True, paths=["/data"], timeout=1, stale_days=0, du_command=str(fake_du))
+
+        summary, error = asyncio.run(run_plan_async(plan_root_scan("/data", None, config, "localhost"), None, config))
+
+        assert summary.total_size == 0
+        assert error == "Błąd du dla /data: Timeout po 1 sekundach"
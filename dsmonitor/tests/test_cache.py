@@ -0,0 +1,269 @@
+"""Testy dla modułu cache."""
+
+import sqlite3
+from pathlib import Path
+
+from dsmonitor.analyzer import SOURCE_PREVIOUS, SOURCE_SCAN, RootSummary
+from dsmonitor.cache import (
+    DirectSizes,
+    UsageSnapshot,
+    add_dir_mtime_line,
+    load_scan_cache,
+    load_usage_snapshot,
+    save_scan_cache,
+    save_usage_snapshot,
+    scan_cache_path,
+    split_dirty_directories,
+    usage_cache_path,
+)
+from dsmonitor.cli import run
+from dsmonitor.config import Config
+from dsmonitor.journal import scan_fingerprint
+from dsmonitor.metrics import ScanMetrics
+from dsmonitor.pipeline import plan_root_scan, run_plan
+
+
+class TestScanCacheFile:
+    """Testy zapisu i odczytu pliku cache."""
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        """Test zapisu i ponownego odczytu wpisów."""
+        path = scan_cache_path(str(tmp_path), "server1", "/data/")
+        entries = {"/data": ("1700000000.1", 4096, False), "/data/a": ("1700000001.5", 8192, True)}
+
+        save_scan_cache(path, "/data", ["*.tmp"], entries)
+
+        assert path.parent.name == "server1"
+        assert load_scan_cache(path, ["*.tmp"]) == entries
+
+    def test_excludes_change_invalidates(self, tmp_path: Path) -> None:
+        """Test że zmiana wykluczeń unieważnia cache."""
+        path = scan_cache_path(str(tmp_path), "server1", "/data")
+        save_scan_cache(path, "/data", ["*.tmp"], {"/data": ("1", 1, False)})
+
+        assert load_scan_cache(path, []) == {}
+
+    def test_missing_or_corrupt_file(self, tmp_path: Path) -> None:
+        """Test brakującego i uszkodzonego pliku."""
+        path = tmp_path / "cache.json"
+        assert load_scan_cache(path, []) == {}
+
+        path.write_text("{nie json", encoding="utf-8")
+        assert load_scan_cache(path, []) == {}
+
+
+class TestSplitDirtyDirectories:
+    """Testy wyboru katalogów do ponownego pomiaru."""
+
+    def test_split(self) -> None:
+        """Test podziału na niezmienione, zmienione i nowe."""
+        mtimes: dict[str, str] = {}
+        for line in ("100.0\t/data", "200.0\t/data/a/", "300.0\t/data/new", "bez_tabulatora"):
+            add_dir_mtime_line(mtimes, line)
+        cached = {
+            "/data": ("100.0", 4096, False),
+            "/data/a": ("150.0", 8192, False),
+            "/data/removed": ("1.0", 1, False),
+        }
+
+        reused, dirty = split_dirty_directories(mtimes, cached)
+
+        assert reused == {"/data": 4096}
+        assert dirty == ["/data/a", "/data/new"]
+
+    def test_hard_linked_always_dirty(self) -> None:
+        """Test że katalog z plikami o wielu linkach jest mierzony mimo niezmienionego mtime."""
+        reused, dirty = split_dirty_directories({"/data/a": "1.0"}, {"/data/a": ("1.0", 4096, True)})
+
+        assert reused == {}
+        assert dirty == ["/data/a"]
+
+
+class TestDirectSizes:
+    """Testy parsowania zajętości bezpośredniej z twardymi linkami."""
+
+    def test_links_counted_once_across_batches(self) -> None:
+        """Test że ten sam i-węzeł z dwóch paczek komend jest liczony raz."""
+        sizes = DirectSizes()
+        for line in (
+            "L\t2049:77\t8192\t/data/a",
+            "4096\t/data/a",
+            "L\t2049:77\t8192\t/data/b/",
+            "4096\t/data/b",
+            "zle",
+        ):
+            sizes.add_line(line)
+
+        assert sizes.sizes == {"/data/a": 12288, "/data/b": 4096}
+        assert sizes.linked == {"/data/a", "/data/b"}
+
+
+class TestIncrementalScan:
+    """Testy skanu przyrostowego."""
+
+    def test_matches_full_scan_and_reuses_cache(self, tmp_path: Path) -> None:
+        """Test zgodności z pełnym skanem du i ponownego użycia cache."""
+        root = tmp_path / "data"
+        (root / "a" / "b").mkdir(parents=True)
+        (root / "a" / "f1").write_bytes(b"x" * 20000)
+        (root / "a" / "b" / "f2").write_bytes(b"y" * 50000)
+        (root / "c").mkdir()
+        cache_dir = str(tmp_path / "cache")
+
+        full_config = Config(local=True, paths=[str(root)], top_n=5, file_heavy_threshold=0.0, stale_days=0)
+        incremental_config = Config(
+            local=True,
+            paths=[str(root)],
+            top_n=5,
+            file_heavy_threshold=0.0,
+            stale_days=0,
+            incremental=True,
+            cache_dir=cache_dir,
+        )
+
+        expected, _ = run_plan(plan_root_scan(str(root), None, full_config, "localhost"), None, full_config)
+        first, _ = run_plan(plan_root_scan(str(root), None, incremental_config, "localhost"), None, incremental_config)
+
+        cache_file = scan_cache_path(cache_dir, "localhost", str(root))
+        cached = load_scan_cache(cache_file, [])
+        (root / "c" / "f3").write_bytes(b"z" * 30000)
+        second, _ = run_plan(plan_root_scan(str(root), None, incremental_config, "localhost"), None, incremental_config)
+        expected_after, _ = run_plan(plan_root_scan(str(root), None, full_config, "localhost"), None, full_config)
+
+        assert first == expected
+        assert set(cached) == {str(root), str(root / "a"), str(root / "a" / "b"), str(root / "c")}
+        assert second == expected_after
+        assert load_scan_cache(cache_file, [])[str(root / "a")] == cached[str(root / "a")]
+
+    def test_hard_link_shared_with_clean_directory(self, tmp_path: Path) -> None:
+        """Test że twardy link wspólny dla katalogu niezmienionego i zmienionego jest liczony raz, jak w du."""
+        root = tmp_path / "data"
+        (root / "clean").mkdir(parents=True)
+        (root / "dirty").mkdir()
+        (root / "clean" / "f").write_bytes(b"x" * 40000)
+        (root / "dirty" / "link").hardlink_to(root / "clean" / "f")
+        full_config = Config(local=True, paths=[str(root)], top_n=5, file_heavy_threshold=0.0)
+        incremental_config = Config(
+            local=True,
+            paths=[str(root)],
+            top_n=5,
+            file_heavy_threshold=0.0,
+            incremental=True,
+            cache_dir=str(tmp_path / "cache"),
+        )
+
+        run_plan(plan_root_scan(str(root), None, incremental_config, "localhost"), None, incremental_config)
+        (root / "dirty" / "new").write_bytes(b"y" * 5000)
+        warm, _ = run_plan(plan_root_scan(str(root), None, incremental_config, "localhost"), None, incremental_config)
+        expected, _ = run_plan(plan_root_scan(str(root), None, full_config, "localhost"), None, full_config)
+
+        assert warm.total_size == expected.total_size
+
+    def test_unwritable_cache_adds_warning(self, tmp_path: Path) -> None:
+        """Test że błąd zapisu cache daje ostrzeżenie zamiast błędu roota."""
+        root = tmp_path / "data"
+        (root / "a").mkdir(parents=True)
+        (root / "a" / "f").write_bytes(b"x" * 20000)
+        blocker = tmp_path / "plik"
+        blocker.write_text("")
+        config = Config(
+            local=True, paths=[str(root)], file_heavy_threshold=0.0, incremental=True, cache_dir=str(blocker)
+        )
+
+        summary, error = run_plan(plan_root_scan(str(root), None, config, "localhost"), None, config)
+
+        assert error is None
+        assert summary.total_size > 0
+        assert any(warning.startswith("Nie udało się zapisać cache skanu:") for warning in summary.warnings)
+
+
+class TestUsageSnapshot:
+    """Testy migawek zajętości rootów i pomijania pełnego skanu."""
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        """Test zapisu i odczytu migawki oraz odrzucenia przy innych ustawieniach skanu."""
+        path = usage_cache_path(str(tmp_path), "serwer/1", "/data/")
+        fingerprint = scan_fingerprint(Config(local=True, paths=["/data"]))
+        snapshot = UsageSnapshot(used=1000, fill=0.5, timestamp=1.0, summary=RootSummary(path="/data", total_size=10))
+
+        save_usage_snapshot(path, fingerprint, snapshot)
+
+        assert path.parent.name == "serwer%2F1"
+        assert load_usage_snapshot(path, fingerprint) == snapshot
+        assert load_usage_snapshot(path, {**fingerprint, "top_n": 5}) is None
+        assert load_usage_snapshot(tmp_path / "brak.json", fingerprint) is None
+
+    def test_unchanged_usage_reuses_previous_summary(self, tmp_path: Path) -> None:
+        """Test pełnego skanu przy pierwszym przebiegu i wyniku z migawki przy kolejnym."""
+        root = tmp_path / "root"
+        (root / "a").mkdir(parents=True)
+        (root / "a" / "plik").write_bytes(b"x" * 40000)
+        config = Config(
+            local=True,
+            paths=[str(root)],
+            cache_dir=str(tmp_path / "cache"),
+            usage_delta=1024**4,
+            file_heavy_threshold=0.5,
+        )
+
+        first, error = run_plan(plan_root_scan(str(root), None, config, "localhost"), None, config)
+        assert error is None
+
+        metrics = ScanMetrics()
+        second, error = run_plan(
+            plan_root_scan(str(root), None, config, "localhost", metrics), None, config, None, metrics
+        )
+
+        assert error is None
+        assert metrics.counters == {"skipped_scans": 1}
+        assert (first.source, second.source) == (SOURCE_SCAN, SOURCE_PREVIOUS)
+        assert second.top_directories == first.top_directories
+        assert "Wynik skanu z" in second.warnings[-1]
+
+    def test_reused_summary_not_recorded_in_history(self, tmp_path: Path) -> None:
+        """Test że wynik z migawki nie trafia do historii jako nowa migawka."""
+        root = tmp_path / "root"
+        (root / "a").mkdir(parents=True)
+        history_db = tmp_path / "history.sqlite"
+        config = Config(
+            local=True,
+            paths=[str(root)],
+            cache_dir=str(tmp_path / "cache"),
+            usage_delta=1024**4,
+            history_db=str(history_db),
+            output_file=str(tmp_path / "raport.txt"),
+        )
+
+        assert run(config) == 0
+        assert run(config) == 0
+
+        with sqlite3.connect(history_db) as connection:
+            assert connection.execute("SELECT COUNT(*) FROM root_snapshots").fetchone() == (1,)
+
+    def test_moved_usage_triggers_scan(self, tmp_path: Path) -> None:
+        """Test pełnego skanu, gdy zajętość zmieniła się o więcej niż usage_delta."""
+        config = Config(local=True, paths=[str(tmp_path)], cache_dir=str(tmp_path / "cache"), usage_delta=0)
+        path = usage_cache_path(config.cache_dir, "localhost", str(tmp_path))
+        stale_summary = RootSummary(path=str(tmp_path), total_size=1)
+        save_usage_snapshot(path, scan_fingerprint(config), UsageSnapshot(1, 0.0, 1.0, stale_summary))
+
+        summary, error = run_plan(plan_root_scan(str(tmp_path), None, config, "localhost"), None, config)
+
+        assert error is None
+        assert summary.total_size > 1
+        snapshot = load_usage_snapshot(path, scan_fingerprint(config))
+        assert snapshot is not None and snapshot.summary == summary
+
+    def test_unwritable_cache_adds_warning(self, tmp_path: Path) -> None:
+        """Test że błąd zapisu migawki daje ostrzeżenie zamiast błędu roota."""
+        root = tmp_path / "root"
+        (root / "a").mkdir(parents=True)
+        blocker = tmp_path / "plik"
+        blocker.write_text("")
+        config = Config(local=True, paths=[str(root)], cache_dir=str(blocker), usage_delta=1024**4)
+
+        summary, error = run_plan(plan_root_scan(str(root), None, config, "localhost"), None, config)
+
+        assert error is None
+        assert summary.source == SOURCE_SCAN
+        assert summary.warnings[-1].startswith("Nie udało się zapisać migawki zajętości:")
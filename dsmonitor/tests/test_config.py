@@ -26,6 +26,11 @@ class TestHostProfile:
         host = HostProfile(name="test", paths=["/data"])
         assert host.get_scan_depth(20) == 20
 
+    def test_get_root_parallel(self) -> None:
+        """Test równoległości rootów hosta i wartości domyślnej."""
+        assert HostProfile(name="test", paths=["/data"], root_parallel=4).get_root_parallel(1) == 4
+        assert HostProfile(name="test", paths=["/data"]).get_root_parallel(2) == 2
+
     def test_get_ssh_user_with_value(self) -> None:
         """Test zwracania własnego użytkownika SSH."""
         host = HostProfile(name="test", paths=["/data"], ssh_user="admin")
@@ -70,6 +75,40 @@ class TestConfigValidation:
         errors = config.validate()
         assert any("threshold" in e for e in errors)
 
+    def test_invalid_root_parallel(self) -> None:
+        """Test nieprawidłowej równoległości rootów (globalnej i hosta)."""
+        host = HostProfile(name="server1", paths=["/data"], root_parallel=0)
+        config = Config(hosts=[host], root_parallel=0)
+        errors = config.validate()
+        assert any("--root-parallel" in e for e in errors)
+        assert any("server1" in e and "root_parallel" in e for e in errors)
+
+    def test_invalid_scan_method(self) -> None:
+        """Test nieprawidłowej metody skanu."""
+        config = Config(local=True, paths=["/data"], scan_method="invalid")
+        errors = config.validate()
+        assert any("scan-method" in e for e in errors)
+
+    def test_growth_mode_default_history_db(self) -> None:
+        """Test domyślnej bazy historii w trybie growth."""
+        config = Config(local=True, paths=["/data"], report_mode="growth", cache_dir="/tmp/cache")
+        assert config.validate() == []
+        assert config.get_history_db() == "/tmp/cache/history.sqlite"
+        assert Config(local=True, paths=["/data"]).get_history_db() is None
+
+    def test_incremental_requires_du(self) -> None:
+        """Test że skan przyrostowy wymaga metody du."""
+        config = Config(local=True, paths=["/data"], scan_method="combined", incremental=True)
+        errors = config.validate()
+        assert any("--incremental" in e for e in errors)
+
+    def test_native_requires_local(self) -> None:
+        """Test że skaner native działa tylko w trybie lokalnym."""
+        config = Config(hosts=[HostProfile(name="server1", paths=["/data"])], scan_method="native")
+        errors = config.validate()
+        assert any("native" in e for e in errors)
+        assert Config(local=True, paths=["/data"], scan_method="native").validate() == []
+
     def test_invalid_stale_kind(self) -> None:
         """Test nieprawidłowego stale_kind."""
         config = Config(local=True, paths=["/data"], stale_kind="invalid")
@@ -127,6 +166,56 @@ class TestMergeConfig:
         assert config.top_n == 5
         assert config.scan_depth == 15
 
+    def test_host_root_parallel_from_yaml(self) -> None:
+        """Test wczytania root_parallel z defaults i profilu hosta."""
+        yaml_config = {
+            "defaults": {"root_parallel": 2},
+            "hosts": [{"name": "server1", "paths": ["/data", "/home"], "root_parallel": 4}],
+        }
+
+        config = build_config(yaml_config, {})
+
+        assert config.root_parallel == 2
+        assert config.hosts[0].root_parallel == 4
+
+    def test_serve_section(self) -> None:
+        """Test wczytania sekcji serve i nadpisania przez CLI."""
+        yaml_config = {
+            "serve": {"listen": "127.0.0.1", "port": 9000, "interval": 600},
+            "hosts": [{"name": "server1", "paths": ["/data"]}],
+        }
+
+        config = build_config(yaml_config, {"serve_interval": 60})
+
+        assert (config.serve_address, config.serve_port, config.serve_interval) == ("127.0.0.1", 9000, 60)
+        assert build_config(yaml_config, {"serve_port": 0}).serve_port == 0
+        assert config.validate() == []
+
+    def test_approx_error_requires_agent(self) -> None:
+        """Test walidacji skanu przybliżonego (tylko agent, błąd w zakresie 0-1)."""
+        cli_args = {"local": True, "paths": ["/data"], "approx_error": 0.05}
+
+        assert build_config(None, {**cli_args, "scan_method": "agent"}).validate() == []
+        assert any("agent" in error for error in build_config(None, cli_args).validate())
+        assert build_config(None, {**cli_args, "scan_method": "agent", "approx_error": 1.5}).validate() != []
+
+    def test_fill_threshold_from_yaml(self) -> None:
+        """Test wczytania i walidacji progu zapełnienia."""
+        config = build_config({"defaults": {"fill_threshold": 0.8}}, {"local": True, "paths": ["/data"]})
+
+        assert config.fill_threshold == 0.8
+        assert config.validate() == []
+        config.fill_threshold = 1.5
+        assert "--fill-threshold musi być w zakresie 0.0-1.0." in config.validate()
+
+    def test_usage_delta_from_yaml(self) -> None:
+        """Test wczytania progu zmiany zajętości z jednostką."""
+        config = build_config({"defaults": {"usage_delta": "10G"}}, {"local": True, "paths": ["/data"]})
+
+        assert config.usage_delta == 10 * 1024**3
+        assert config.validate() == []
+        assert build_config(None, {"local": True, "paths": ["/data"], "usage_delta": 512}).usage_delta == 512
+
     def test_merge_excludes(self) -> None:
         """Test łączenia wykluczeń z YAML i CLI."""
         yaml_config = {
@@ -1,10 +1,22 @@
 """Testy dla modułu executor."""
 
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from dsmonitor import executor
+from dsmonitor.cache import DirectSizes
 from dsmonitor.config import Config, HostProfile
 from dsmonitor.executor import (
+    CommandResult,
     build_du_command_args,
     build_ssh_command,
+    build_ssh_command_args,
     run_command,
+    ssh_multiplexing,
+    stream_command,
 )
 
 
@@ -77,6 +89,73 @@ class TestBuildSshCommand:
         assert "-p 2222" in cmd
 
 
+class TestSshMultiplexing:
+    """Testy współdzielonych połączeń SSH."""
+
+    def test_control_options_added(self) -> None:
+        """Test opcji ControlMaster przy aktywnym multipleksowaniu."""
+        host = HostProfile(name="server1", paths=["/data"])
+        config = Config(ssh_options="-o BatchMode=yes", ssh_control_dir="/tmp/dsm")
+
+        args = build_ssh_command_args(host, "echo test", config)
+
+        assert "ControlMaster=auto" in args
+        assert "ControlPath=/tmp/dsm/%C" in args
+        assert args[-2:] == ["server1", "echo test"]
+
+    def test_user_control_options_win(self) -> None:
+        """Test że ControlPath z ssh_options nie jest nadpisywany."""
+        host = HostProfile(name="server1", paths=["/data"])
+        config = Config(ssh_options="-o ControlPath=~/.ssh/cm-%C", ssh_control_dir="/tmp/dsm")
+
+        args = build_ssh_command_args(host, "echo test", config)
+
+        assert "ControlMaster=auto" not in args
+
+    def test_context_sets_and_removes_dir(self) -> None:
+        """Test tworzenia i sprzątania katalogu gniazd."""
+        config = Config(hosts=[HostProfile(name="server1", paths=["/data"])])
+
+        with ssh_multiplexing(config):
+            control_dir = config.ssh_control_dir
+            assert control_dir is not None
+            assert Path(control_dir).is_dir()
+
+        assert config.ssh_control_dir is None
+        assert not Path(control_dir).exists()
+
+    def test_exit_runs_in_parallel_and_kills_hung(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test równoległego ssh -O exit: zawieszony host jest zabijany, a katalog gniazd usuwany."""
+        log = tmp_path / "exits.log"
+        fake_ssh = tmp_path / "bin" / "ssh"
+        fake_ssh.parent.mkdir()
+        fake_ssh.write_text(
+            f'#!/bin/sh\nfor arg; do target=$arg; done\necho "$target" >> {log}\n'
+            '[ "$target" = hung ] && exec sleep 30\nexit 0\n'
+        )
+        fake_ssh.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{fake_ssh.parent}:{os.environ['PATH']}")
+        monkeypatch.setattr(executor, "SSH_EXIT_TIMEOUT", 0.5)
+        config = Config(hosts=[HostProfile(name=name, paths=["/data"]) for name in ("hung", "a", "b")])
+
+        started = time.monotonic()
+        with ssh_multiplexing(config):
+            control_dir = config.ssh_control_dir
+            assert control_dir is not None
+            (Path(control_dir) / "socket").touch()
+
+        assert time.monotonic() - started < 5
+        assert sorted(log.read_text().split()) == ["a", "b", "hung"]
+        assert not Path(control_dir).exists()
+
+    def test_disabled_in_local_mode(self) -> None:
+        """Test że tryb lokalny nie włącza multipleksowania."""
+        config = Config(local=True, paths=["/data"])
+
+        with ssh_multiplexing(config):
+            assert config.ssh_control_dir is None
+
+
 class TestRunCommand:
     """Testy wykonywania komend."""
 
@@ -109,6 +188,55 @@ class TestRunCommand:
         assert result.return_code != 0
 
 
+class TestStreamCommand:
+    """Testy strumieniowego wykonywania komend."""
+
+    def test_stream_lines(self) -> None:
+        """Test odczytu stdout linia po linii."""
+        config = Config(local=True, paths=["/data"], timeout=10)
+
+        with stream_command("printf 'a\\nb\\n'", None, config) as stream:
+            lines = list(stream)
+            result = stream.result()
+
+        assert lines == ["a", "b"]
+        assert result.success is True
+        assert result.stdout == ""
+
+    def test_stream_collects_stderr(self) -> None:
+        """Test zbierania stderr i kodu wyjścia."""
+        config = Config(local=True, paths=["/data"], timeout=10)
+
+        with stream_command("echo blad >&2; exit 3", None, config) as stream:
+            assert list(stream) == []
+            result = stream.result()
+
+        assert result.return_code == 3
+        assert "blad" in result.stderr
+
+    def test_stream_timeout(self) -> None:
+        """Test przerwania procesu po timeoucie."""
+        config = Config(local=True, paths=["/data"], timeout=1)
+
+        with stream_command(["sleep", "5"], None, config) as stream:
+            list(stream)
+            result = stream.result()
+
+        assert result.timed_out is True
+        assert result.success is False
+
+    def test_stream_dry_run(self) -> None:
+        """Test trybu dry-run dla strumienia."""
+        config = Config(dry_run=True, local=True, paths=["/data"])
+
+        with stream_command("echo test", None, config) as stream:
+            assert list(stream) == []
+            result = stream.result()
+
+        assert result.dry_run is True
+        assert stream.command == "echo test"
+
+
 class TestBuildFindStaleBatchCommand:
     """Testy budowania komendy find batch."""
 
@@ -173,3 +301,186 @@ class TestParseStaleBatchOutput:
         result = parse_stale_batch_output(output)
 
         assert "/data/logs/subdir" in result
+
+
+class TestBuildTreeScanCommand:
+    """Testy komendy jednoprzebiegowego skanu drzewa."""
+
+    def test_basic_command(self) -> None:
+        """Test podstawowej komendy."""
+        from dsmonitor.executor import build_tree_scan_command
+
+        cmd = build_tree_scan_command("/data", days=30, kind="atime", find_command="/opt/freeware/bin/find")
+
+        assert cmd.startswith("/opt/freeware/bin/find /data -xdev")
+        assert "%A@" in cmd
+        assert "-prune" not in cmd
+        assert str(31 * 86400) in cmd
+
+    def test_excludes_prune(self) -> None:
+        """Test wykluczeń przez -prune."""
+        from dsmonitor.executor import build_tree_scan_command
+
+        cmd = build_tree_scan_command("/data", days=1, excludes=["*/.snapshot/*", "node_modules"])
+
+        assert "-path '*/.snapshot/*'" in cmd
+        assert "-name node_modules" in cmd
+        assert "-prune -o" in cmd
+
+    def test_matches_du_separate_dirs(self, tmp_path: Path) -> None:
+        """Test że zajętość per katalog zgadza się z du -S."""
+        import subprocess
+
+        from dsmonitor.executor import build_tree_scan_command
+
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / "f1").write_bytes(b"x" * 20000)
+        (tmp_path / "a" / "b" / "f2").write_bytes(b"y" * 50000)
+        (tmp_path / "a" / "b" / "link").hardlink_to(tmp_path / "a" / "b" / "f2")
+
+        cmd = build_tree_scan_command(str(tmp_path), days=365)
+        scan = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
+        du = subprocess.run(["du", "-B1", "-S", str(tmp_path)], capture_output=True, text=True, timeout=10)
+
+        scanned = {line.split("\t")[0]: int(line.split("\t")[1]) for line in scan.stdout.splitlines()}
+        expected = {line.split("\t")[1]: int(line.split("\t")[0]) for line in du.stdout.splitlines()}
+
+        assert scanned == expected
+
+    def test_matches_du_order(self, tmp_path: Path) -> None:
+        """Test że katalogi są wypisywane w kolejności du (post-order), także przy remisach."""
+        import subprocess
+
+        from dsmonitor.executor import build_tree_scan_command
+
+        for name in ("a/b/c", "a/d", "e", "f/g"):
+            (tmp_path / name).mkdir(parents=True)
+
+        cmd = build_tree_scan_command(f"{tmp_path}/", days=365)
+        scan = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
+        du = subprocess.run(["du", "-B1", "-S", f"{tmp_path}/"], capture_output=True, text=True, timeout=10)
+
+        scanned = [line.split("\t")[0] for line in scan.stdout.splitlines()]
+        expected = [line.split("\t")[1] for line in du.stdout.splitlines()]
+
+        assert scanned == expected
+
+
+class TestBuildDirectSizeCommand:
+    """Testy komend skanu przyrostowego."""
+
+    def test_dir_listing_command(self) -> None:
+        """Test komendy listingu katalogów z mtime."""
+        from dsmonitor.executor import build_dir_listing_command
+
+        cmd = build_dir_listing_command("/data", excludes=["node_modules"])
+
+        assert cmd.startswith("find /data -xdev")
+        assert "-name node_modules" in cmd
+        assert "-type d -printf '%T@\\t%p\\n'" in cmd
+
+    def test_matches_du_separate_dirs(self, tmp_path: Path) -> None:
+        """Test że zajętość bezpośrednia zgadza się z du -S."""
+        import subprocess
+
+        from dsmonitor.executor import build_direct_size_command
+
+        (tmp_path / "a" / "b").mkdir(parents=True)
+        (tmp_path / "a" / "f1").write_bytes(b"x" * 20000)
+        (tmp_path / "a" / "b" / "f2").write_bytes(b"y" * 50000)
+        (tmp_path / "a" / "b" / "link").hardlink_to(tmp_path / "a" / "b" / "f2")
+        dirs = [str(tmp_path), str(tmp_path / "a"), str(tmp_path / "a" / "b")]
+
+        scan = subprocess.run(build_direct_size_command(dirs), shell=True, capture_output=True, text=True, timeout=10)
+        du = subprocess.run(["du", "-B1", "-S", str(tmp_path)], capture_output=True, text=True, timeout=10)
+
+        measured = DirectSizes()
+        for line in scan.stdout.splitlines():
+            measured.add_line(line)
+        expected = {line.split("\t")[1]: int(line.split("\t")[0]) for line in du.stdout.splitlines()}
+
+        assert measured.sizes == expected
+        assert measured.linked == {str(tmp_path / "a" / "b")}
+
+    def test_host_commands_split_into_batches(self) -> None:
+        """Test podziału katalogów na paczki wg długości ścieżek."""
+        from dsmonitor.executor import build_host_direct_size_commands
+
+        config = Config(local=True, paths=["/data"])
+        dirs = [f"/data/katalog{i:03d}" for i in range(10)]
+
+        commands = build_host_direct_size_commands(dirs, None, config, max_chars=60)
+
+        assert len(commands) > 1
+        assert all(cmd.startswith("find ") for cmd in commands)
+        assert sum(cmd.count("/data/katalog") for cmd in commands) == 10
+        assert build_host_direct_size_commands([], None, config) == []
+
+
+class TestParseDfLine:
+    """Testy parsowania df -Pk."""
+
+    def test_data_line(self) -> None:
+        """Test linii danych."""
+        from dsmonitor.executor import parse_df_line
+
+        line = "/dev/mapper/vg-data  1000  400  600  40% /data/my mount"
+
+        assert parse_df_line(line) == (1000 * 1024, 400 * 1024, 600 * 1024)
+
+    def test_header_line(self) -> None:
+        """Test nagłówka."""
+        from dsmonitor.executor import parse_df_line
+
+        assert parse_df_line("Filesystem 1024-blocks Used Available Capacity Mounted on") is None
+
+
+class TestBuildHostDuBatchArgs:
+    """Testy du dla wielu katalogów naraz (głębokość adaptacyjna)."""
+
+    def test_batches_share_options(self) -> None:
+        """Test podziału ścieżek na paczki z tymi samymi opcjami du."""
+        from dsmonitor.executor import build_host_du_batch_args
+
+        config = Config(local=True, paths=["/data"], excludes=["*.tmp"])
+        dirs = [f"/data/katalog{i:03d}" for i in range(10)]
+
+        batches = build_host_du_batch_args(dirs, None, config, depth=2, max_chars=60)
+
+        assert len(batches) > 1
+        assert all(args[:4] == ["du", "-B1", "-x", "--max-depth=2"] for args in batches)
+        assert all("--exclude=*.tmp" in args for args in batches)
+        assert [p for args in batches for p in args if p.startswith("/data/")] == dirs
+
+
+class TestHostHealth:
+    """Testy bezpiecznika hosta."""
+
+    def test_trips_on_connection_error_and_timeout(self) -> None:
+        """Test oznaczenia hosta po kodzie 255 lub timeoucie, ale nie po błędzie komendy."""
+        from dsmonitor.executor import HostHealth
+
+        health = HostHealth()
+        health.record(CommandResult(command="du", stdout="", stderr="du: brak dostępu", return_code=1))
+        assert health.is_down is False
+
+        health.record(
+            CommandResult(command="du", stdout="", stderr="Timeout po 5 sekundach", return_code=-1, timed_out=True)
+        )
+        health.record(CommandResult(command="du", stdout="", stderr="ssh: connect refused", return_code=255))
+
+        assert health.is_down is True
+        assert health.failure == "Timeout po 5 sekundach"
+
+    def test_fast_fail_result(self) -> None:
+        """Test wyniku komendy pominiętej przez bezpiecznik."""
+        from dsmonitor.executor import HostHealth
+
+        health = HostHealth()
+        health.record_probe(CommandResult(command="true", stdout="", stderr="\nssh: no route\n", return_code=255))
+
+        result = health.fast_fail_result(["du", "-B1", "/data"])
+
+        assert result.success is False
+        assert result.command == "du -B1 /data"
+        assert "ssh: no route" in result.stderr
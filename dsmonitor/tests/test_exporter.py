@@ -0,0 +1,154 @@
+"""Testy dla modułu exporter."""
+
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from dsmonitor.analyzer import DirectoryInfo, HostResult, RootSummary
+from dsmonitor.cli import serve, serve_cycle
+from dsmonitor.config import Config
+from dsmonitor.exporter import (
+    OPENMETRICS_CONTENT_TYPE,
+    TEXT_CONTENT_TYPE,
+    MetricsExporter,
+    MetricsServer,
+    scan_periodically,
+)
+
+
+def make_result(total_size: int = 100, failed: bool = False) -> HostResult:
+    """Buduje wynik hosta z rootem /data (Top 1) i opcjonalnie nieudanym rootem /home."""
+    directory = DirectoryInfo(
+        path="/data/logs", total_size=80, direct_files_size=80, file_heavy_ratio=1.0, stale_size=5
+    )
+    roots = [RootSummary(path="/data", total_size=total_size, stale_size=10, top_directories=[directory])]
+    result = HostResult(host_name="serwer", roots=roots)
+    if failed:
+        result.roots.append(RootSummary(path="/home", total_size=0, warnings=["Błąd du"]))
+        result.failed_roots.append("/home")
+        result.success = False
+    return result
+
+
+class TestMetricsExporter:
+    """Testy stanu eksportera i formatowania /metrics."""
+
+    def test_text_format(self) -> None:
+        """Test próbek rootów, katalogów Top N i stanu hosta."""
+        exporter = MetricsExporter(["serwer"])
+        exporter.update(make_result(), timestamp=1000.0)
+        exporter.finish_cycle(2.5)
+
+        page = exporter.page(openmetrics=False).decode()
+
+        assert 'dsmonitor_root_size_bytes{host="serwer",root="/data"} 100' in page
+        assert 'dsmonitor_root_stale_bytes{host="serwer",root="/data"} 10' in page
+        assert 'dsmonitor_directory_size_bytes{host="serwer",root="/data",directory="/data/logs"} 80' in page
+        assert 'dsmonitor_directory_stale_bytes{host="serwer",root="/data",directory="/data/logs"} 5' in page
+        assert 'dsmonitor_root_last_success_timestamp_seconds{host="serwer",root="/data"} 1000.0' in page
+        assert 'dsmonitor_host_scan_success{host="serwer"} 1' in page
+        assert "# TYPE dsmonitor_scan_cycles_total counter\ndsmonitor_scan_cycles_total 1\n" in page
+        assert "dsmonitor_scan_cycle_seconds 2.5" in page
+        assert "# EOF" not in page
+
+    def test_openmetrics_format(self) -> None:
+        """Test rodziny licznika bez _total i znacznika EOF w OpenMetrics."""
+        exporter = MetricsExporter(["serwer"])
+
+        page = exporter.page(openmetrics=True).decode()
+
+        assert "# TYPE dsmonitor_scan_cycles counter\ndsmonitor_scan_cycles_total 0\n" in page
+        assert page.endswith("# EOF\n")
+        assert "dsmonitor_root_size_bytes" not in page
+
+    def test_failed_root_keeps_last_success(self) -> None:
+        """Test zachowania ostatniego udanego wyniku roota po błędzie skanu."""
+        exporter = MetricsExporter(["serwer"])
+        exporter.update(make_result(total_size=100), timestamp=1000.0)
+        exporter.update(make_result(total_size=200, failed=True), timestamp=2000.0)
+
+        page = exporter.page(openmetrics=False).decode()
+
+        assert 'dsmonitor_root_size_bytes{host="serwer",root="/data"} 200' in page
+        assert 'root="/home"' not in page
+        assert 'dsmonitor_host_scan_success{host="serwer"} 0' in page
+        assert 'dsmonitor_host_last_scan_timestamp_seconds{host="serwer"} 2000.0' in page
+
+    def test_label_escaping(self) -> None:
+        """Test escapowania cudzysłowów i ukośników w etykietach."""
+        exporter = MetricsExporter([])
+        exporter.update(HostResult(host_name="serwer", roots=[RootSummary(path='/data/"a"\\b', total_size=1)]))
+
+        assert 'root="/data/\\"a\\"\\\\b"' in exporter.page(openmetrics=False).decode()
+
+
+class TestMetricsServer:
+    """Testy serwera HTTP i pętli skanów."""
+
+    def test_serves_cached_page(self) -> None:
+        """Test odpowiedzi /metrics z pamięci z negocjacją formatu i 404 dla innych ścieżek."""
+        exporter = MetricsExporter(["serwer"])
+        exporter.update(make_result(), timestamp=1000.0)
+        server = MetricsServer(("127.0.0.1", 0), exporter)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+
+        try:
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                assert response.headers["Content-Type"] == TEXT_CONTENT_TYPE
+                assert response.read() == exporter.page(openmetrics=False)
+
+            request = urllib.request.Request(f"{base}/metrics", headers={"Accept": "application/openmetrics-text"})
+            with urllib.request.urlopen(request) as response:
+                assert response.headers["Content-Type"] == OPENMETRICS_CONTENT_TYPE
+                assert response.read().endswith(b"# EOF\n")
+
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base}/inne")
+            assert error.value.code == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_scan_periodically_survives_errors(self) -> None:
+        """Test kontynuacji pętli po wyjątku skanu i zakończenia po stop."""
+        stop = threading.Event()
+        calls: list[int] = []
+
+        def scan() -> None:
+            calls.append(len(calls))
+            if len(calls) == 1:
+                raise RuntimeError("błąd")
+            stop.set()
+
+        scan_periodically(scan, 0.0, stop)
+
+        assert calls == [0, 1]
+
+
+class TestServe:
+    """Testy cyklu skanu i uruchomienia trybu serwera."""
+
+    def test_cycle_without_journal(self, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test że cykl z nieudanym rootem nie zostawia dziennika ani podpowiedzi --resume."""
+        root = tmp_path / "data"
+        root.mkdir()
+        cache_dir = tmp_path / "cache"
+        config = Config(local=True, paths=[str(root), str(tmp_path / "brak")], cache_dir=str(cache_dir))
+        exporter = MetricsExporter(["localhost"])
+
+        serve_cycle(config, exporter)
+
+        assert not (cache_dir / "runs").exists()
+        assert "--resume" not in capsys.readouterr().err
+        assert 'dsmonitor_host_scan_success{host="localhost"} 0' in exporter.page(openmetrics=False).decode()
+
+    def test_rejects_resume_and_run_id(self, tmp_path: Path) -> None:
+        """Test odrzucenia --resume i --run-id w trybie serwera."""
+        options = {"local": True, "paths": [str(tmp_path)], "serve_port": 0}
+
+        assert serve(Config(**options, resume=True)) == 1
+        assert serve(Config(**options, run_id="noc")) == 1
@@ -0,0 +1,122 @@
+"""Testy dla modułu history."""
+
+from pathlib import Path
+
+import pytest
+
+from dsmonitor.analyzer import SOURCE_FILESYSTEM, DirectoryInfo, HostResult, RootSummary
+from dsmonitor.history import HistoryStore, annotate_growth, days_until_full
+
+DAY = 86400.0
+
+
+def make_results(root_size: int, dir_size: int, fs_available: int | None = None) -> list[HostResult]:
+    """Buduje wynik jednego hosta z jednym rootem i jednym katalogiem."""
+    directory = DirectoryInfo(path="/data/app", total_size=dir_size, direct_files_size=dir_size, file_heavy_ratio=1.0)
+    root = RootSummary(path="/data", total_size=root_size, top_directories=[directory], fs_available=fs_available)
+    return [HostResult(host_name="server1", roots=[root])]
+
+
+class TestHistoryStore:
+    """Testy zapisu migawek i wyliczania trendów."""
+
+    def test_root_and_directory_trend(self, tmp_path: Path) -> None:
+        """Test nachylenia regresji dla roota i katalogu."""
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            for day in range(4):
+                store.record(make_results(1000 + day * 100, 500 + day * 50), timestamp=day * DAY)
+
+            root_trend = store.root_trend("server1", "/data", since=0.0)
+            directory_trends = store.directory_trends("server1", "/data", since=0.0)
+
+        assert root_trend is not None
+        assert root_trend[0] == pytest.approx(100.0)
+        assert root_trend[1] == 4
+        assert directory_trends["/data/app"][0] == pytest.approx(50.0)
+
+    def test_single_snapshot_has_no_trend(self, tmp_path: Path) -> None:
+        """Test braku trendu przy jednej migawce."""
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            store.record(make_results(1000, 500), timestamp=0.0)
+
+            assert store.root_trend("server1", "/data", since=0.0) is None
+            assert store.directory_trends("server1", "/data", since=0.0) == {}
+
+    def test_window_excludes_old_snapshots(self, tmp_path: Path) -> None:
+        """Test pomijania migawek sprzed okna."""
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            store.record(make_results(10, 5), timestamp=0.0)
+            store.record(make_results(1000, 500), timestamp=10 * DAY)
+            store.record(make_results(1000, 500), timestamp=11 * DAY)
+
+            trend = store.root_trend("server1", "/data", since=5 * DAY)
+
+        assert trend == (0.0, 2)
+
+    def test_skips_empty_roots(self, tmp_path: Path) -> None:
+        """Test pomijania rootów bez danych (np. po błędzie du)."""
+        results = [HostResult(host_name="server1", roots=[RootSummary(path="/data", total_size=0)])]
+
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            store.record(results, timestamp=0.0)
+            store.record(results, timestamp=DAY)
+
+            assert store.root_trend("server1", "/data", since=0.0) is None
+
+    def test_skips_roots_without_tree_scan(self, tmp_path: Path) -> None:
+        """Test pomijania rootów z zajętością systemu plików zamiast skanu (--fill-threshold)."""
+        filesystem_only = make_results(900_000, 0)
+        filesystem_only[0].roots[0].source = SOURCE_FILESYSTEM
+
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            store.record(make_results(1000, 500), timestamp=0.0)
+            store.record(filesystem_only, timestamp=DAY)
+            store.record(make_results(1200, 600), timestamp=2 * DAY)
+
+            assert store.root_trend("server1", "/data", since=0.0) == (pytest.approx(100.0), 2)
+
+    def test_record_into_started_run(self, tmp_path: Path) -> None:
+        """Test zapisu hostów po kolei do jednego przebiegu."""
+        second = make_results(2000, 1000)
+        second[0].host_name = "server2"
+
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            run_id = store.start_run(timestamp=0.0)
+            assert store.record(make_results(1000, 500), run_id=run_id) == run_id
+            assert store.record(second, run_id=run_id) == run_id
+            store.record(make_results(1100, 550), timestamp=DAY)
+
+            assert store.root_trend("server1", "/data", since=0.0) == (pytest.approx(100.0), 2)
+            assert store.root_trend("server2", "/data", since=0.0) is None
+
+
+class TestAnnotateGrowth:
+    """Testy uzupełniania wyników o przyrost."""
+
+    def test_annotate(self, tmp_path: Path) -> None:
+        """Test przyrostu i prognozy zapełnienia."""
+        with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+            store.record(make_results(1000, 500), timestamp=0.0)
+            current = make_results(1200, 700, fs_available=2000)
+            store.record(current, timestamp=2 * DAY)
+
+            annotate_growth(current, store, window_days=30, top_n=5, now=2 * DAY)
+
+        root = current[0].roots[0]
+        assert root.growth_per_day == pytest.approx(100.0)
+        assert root.days_until_full == pytest.approx(20.0)
+        assert len(root.growth) == 1
+        assert root.growth[0].path == "/data/app"
+        assert root.growth[0].total_size == 700
+        assert root.growth[0].days_until_full == pytest.approx(20.0)
+
+
+class TestDaysUntilFull:
+    """Testy prognozy zapełnienia."""
+
+    def test_values(self) -> None:
+        """Test prognozy dla rosnącego, stałego i nieznanego rozmiaru."""
+        assert days_until_full(1000, 100.0) == pytest.approx(10.0)
+        assert days_until_full(1000, 0.0) is None
+        assert days_until_full(1000, -5.0) is None
+        assert days_until_full(None, 100.0) is None
@@ -0,0 +1,128 @@
+"""Testy dla modułu journal."""
+
+import sqlite3
+from pathlib import Path
+
+from dsmonitor.analyzer import DirectoryInfo, RootSummary
+from dsmonitor.cli import run, scan_all_hosts
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.journal import ScanJournal, journal_path, latest_run_id, load_journal, scan_fingerprint
+
+
+def make_summary(path: str) -> RootSummary:
+    """Tworzy przykładowe podsumowanie roota."""
+    return RootSummary(
+        path=path,
+        total_size=4096,
+        top_directories=[
+            DirectoryInfo(
+                path=f"{path}/a",
+                total_size=4096,
+                direct_files_size=4096,
+                file_heavy_ratio=1.0,
+                parent_path=path,
+                parent_total_size=4096,
+                depth=1,
+            )
+        ],
+    )
+
+
+class TestScanJournal:
+    """Testy zapisu i odczytu dziennika."""
+
+    def test_roundtrip_and_truncated_line(self, tmp_path: Path) -> None:
+        """Test odczytu wpisów z pominięciem przerwanej ostatniej linii."""
+        config = Config(local=True, paths=["/data"])
+        fingerprint = scan_fingerprint(config)
+        path = journal_path(str(tmp_path), "noc/1")
+
+        with ScanJournal(path, "noc/1", fingerprint) as journal:
+            journal.record("serwer", make_summary("/data"))
+        with open(path, "a", encoding="utf-8") as f:
+            f.write('{"host": "serwer", "root": "/home", "summ')
+
+        assert load_journal(path, fingerprint) == {("serwer", "/data"): make_summary("/data")}
+        assert latest_run_id(str(tmp_path)) == "noc/1"
+
+    def test_changed_settings_ignore_journal(self, tmp_path: Path) -> None:
+        """Test pomijania dziennika zapisanego przy innych ustawieniach."""
+        path = journal_path(str(tmp_path), "noc")
+        with ScanJournal(path, "noc", scan_fingerprint(Config(local=True, paths=["/data"]))) as journal:
+            journal.record("serwer", make_summary("/data"))
+
+        other = scan_fingerprint(Config(local=True, paths=["/data"], top_n=5))
+
+        assert load_journal(path, other) == {}
+
+    def test_fingerprint_covers_scan_settings(self) -> None:
+        """Test że tryb skanu, adaptacyjna głębokość i usage_delta zmieniają ustawienia skanu."""
+        base = scan_fingerprint(Config(local=True, paths=["/data"]))
+
+        for options in ({"incremental": True}, {"adaptive_depth": True}, {"adaptive_share": 0.1}, {"usage_delta": 1}):
+            assert scan_fingerprint(Config(local=True, paths=["/data"], **options)) != base
+
+    def test_host_overrides_checked_per_root(self, tmp_path: Path) -> None:
+        """Test pomijania wpisu roota po zmianie ustawień hosta (głębokość, wykluczenia)."""
+        config = Config(hosts=[HostProfile(name="a", paths=["/data"]), HostProfile(name="b", paths=["/data"])])
+        fingerprint = scan_fingerprint(config)
+        path = journal_path(str(tmp_path), "noc")
+        with ScanJournal(path, "noc", fingerprint) as journal:
+            for host in config.hosts:
+                journal.record(host.name, make_summary("/data"), scan_fingerprint(config, host))
+
+        config.hosts[1].scan_depth = 3
+        config.hosts[1].excludes = ["*.tmp"]
+        current = {(host.name, "/data"): scan_fingerprint(config, host) for host in config.hosts}
+
+        assert current[("b", "/data")] != fingerprint
+        assert load_journal(path, fingerprint, current) == {("a", "/data"): make_summary("/data")}
+
+
+class TestResume:
+    """Testy wznawiania przebiegu."""
+
+    def test_resume_skips_completed_roots(self, tmp_path: Path) -> None:
+        """Test że --resume pomija rooty zakończone i ponawia nieudane."""
+        done_root = tmp_path / "data" / "gotowy"
+        (done_root / "a").mkdir(parents=True)
+        (done_root / "a" / "plik").write_bytes(b"x" * 40000)
+        failed_root = tmp_path / "data" / "brak"
+        cache_dir = str(tmp_path / "cache")
+        options = {"local": True, "paths": [str(done_root), str(failed_root)], "cache_dir": cache_dir}
+
+        first = scan_all_hosts(Config(**options, run_id="noc"))
+        failed_root.mkdir()
+        (done_root / "a" / "nowy").write_bytes(b"y" * 80000)
+        resumed = scan_all_hosts(Config(**options, run_id="noc", resume=True))
+
+        assert first[0].success is False
+        assert resumed[0].success is True
+        assert resumed[0].roots[0] == first[0].roots[0]
+        assert not journal_path(cache_dir, "noc").exists()
+
+    def test_resumed_roots_not_recorded_twice(self, tmp_path: Path) -> None:
+        """Test że rooty z dziennika nie są ponownie zapisywane w historii (--stream)."""
+        done_root = tmp_path / "data" / "gotowy"
+        (done_root / "a").mkdir(parents=True)
+        (done_root / "a" / "plik").write_bytes(b"x" * 40000)
+        failed_root = tmp_path / "data" / "brak"
+        history_db = str(tmp_path / "history.sqlite")
+        options = {
+            "local": True,
+            "paths": [str(done_root), str(failed_root)],
+            "cache_dir": str(tmp_path / "cache"),
+            "history_db": history_db,
+            "stream": True,
+            "output_file": str(tmp_path / "raport.txt"),
+            "run_id": "noc",
+        }
+
+        assert run(Config(**options)) == 1
+        failed_root.mkdir()
+        (failed_root / "plik").write_bytes(b"y" * 8192)
+        assert run(Config(**options, resume=True)) == 0
+
+        with sqlite3.connect(history_db) as connection:
+            rows = connection.execute("SELECT root, COUNT(*) FROM root_snapshots GROUP BY root").fetchall()
+        assert dict(rows) == {str(done_root): 1, str(failed_root): 1}
@@ -0,0 +1,91 @@
+"""Testy dla modułu metrics."""
+
+import json
+from pathlib import Path
+
+from dsmonitor.analyzer import HostResult
+from dsmonitor.metrics import LineMeter, ScanMetrics, metrics_to_json, metrics_to_prometheus, write_metrics
+
+
+def make_results() -> list[HostResult]:
+    """Buduje wynik hosta z metrykami jednego roota."""
+    root_metrics = ScanMetrics(phases={"du": 2.5, "analysis": 0.5}, counters={"lines": 10, "peak_directories": 10})
+    host_metrics = ScanMetrics(phases={"connect": 0.25})
+    host_metrics.merge(root_metrics)
+    return [HostResult(host_name="serwer", metrics=host_metrics, root_metrics={"/data": root_metrics})]
+
+
+class TestScanMetrics:
+    """Testy czasów faz i liczników."""
+
+    def test_count_sums_and_peaks(self) -> None:
+        """Test sumowania liczników i maksimum dla peak_*."""
+        metrics = ScanMetrics()
+        metrics.count("lines", 5)
+        metrics.count("lines", 7)
+        metrics.count("peak_directories", 30)
+        metrics.count("peak_directories", 20)
+
+        assert metrics.counters == {"lines": 12, "peak_directories": 30}
+
+    def test_merge(self) -> None:
+        """Test łączenia metryk rootów w metryki hosta."""
+        total = ScanMetrics()
+        total.merge(ScanMetrics(phases={"du": 1.0}, counters={"lines": 3, "peak_directories": 3}))
+        total.merge(ScanMetrics(phases={"du": 2.0, "df": 0.5}, counters={"lines": 4, "peak_directories": 2}))
+
+        assert total.phases == {"du": 3.0, "df": 0.5}
+        assert total.counters == {"lines": 7, "peak_directories": 3}
+
+    def test_record_command_moves_parse_time(self) -> None:
+        """Test przeniesienia czasu obsługi linii z fazy komendy do parse."""
+        lines: list[str] = []
+        meter = LineMeter(lines.append)
+        meter("100\t/data")
+        meter("200\t/data/a")
+        meter.seconds = 0.25
+        metrics = ScanMetrics()
+
+        metrics.record_command("du", 1.0, meter)
+
+        assert lines == ["100\t/data", "200\t/data/a"]
+        assert metrics.phases == {"parse": 0.25, "du": 0.75}
+        assert metrics.counters == {"commands": 1, "lines": 2, "bytes": 22}
+
+
+class TestExport:
+    """Testy eksportu metryk."""
+
+    def test_json(self) -> None:
+        """Test dokumentu JSON z metrykami hosta i rootów."""
+        data = metrics_to_json(make_results(), ScanMetrics(phases={"report": 0.1}))
+
+        assert data["run"]["phases"] == {"report": 0.1}
+        host = data["hosts"][0]
+        assert host["phases"]["connect"] == 0.25
+        assert host["roots"] == [
+            {"path": "/data", "phases": {"du": 2.5, "analysis": 0.5}, "counters": {"lines": 10, "peak_directories": 10}}
+        ]
+
+    def test_prometheus(self) -> None:
+        """Test formatu tekstowego Prometheus."""
+        text = metrics_to_prometheus(make_results(), ScanMetrics(phases={"report": 0.1}))
+        lines = text.splitlines()
+
+        assert 'dsmonitor_run_phase_seconds{phase="report"} 0.1' in lines
+        assert 'dsmonitor_phase_seconds{host="serwer",root="/data",phase="du"} 2.5' in lines
+        assert 'dsmonitor_lines{host="serwer",root="/data"} 10' in lines
+        assert 'dsmonitor_connect_seconds{host="serwer"} 0.25' in lines
+        assert 'dsmonitor_host_success{host="serwer"} 1' in lines
+        assert lines.count("# TYPE dsmonitor_phase_seconds gauge") == 1
+
+    def test_write_metrics(self, tmp_path: Path) -> None:
+        """Test zapisu obu plików metryk."""
+        json_path = tmp_path / "metrics.json"
+        prometheus_path = tmp_path / "dsmonitor.prom"
+
+        write_metrics(make_results(), ScanMetrics(), str(json_path), str(prometheus_path))
+
+        assert json.loads(json_path.read_text())["hosts"][0]["name"] == "serwer"
+        assert prometheus_path.read_text().startswith("# TYPE")
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["dsmonitor.prom", "metrics.json"]
@@ -0,0 +1,74 @@
+"""Testy dla modułu native."""
+
+import os
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from dsmonitor.config import Config
+from dsmonitor.native import scan_tree
+from dsmonitor.pipeline import plan_root_scan, run_plan
+
+
+def make_tree(root: Path) -> None:
+    """Tworzy drzewo testowe z twardymi linkami między katalogami i starym plikiem."""
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "c" / "d").mkdir(parents=True)
+    (root / "skip").mkdir()
+    (root / "a" / "f1").write_bytes(b"x" * 20000)
+    (root / "a" / "b" / "f2").write_bytes(b"y" * 50000)
+    (root / "c" / "d" / "link").hardlink_to(root / "a" / "b" / "f2")
+    (root / "skip" / "f3").write_bytes(b"w" * 40000)
+    (root / "c" / "old").write_bytes(b"z" * 30000)
+    old = time.time() - 400 * 86400
+    os.utime(root / "c" / "old", (old, old))
+
+
+class TestScanTree:
+    """Testy natywnego przejścia drzewa."""
+
+    def test_matches_du_separate_dirs(self, tmp_path: Path) -> None:
+        """Test zajętości bezpośredniej zgodnej z du -S (twarde linki, wykluczenia)."""
+        make_tree(tmp_path)
+
+        scan = scan_tree(str(tmp_path), ["skip"], workers=4)
+        du = subprocess.run(
+            ["du", "-B1", "-S", "-x", "--exclude=skip", str(tmp_path)], capture_output=True, text=True, timeout=10
+        )
+
+        expected = {line.split("\t")[1]: int(line.split("\t")[0]) for line in du.stdout.splitlines()}
+        assert scan.totals == expected
+        assert scan.errors == []
+
+    def test_stale_direct_sums(self, tmp_path: Path) -> None:
+        """Test sum stale bezpośrednich per katalog."""
+        make_tree(tmp_path)
+
+        scan = scan_tree(str(tmp_path), [], workers=2, stale_days=365)
+
+        assert scan.stale == {str(tmp_path / "c"): 30000}
+
+    def test_missing_root(self, tmp_path: Path) -> None:
+        """Test błędu dla nieistniejącego roota."""
+        with pytest.raises(OSError):
+            scan_tree(str(tmp_path / "brak"), [], workers=2)
+
+
+class TestNativeScan:
+    """Testy zgodności skanu native ze skanem du."""
+
+    def test_same_summary_as_du(self, tmp_path: Path) -> None:
+        """Test identycznego RootSummary w trybach size i stale."""
+        make_tree(tmp_path)
+
+        for mode in ("size", "stale"):
+            options = {"local": True, "paths": [str(tmp_path)], "top_n": 5, "report_mode": mode}
+            du_config = Config(**options, file_heavy_threshold=0.0)
+            native_config = Config(**options, file_heavy_threshold=0.0, scan_method="native", native_workers=3)
+
+            expected = run_plan(plan_root_scan(str(tmp_path), None, du_config, "localhost"), None, du_config)
+            actual = run_plan(plan_root_scan(str(tmp_path), None, native_config, "localhost"), None, native_config)
+
+            assert actual == expected
@@ -0,0 +1,244 @@
+"""Testy dla modułu pipeline."""
+
+from pathlib import Path
+
+import pytest
+
+from dsmonitor.analyzer import SOURCE_FILESYSTEM, SOURCE_SCAN
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.executor import CommandResult, HostHealth
+from dsmonitor.metrics import ScanMetrics
+from dsmonitor.pipeline import CommandStep, RootScan, plan_root_scan, resolve_host_health, run_plan
+from dsmonitor.scheduler import ScanJob
+
+
+class TestAdaptiveDepth:
+    """Testy skanu o adaptacyjnej głębokości."""
+
+    def test_matches_full_scan(self, tmp_path: Path) -> None:
+        """Test identycznego Top N jak z pełnego du do scan_depth."""
+        for name, size in (
+            ("duzy/a/b/c/d", 300000),
+            ("duzy/a/b/e", 120000),
+            ("duzy/f", 50000),
+            ("maly/g/h/i", 8000),
+            ("sredni/j/k", 90000),
+            ("sredni/l", 70000),
+        ):
+            directory = tmp_path / name
+            directory.mkdir(parents=True, exist_ok=True)
+            (directory / "plik").write_bytes(b"x" * size)
+
+        options = {"local": True, "paths": [str(tmp_path)], "top_n": 3, "scan_depth": 6, "stale_days": 0}
+        full_config = Config(**options)
+        adaptive_config = Config(**options, adaptive_depth=True, adaptive_step=1)
+
+        expected = run_plan(plan_root_scan(str(tmp_path), None, full_config, "localhost"), None, full_config)
+        actual = run_plan(plan_root_scan(str(tmp_path), None, adaptive_config, "localhost"), None, adaptive_config)
+
+        assert actual == expected
+        assert len(actual[0].top_directories) == 3
+
+    def test_share_threshold_limits_descent(self, tmp_path: Path) -> None:
+        """Test pomijania poddrzew o małym udziale w rodzicu."""
+        (tmp_path / "duzy").mkdir()
+        (tmp_path / "duzy" / "plik").write_bytes(b"x" * 400000)
+        (tmp_path / "maly" / "gleboki").mkdir(parents=True)
+        (tmp_path / "maly" / "gleboki" / "plik").write_bytes(b"x" * 4000)
+
+        config = Config(
+            local=True,
+            paths=[str(tmp_path)],
+            top_n=5,
+            scan_depth=4,
+            stale_days=0,
+            file_heavy_threshold=0.0,
+            adaptive_depth=True,
+            adaptive_step=1,
+            adaptive_share=0.5,
+        )
+
+        summary, error = run_plan(plan_root_scan(str(tmp_path), None, config, "localhost"), None, config)
+
+        paths = {d.path for d in summary.top_directories}
+        assert error is None
+        assert str(tmp_path / "maly") in paths
+        assert str(tmp_path / "maly" / "gleboki") not in paths
+
+
+class TestCircuitBreaker:
+    """Testy bezpiecznika hosta w wykonaniu planu."""
+
+    def test_down_host_skips_commands(self) -> None:
+        """Test że komendy niedostępnego hosta nie są uruchamiane."""
+        host = HostProfile(name="serwer", paths=["/data"])
+        config = Config(hosts=[host])
+        health = HostHealth()
+        health.trip("ssh: connection refused")
+
+        summary, error = run_plan(plan_root_scan("/data", host, config, "serwer"), host, config, health)
+
+        assert summary.total_size == 0
+        assert error is not None
+        assert "Host niedostępny" in error
+        assert "connection refused" in error
+
+    def test_skipped_commands_counted(self) -> None:
+        """Test licznika komend pominiętych przez bezpiecznik."""
+        host = HostProfile(name="serwer", paths=["/data"])
+        config = Config(hosts=[host])
+        health = HostHealth()
+        health.trip("ssh: connection refused")
+        metrics = ScanMetrics()
+
+        run_plan(plan_root_scan("/data", host, config, "serwer", metrics), host, config, health, metrics)
+
+        assert metrics.counters["skipped_commands"] == 1
+        assert "commands" not in metrics.counters
+
+
+class TestScanTimeout:
+    """Testy przerwania skanu po częściowym wyjściu."""
+
+    def test_partial_output_then_timeout(self, tmp_path: Path) -> None:
+        """Test że timeout po częściowym wyjściu du zwraca błąd roota."""
+        fake_du = tmp_path / "du"
+        fake_du.write_text("#!/bin/sh\necho '100\t/data/a'\necho '200\t/data/b'\nexec sleep 5\n")
+        fake_du.chmod(0o755)
+        config = Config(local=True, paths=["/data"], timeout=1, stale_days=0, du_command=str(fake_du))
+
+        summary, error = run_plan(plan_root_scan("/data", None, config, "localhost"), None, config)
+
+        assert summary.total_size == 0
+        assert summary.top_directories == []
+        assert error == "Błąd du dla /data: Timeout po 1 sekundach"
+
+
+class TestFillThreshold:
+    """Testy pomijania skanu rootów na mało zapełnionych systemach plików."""
+
+    def test_local_below_threshold_skips_scan(self, tmp_path: Path) -> None:
+        """Test rozmiaru ze statvfs bez du, gdy zapełnienie jest poniżej progu."""
+        (tmp_path / "a").mkdir()
+        config = Config(local=True, paths=[str(tmp_path)], fill_threshold=1.0)
+        metrics = ScanMetrics()
+
+        summary, error = run_plan(
+            plan_root_scan(str(tmp_path), None, config, "localhost", metrics), None, config, None, metrics
+        )
+
+        assert error is None
+        assert summary.approx is True
+        assert summary.source == SOURCE_FILESYSTEM
+        assert summary.top_directories == []
+        assert summary.fs_size is not None and summary.total_size > 0
+        assert set(metrics.phases) == {"df", "analysis"}
+
+    def test_local_above_threshold_scans(self, tmp_path: Path) -> None:
+        """Test pełnego skanu, gdy zapełnienie osiąga próg."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "plik").write_bytes(b"x" * 40000)
+        config = Config(local=True, paths=[str(tmp_path)], fill_threshold=0.0, file_heavy_threshold=0.5)
+
+        summary, error = run_plan(plan_root_scan(str(tmp_path), None, config, "localhost"), None, config)
+
+        assert error is None
+        assert summary.approx is False
+        assert summary.source == SOURCE_SCAN
+        assert [d.path for d in summary.top_directories] == [str(tmp_path / "a")]
+
+    def test_remote_df(self) -> None:
+        """Test decyzji na podstawie df -Pk na hoście zdalnym."""
+        host = HostProfile(name="serwer", paths=["/data"])
+        config = Config(hosts=[host], fill_threshold=0.8)
+        df_lines = ["Filesystem 1024-blocks Used Available Capacity Mounted on", "/dev/sdb 1000 300 700 30% /data"]
+
+        plan = plan_root_scan("/data", host, config, "serwer")
+        step = next(plan)
+        assert isinstance(step, CommandStep) and "df -Pk" in str(step.cmd)
+        for line in df_lines:
+            step.on_line(line)
+
+        with pytest.raises(StopIteration) as stop:
+            plan.send(CommandResult(command="df", stdout="", stderr="", return_code=0))
+        summary, error = stop.value.value
+
+        assert error is None
+        assert (summary.total_size, summary.fs_size, summary.fs_available) == (300 * 1024, 1000 * 1024, 700 * 1024)
+        assert "30%" in summary.warnings[0]
+
+
+class TestPlanMetrics:
+    """Testy metryk zbieranych podczas wykonania planu."""
+
+    def test_phases_and_counters(self, tmp_path: Path) -> None:
+        """Test czasów faz i liczników dla skanu du z find stale."""
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "plik").write_bytes(b"x" * 40000)
+        config = Config(local=True, paths=[str(tmp_path)], top_n=5, metrics_json=str(tmp_path / "m.json"))
+        metrics = ScanMetrics()
+
+        run_plan(plan_root_scan(str(tmp_path), None, config, "localhost", metrics), None, config, None, metrics)
+
+        assert {"du", "stale", "parse", "analysis"} <= set(metrics.phases)
+        assert metrics.counters["commands"] == 2
+        assert metrics.counters["lines"] >= 2
+        assert metrics.counters["bytes"] > 0
+        assert metrics.counters["peak_directories"] == 2
+
+    def test_line_metrics_only_when_requested(self, tmp_path: Path) -> None:
+        """Test pomiaru linii tylko przy eksporcie metryk lub verbose."""
+        config = Config(local=True, paths=[str(tmp_path)], stale_days=0)
+        metrics = ScanMetrics()
+
+        run_plan(plan_root_scan(str(tmp_path), None, config, "localhost", metrics), None, config, None, metrics)
+
+        assert "du" in metrics.phases
+        assert "parse" not in metrics.phases
+        assert "lines" not in metrics.counters
+
+
+class TestRootScan:
+    """Testy zadania skanu roota wspólnego dla obu silników."""
+
+    def test_outcome_and_metrics(self, tmp_path: Path) -> None:
+        """Test wyniku, czasu i metryk zadania wykonanego przez run_plan."""
+        (tmp_path / "a").mkdir()
+        config = Config(local=True, paths=[str(tmp_path)], stale_days=0)
+        job = ScanJob(None, "localhost", str(tmp_path), 0)
+
+        with RootScan(job, config) as scan:
+            scan.outcome = run_plan(scan.plan, None, config, None, scan.metrics)
+        (summary, error), seconds, metrics = scan.result()
+
+        assert error is None
+        assert summary.path == str(tmp_path)
+        assert seconds >= 0
+        assert metrics.counters["commands"] == 1
+
+    def test_exception_becomes_root_error(self) -> None:
+        """Test zamiany wyjątku z wykonania planu na błąd roota."""
+        job = ScanJob(None, "localhost", "/data", 0)
+
+        with RootScan(job, Config(local=True, paths=["/data"])) as scan:
+            raise RuntimeError("awaria parsera")
+        (summary, error), _, _ = scan.result()
+
+        assert error == "awaria parsera"
+        assert summary.warnings == ["Błąd: awaria parsera"]
+
+
+class TestResolveHostHealth:
+    """Testy stanu hostów po próbie osiągalności."""
+
+    def test_missing_probes_get_fresh_health(self, capsys: pytest.CaptureFixture[str]) -> None:
+        """Test świeżego stanu dla hostów bez próby i wypisania hostów niedostępnych."""
+        config = Config(hosts=[HostProfile(name="a", paths=["/"]), HostProfile(name="b", paths=["/"])], verbose=True)
+        down = HostHealth()
+        down.trip("ssh: connection refused")
+
+        health = resolve_host_health(config, {"a": down})
+
+        assert health["a"] is down
+        assert not health["b"].is_down
+        assert capsys.readouterr().out == "[a] Host niedostępny: ssh: connection refused\n"
@@ -0,0 +1,87 @@
+"""Testy dla modułu reporter."""
+
+import io
+import json
+
+import pytest
+
+from dsmonitor.analyzer import DirectoryInfo, HostResult, RootSummary
+from dsmonitor.config import Config
+from dsmonitor.reporter import ReportWriter, create_report_writer, generate_report
+
+
+def make_results() -> list[HostResult]:
+    """Buduje wyniki dwóch hostów (drugi z błędem)."""
+    directory = DirectoryInfo(path="/data/app", total_size=800, direct_files_size=800, file_heavy_ratio=1.0)
+    return [
+        HostResult(
+            host_name="server1", roots=[RootSummary(path="/data", total_size=1000, top_directories=[directory])]
+        ),
+        HostResult(
+            host_name="server2",
+            roots=[RootSummary(path="/data", total_size=0)],
+            success=False,
+            errors=["/data: błąd"],
+        ),
+    ]
+
+
+class TestReportWriter:
+    """Testy strumieniowego zapisu raportu."""
+
+    @pytest.mark.parametrize("output_format", ["text", "json", "jsonl", "csv"])
+    def test_stream_matches_report(self, output_format: str) -> None:
+        """Test zgodności raportu strumieniowego z raportem generowanym w całości."""
+        config = Config(output_format=output_format)
+        results = make_results()
+        stream = io.StringIO()
+
+        writer = create_report_writer(stream, config)
+        writer.begin()
+        for host_result in results:
+            writer.write_host(host_result)
+        writer.end()
+
+        assert _without_timestamp(stream.getvalue()) == _without_timestamp(generate_report(results, config))
+
+    def test_incomplete_writer_fails_on_creation(self) -> None:
+        """Test że writer bez begin i _write_host nie daje się utworzyć."""
+
+        class IncompleteWriter(ReportWriter):
+            pass
+
+        with pytest.raises(TypeError):
+            IncompleteWriter(io.StringIO(), Config())  # type: ignore[abstract]
+
+    def test_partial_json_contains_finished_hosts(self) -> None:
+        """Test zapisu sekcji hosta od razu (przed końcem raportu)."""
+        stream = io.StringIO()
+        writer = create_report_writer(stream, Config(output_format="json"))
+        writer.begin()
+        writer.write_host(make_results()[0])
+
+        assert '"name": "server1"' in stream.getvalue()
+
+        writer.end()
+        data = json.loads(stream.getvalue())
+        assert [host["name"] for host in data["hosts"]] == ["server1"]
+
+    def test_json_without_hosts(self) -> None:
+        """Test poprawnego JSON bez hostów."""
+        report = generate_report([], Config(output_format="json"))
+
+        assert json.loads(report)["hosts"] == []
+
+    def test_jsonl_line_per_host(self) -> None:
+        """Test formatu JSON Lines: metadane, potem linia na host."""
+        lines = generate_report(make_results(), Config(output_format="jsonl")).splitlines()
+
+        assert len(lines) == 3
+        assert "metadata" in json.loads(lines[0])
+        hosts = [json.loads(line) for line in lines[1:]]
+        assert [(host["name"], host["success"]) for host in hosts] == [("server1", True), ("server2", False)]
+
+
+def _without_timestamp(report: str) -> str:
+    """Usuwa linie z czasem wygenerowania raportu."""
+    return "\n".join(line for line in report.splitlines() if "timestamp" not in line and "Data:" not in line)
@@ -0,0 +1,123 @@
+"""Testy dla modułu scheduler."""
+
+from pathlib import Path
+
+from dsmonitor.analyzer import HostResult, RootSummary
+from dsmonitor.config import Config, HostProfile
+from dsmonitor.scheduler import JobQueue, ScanRun, build_jobs, durations_path, load_durations, save_durations
+
+
+def make_config(root_parallel: int = 1) -> Config:
+    """Tworzy konfigurację z dwoma hostami."""
+    return Config(
+        hosts=[
+            HostProfile(name="maly", paths=["/a", "/b"]),
+            HostProfile(name="duzy", paths=["/data", "/home"], root_parallel=2),
+        ],
+        root_parallel=root_parallel,
+    )
+
+
+class TestDurations:
+    """Testy zapisu czasów skanów."""
+
+    def test_roundtrip(self, tmp_path: Path) -> None:
+        """Test zapisu i odczytu czasów."""
+        path = durations_path(str(tmp_path))
+        save_durations(path, {("duzy", "/data"): 120.5, ("maly", "/a"): 1.25})
+
+        assert load_durations(path) == {("duzy", "/data"): 120.5, ("maly", "/a"): 1.25}
+
+    def test_missing_or_corrupt_file(self, tmp_path: Path) -> None:
+        """Test pustego wyniku dla brakującego lub uszkodzonego pliku."""
+        path = tmp_path / "durations.json"
+        assert load_durations(path) == {}
+
+        path.write_text("{zly json")
+        assert load_durations(path) == {}
+
+
+class TestBuildJobs:
+    """Testy kolejności zadań."""
+
+    def test_longest_first_unknown_at_front(self) -> None:
+        """Test kolejności: nieznane czasy, potem od najdłuższego."""
+        durations = {("maly", "/a"): 5.0, ("maly", "/b"): 300.0, ("duzy", "/data"): 3600.0}
+
+        jobs = build_jobs(make_config(), durations)
+
+        assert [job.key for job in jobs] == [
+            ("duzy", "/home"),
+            ("duzy", "/data"),
+            ("maly", "/b"),
+            ("maly", "/a"),
+        ]
+
+    def test_local_mode(self) -> None:
+        """Test zadań dla trybu lokalnego."""
+        jobs = build_jobs(Config(local=True, paths=["/x", "/y"]), {})
+
+        assert [(job.host, job.host_name, job.path, job.index) for job in jobs] == [
+            (None, "localhost", "/x", 0),
+            (None, "localhost", "/y", 1),
+        ]
+
+
+class TestJobQueue:
+    """Testy kolejki z limitem rootów per host."""
+
+    def test_respects_root_parallel(self) -> None:
+        """Test pomijania zadań hosta, który wykorzystał limit."""
+        durations = {("duzy", "/data"): 10.0, ("duzy", "/home"): 9.0, ("maly", "/a"): 8.0, ("maly", "/b"): 7.0}
+        queue = JobQueue(build_jobs(make_config(), durations), make_config())
+
+        first = queue.take()
+        second = queue.take()
+        third = queue.take()
+
+        assert first is not None and first.key == ("duzy", "/data")
+        assert second is not None and second.key == ("duzy", "/home")
+        assert third is not None and third.key == ("maly", "/a")
+        assert queue.take() is None
+
+        queue.done(third)
+        fourth = queue.take()
+        assert fourth is not None and fourth.key == ("maly", "/b")
+        assert not queue
+
+
+class TestScanRun:
+    """Testy składania wyników hostów w przebiegu."""
+
+    def test_host_result_published_after_last_root(self, tmp_path: Path) -> None:
+        """Test przekazania wyniku hosta zaraz po zakończeniu jego ostatniego roota."""
+        config = make_config()
+        config.cache_dir = str(tmp_path)
+        config.dry_run = True
+        published: list[HostResult] = []
+        run = ScanRun(config, published.append)
+
+        jobs = {job.key: job for job in [run.queue.take(), run.queue.take()] if job is not None}
+        assert len(jobs) == 2
+
+        run.complete(jobs[("duzy", "/data")], (RootSummary(path="/data", total_size=1), None), 1.0)
+        assert published == []
+
+        job = run.queue.take()
+        assert job is not None and job.key == ("duzy", "/home")
+        run.complete(job, (RootSummary(path="/home", total_size=2), None), 1.0)
+        run.complete(jobs[("maly", "/a")], (RootSummary(path="/a", total_size=3), "błąd"), 1.0)
+
+        assert [result.host_name for result in published] == ["duzy"]
+        assert [root.path for root in published[0].roots] == ["/data", "/home"]
+
+        job = run.queue.take()
+        assert job is not None
+        run.complete(job, (RootSummary(path="/b", total_size=4), None), 1.0)
+
+        results = run.finish()
+        assert [result.host_name for result in results] == ["maly", "duzy"]
+        assert [result.host_name for result in published] == ["duzy", "maly"]
+        assert published[1].failed_roots == ["/a"]
+        assert results[0] is published[1]
+        assert not results[0].success
@@ -0,0 +1,78 @@
+"""Testy dla modułu tree."""
+
+from dsmonitor.tree import DirectoryTree, parent_of
+
+
+class TestParentOf:
+    """Testy wyznaczania rodzica znormalizowanej ścieżki."""
+
+    def test_nested_path(self) -> None:
+        """Test zagnieżdżonej ścieżki."""
+        assert parent_of("/a/b/c") == "/a/b"
+
+    def test_top_level(self) -> None:
+        """Test katalogu tuż pod /."""
+        assert parent_of("/data") == "/"
+
+    def test_root(self) -> None:
+        """Test roota."""
+        assert parent_of("/") == "/"
+
+
+class TestDirectoryTree:
+    """Testy indeksu drzewa katalogów."""
+
+    def test_children_sums_and_depth(self) -> None:
+        """Test sum dzieci i głębokości węzłów."""
+        sizes = {
+            "/data": 1000,
+            "/data/sub1": 500,
+            "/data/sub1/nested": 200,
+            "/data/sub2": 100,
+        }
+
+        tree = DirectoryTree(sizes, "/data")
+        root = tree.find("/data")
+        sub1 = tree.find("/data/sub1")
+        nested = tree.find("/data/sub1/nested")
+
+        assert root is not None and sub1 is not None and nested is not None
+        assert tree.direct_files_size(root) == 400
+        assert tree.direct_files_size(sub1) == 300
+        assert tree.depths[nested] == 2
+        assert tree.parents[nested] == sub1
+        assert tree.parents[root] == -1
+
+    def test_excludes_paths_outside_root(self) -> None:
+        """Test pomijania ścieżek spoza roota i o podobnym prefiksie."""
+        sizes = {
+            "/data/app": 100,
+            "/data/app2": 50,
+            "/data/app/x": 10,
+        }
+
+        tree = DirectoryTree(sizes, "/data/app")
+
+        assert len(tree) == 2
+        assert tree.find("/data/app2") is None
+        assert tree.contains("/data/app/y") is True
+
+    def test_parent_size(self) -> None:
+        """Test rozmiaru rodzica z oryginalnego słownika."""
+        sizes = {"/data": 300, "/data/a": 100}
+
+        tree = DirectoryTree(sizes, "/data")
+
+        assert tree.parent_size("/data/a") == 300
+        assert tree.parent_size("/data") is None
+
+    def test_root_slash(self) -> None:
+        """Test drzewa dla roota /."""
+        sizes = {"/": 100, "/a": 60, "/a/b": 10}
+
+        tree = DirectoryTree(sizes, "/")
+        root = tree.find("/")
+
+        assert root is not None
+        assert tree.depth_of("/a/b") == 2
+        assert tree.direct_files_size(root) == 40
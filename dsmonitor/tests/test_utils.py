@@ -1,11 +1,16 @@
 """Testy dla modułu utils."""
 
+from pathlib import PurePosixPath
+
+import pytest
+
 from dsmonitor.utils import (
     count_access_denied_errors,
     get_parent_path,
     human_size,
     is_child_of,
     normalize_path,
+    parse_size,
 )
 
 
@@ -41,6 +46,24 @@ class TestHumanSize:
         assert human_size(-100) == "0 B"
 
 
+class TestParseSize:
+    """Testy zamiany rozmiaru z jednostką na bajty."""
+
+    def test_units(self) -> None:
+        """Test jednostek dwójkowych (z B i bez, wielkość liter, spacja)."""
+        assert parse_size("1024") == 1024
+        assert parse_size("1.5k") == 1536
+        assert parse_size("512 MB") == 512 * 1024**2
+        assert parse_size("10G") == 10 * 1024**3
+        assert parse_size(7) == 7
+
+    def test_invalid(self) -> None:
+        """Test nieprawidłowych i ujemnych wartości."""
+        for value in ("", "abc", "10Q", "-1"):
+            with pytest.raises(ValueError):
+                parse_size(value)
+
+
 class TestGetParentPath:
     """Testy pobierania ścieżki rodzica."""
 
@@ -73,6 +96,23 @@ class TestNormalizePath:
         """Test roota."""
         assert normalize_path("/") == "/"
 
+    @pytest.mark.parametrize(
+        "path",
+        ["", ".", "./", "./a", "a/./b", "a/.", "/a/.", "//a", "///a/", "/a//b/", "/a/../b", "a/b", "/a/b", "/.a/b."],
+    )
+    def test_matches_pure_posix_path(self, path: str) -> None:
+        """Test zgodności szybkiej ścieżki z normalizacją PurePosixPath."""
+        expected = str(PurePosixPath(path))
+        expected = expected.rstrip("/") if expected != "/" else "/"
+
+        assert normalize_path(path) == expected
+
+    def test_normalized_path_returned_as_is(self) -> None:
+        """Test zwrócenia tego samego obiektu dla ścieżki już znormalizowanej."""
+        path = "".join(["/data", "/app"])
+
+        assert normalize_path(path) is path
+
 
 class TestIsChildOf:
     """Testy sprawdzania czy ścieżka jest podścieżką."""